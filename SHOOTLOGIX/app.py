@@ -4,15 +4,20 @@ Flask REST API for the full production logistics SPA.
 Run: python3 app.py  →  http://localhost:5002
 """
 import csv
+import functools
 import hashlib
 import io
+import itertools
 import json
 import os
+import re
 import tempfile
 import threading
 from flask import Flask, jsonify, request, render_template, abort, Response, g, make_response
 
-from db_compat import get_table_names as _compat_get_table_names, get_backend_info
+from db_compat import (get_table_names as _compat_get_table_names, get_backend_info,
+                       shared_transaction, in_shared_transaction, savepoint, set_write_scope,
+                       get_production_version, DATA_BOOT_ID)
 from database import (
     init_db, get_db,
     get_productions, get_production, create_production,
@@ -20,6 +25,7 @@ from database import (
     get_shooting_days, create_shooting_day, update_shooting_day,
     delete_shooting_day, get_shooting_day,
     get_events_for_day, create_event, update_event, delete_event, delete_events_for_day,
+    merge_pdt_days,
     get_boats, create_boat, update_boat, delete_boat,
     get_boat_functions, create_boat_function, update_boat_function,
     delete_boat_function, delete_boat_assignment_by_function,
@@ -34,6 +40,7 @@ from database import (
     get_fuel_entries, upsert_fuel_entry, delete_fuel_entry, delete_fuel_entries_for_assignment,
     get_fuel_machinery, create_fuel_machinery, update_fuel_machinery, delete_fuel_machinery,
     get_fuel_locked_prices, set_fuel_locked_price, delete_fuel_locked_price,
+    get_fuel_costs, summarize_fuel_costs,
     get_helpers, create_helper, update_helper, delete_helper,
     get_helper_assignments, create_helper_assignment, update_helper_assignment,
     delete_helper_assignment, delete_helper_assignment_by_function,
@@ -58,10 +65,11 @@ from database import (
     get_location_schedules, upsert_location_schedule,
     delete_location_schedule, delete_location_schedule_by_id,
     lock_location_schedules, auto_fill_locations_from_pdt,
-    sync_pdt_day_to_locations, remove_pdt_film_days_for_date,
+    sync_pdt_day_to_locations, remove_pdt_film_days_for_date, resync_pdt_locations,
     get_guard_location_schedules, upsert_guard_location_schedule,
     delete_guard_location_schedule, lock_guard_location_schedules,
     sync_guard_location_from_locations, update_guard_location_nb_guards,
+    apply_schedule_cell_changes,
     get_fnb_tracking, upsert_fnb_tracking, delete_fnb_tracking, get_fnb_summary,
     # FNB v2
     get_fnb_categories, create_fnb_category, update_fnb_category, delete_fnb_category,
@@ -87,8 +95,12 @@ from database import (
     get_comments, get_comment_counts, create_comment, delete_comment,
     get_notifications, get_unread_notification_count, create_notification,
     create_notifications_for_production, mark_notification_read, mark_all_notifications_read,
+    # AXE 7.3 — Conflict alerts
+    get_alerts,
     # AXE 10.2 — Duplication
-    duplicate_assignment, duplicate_fnb_category,
+    duplicate_assignment, duplicate_assignments, duplicate_fnb_category,
+    # Bulk CSV import
+    import_rows, ImportRowError,
     # P2.3 — Physical Vessels
     get_physical_vessels, create_physical_vessel, update_physical_vessel,
     delete_physical_vessel, check_vessel_cross_module_conflict,
@@ -97,15 +109,26 @@ from database import (
     # P6.4 — Exchange rates
     get_exchange_rates, upsert_exchange_rate, get_latest_rate,
     # Daily checklists
-    generate_daily_checklist, get_daily_checklist, check_checklist_item,
+    generate_daily_checklist, generate_daily_checklists, get_daily_checklist, check_checklist_item,
+    DAILY_BUDGET_TABLES,
+    # Fuel overview pivot
+    get_fuel_overview, FUEL_OVERVIEW_TABLES, FNB_BUDGET_TABLES,
+    # Assignment interval index
+    get_assignment_conflicts, ASSIGNMENT_INDEX_TABLES,
+    # Collection fields / sort / pagination
+    parse_collection_query,
 )
 
+import events
+from json_codec import FastJSONProvider, dumps as json_dumps, compress_response, to_columnar
 from validation import (ValidationError, validate_assignment, validate_assignment_dates,
     validate_fuel_entry, validate_shooting_day, validate_date_range, validate_positive_number,
     validate_required, validate_guard_schedule, validate_assignment_overlap,
-    validate_required_fields, validate_numeric_fields, validate_entity_name)
+    validate_required_fields, validate_numeric_fields, validate_entity_name,
+    validate_schedule_cell_changes, validate_iso_date)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # ─── Background Export System ─────────────────────────────────────────────────
 import uuid
@@ -271,17 +294,86 @@ def handle_validation_error(e):
     return jsonify({"error": "Validation failed", "fields": e.errors}), 422
 
 
+# Module -> tables whose writes change its GET responses (None = any table).
+# "productions" is always added so a deleted production never answers 304.
+_MODULE_TABLES = {
+    "shooting_days": ("shooting_days", "shooting_day_events"),
+    "boats": ("boats",),
+    "boat_functions": ("boat_functions",),
+    "boat_assignments": ("boat_assignments", "boat_functions", "boats", "assignment_day_overrides"),
+    "picture_boats": ("picture_boats",),
+    "picture_boat_assignments": ("picture_boat_assignments", "boat_functions", "picture_boats",
+                                 "assignment_day_overrides"),
+    "helpers": ("helpers",),
+    "helper_assignments": ("helper_assignments", "boat_functions", "helpers",
+                           "assignment_day_overrides"),
+    "security_boats": ("security_boats",),
+    "security_boat_assignments": ("security_boat_assignments", "boat_functions", "security_boats",
+                                  "assignment_day_overrides"),
+    "transport_vehicles": ("transport_vehicles",),
+    "transport_assignments": ("transport_assignments", "boat_functions", "transport_vehicles",
+                              "assignment_day_overrides"),
+    "fuel_entries": ("fuel_entries",),
+    "fuel_overview": FUEL_OVERVIEW_TABLES,
+    "fnb_entries": ("fnb_entries",),
+    "fnb_budget": FNB_BUDGET_TABLES,
+    "budget_daily": DAILY_BUDGET_TABLES,
+    "assignment_conflicts": ASSIGNMENT_INDEX_TABLES,
+    "budget": None,
+    "dashboard": None,
+}
+
+
+def data_versioned(module, daily=False):
+    """Answer If-None-Match from the production's data version for `module`
+    before the handler runs (no DB access on 304). The ETag also covers the
+    user, role and query string; daily=True adds today's date for views that
+    depend on it."""
+    tables = _MODULE_TABLES[module]
+    if tables is not None:
+        tables = tuple(tables) + ("productions",)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(prod_id, *args, **kwargs):
+            key = (f"{DATA_BOOT_ID}:{module}:{prod_id}:{get_production_version(prod_id, tables)}:"
+                   f"{getattr(g, 'user_id', '')}:{getattr(g, 'role', '')}:"
+                   f"{request.query_string.decode()}")
+            if daily:
+                from datetime import date
+                key += ":" + date.today().isoformat()
+            etag = '"' + hashlib.md5(key.encode()).hexdigest() + '"'
+            if request.headers.get('If-None-Match') == etag:
+                return Response(status=304, headers={'ETag': etag})
+            g.data_etag = etag
+            return fn(prod_id, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def jsonify_cached(data):
-    """Return a JSON response with ETag. If client sends matching If-None-Match, return 304."""
-    body = json.dumps(data, separators=(',', ':'), sort_keys=True)
-    etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
-    if_none_match = request.headers.get('If-None-Match')
-    if if_none_match == etag:
-        return Response(status=304)
+    """Return a JSON response with ETag. If client sends matching If-None-Match, return 304.
+    Inside a @data_versioned handler the version ETag is used and the body is not hashed.
+    ?format=columns encodes a list of rows as columns (see json_codec.to_columnar).
+    A CollectionPage with more rows sets X-Next-Cursor."""
+    next_cursor = getattr(data, 'next_cursor', None)
+    if request.args.get('format') == 'columns' and isinstance(data, list):
+        data = to_columnar(data)
+    etag = g.pop('data_etag', None)
+    if etag:
+        body = json_dumps(data)
+    else:
+        body = json_dumps(data, sort_keys=True)
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match == etag:
+            return Response(status=304)
     resp = make_response(body)
     resp.headers['Content-Type'] = 'application/json'
     resp.headers['ETag'] = etag
     resp.headers['Cache-Control'] = 'private, no-cache'
+    if next_cursor:
+        resp.headers['X-Next-Cursor'] = next_cursor
     return resp
 
 # ─── Auth: Register blueprint & protect all /api/ routes ─────────────────────
@@ -312,6 +404,9 @@ def enforce_auth():
     are not affected.
     """
     path = request.path
+    # Data versions: writes under /api/productions/<id>/ belong to that production
+    scope = re.match(r'/api/productions/(\d+)', path)
+    set_write_scope(int(scope.group(1)) if scope else None)
 
     # Only protect API routes
     if not path.startswith("/api/"):
@@ -336,6 +431,13 @@ def enforce_auth():
     g.user_id = payload.get("user_id", int(payload["sub"]))
     g.nickname = payload["nickname"]
     g.is_admin = payload.get("is_admin", False)
+    return _authorize_api_request(path, request.method)
+
+
+def _authorize_api_request(path, method):
+    """Resolve the authenticated user's role and permissions for `path` and
+    check RBAC access. Returns an error response, or None when allowed.
+    Also used by /api/batch to authorize each replayed item."""
     g.role = "ADMIN" if g.is_admin else None
 
     # RBAC: determine user's role on the current project
@@ -407,13 +509,13 @@ def enforce_auth():
         pass  # Full access
     elif g.permissions:
         allowed, reason = check_permission_access(
-            g.permissions, g.global_permissions, path, request.method, is_admin=False
+            g.permissions, g.global_permissions, path, method, is_admin=False
         )
         if not allowed:
             return jsonify({"error": reason, "code": "FORBIDDEN"}), 403
     elif g.role:
         # Fallback to V1 role check if no permissions loaded
-        allowed, reason = check_role_access(g.role, path, request.method)
+        allowed, reason = check_role_access(g.role, path, method)
         if not allowed:
             return jsonify({"error": reason, "code": "FORBIDDEN"}), 403
 
@@ -451,6 +553,222 @@ def log_access(response):
     return response
 
 
+@app.after_request
+def compress(response):
+    """gzip/deflate large text responses for clients that accept it."""
+    return compress_response(response, request.accept_encodings)
+
+
+# ─── P6.1: Batched mutation replay (offline queue) ───────────────────────────
+
+BATCH_MAX_ITEMS = 500
+_BATCH_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Per-item authorization state restored on g before each item runs
+_BATCH_G_FIELDS = ("role", "permissions", "global_permissions", "has_entity_restrictions")
+
+
+class _BatchItemFailed(Exception):
+    """Raised inside an item's savepoint to roll back an error response."""
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def _batch_group_key(mutation):
+    m = re.search(r'/api/productions/(\d+)', mutation.get('url') or '')
+    return int(m.group(1)) if m else None
+
+
+def _dispatch_batch_item():
+    """Run the route handler for the current (batch item) request context."""
+    try:
+        rv = app.dispatch_request()
+    except Exception as e:
+        rv = app.handle_user_exception(e)
+    return app.make_response(rv)
+
+
+def _run_batch_group(items, headers):
+    """Authorize then run a group of (index, mutation) pairs in one transaction."""
+    results, runnable = [], []
+    # Authorize every item before opening the write transaction: permission
+    # lookups may write and must not wait on it.
+    for idx, m in items:
+        method = str(m.get('method') or '').upper()
+        url = m.get('url') or ''
+        result = {"id": m.get('id', idx), "status": None, "body": None}
+        results.append(result)
+        if method not in _BATCH_METHODS or not url.startswith('/api/') or url.startswith('/api/batch'):
+            result.update(status=400, body={"error": "Unsupported mutation"})
+            continue
+        with app.test_request_context(url, method=method, headers=headers):
+            denied = _authorize_api_request(request.path, method)
+            if denied is not None:
+                resp = app.make_response(denied)
+                result.update(status=resp.status_code, body=resp.get_json(silent=True))
+                continue
+            runnable.append((m, method, url, result,
+                             {f: getattr(g, f, None) for f in _BATCH_G_FIELDS}))
+    if not runnable:
+        return results
+
+    with shared_transaction() as conn:
+        for n, (m, method, url, result, perms) in enumerate(runnable):
+            for f, v in perms.items():
+                setattr(g, f, v)
+            kwargs = {"json": m['body']} if m.get('body') is not None else {}
+            with app.test_request_context(url, method=method, headers=headers, **kwargs):
+                try:
+                    with savepoint(conn, f"batch_{n}"):
+                        resp = _dispatch_batch_item()
+                        if resp.status_code >= 400:
+                            raise _BatchItemFailed(resp)
+                except _BatchItemFailed as e:
+                    resp = e.response
+                except Exception as e:
+                    app.logger.exception("Batch item %s %s failed", method, url)
+                    resp = make_response(jsonify({"error": str(e)}), 500)
+            result.update(status=resp.status_code, body=resp.get_json(silent=True))
+    return results
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Replay an ordered list of queued mutations in one request (P6.1).
+
+    Body: {mutations: [{id, url, method, body}]}. Each item is authorized
+    like a direct call and dispatched to its normal route handler, without
+    re-running token checks or access logging. Consecutive items of the same
+    production share one DB transaction; a savepoint per item rolls back any
+    item that fails (status >= 400) on its own.
+    Returns {results: [{id, status, body}]} in input order; 409 bodies carry
+    the conflict details the offline queue stores.
+    """
+    mutations = (request.json or {}).get('mutations')
+    if not isinstance(mutations, list):
+        return jsonify({"error": "mutations must be a list"}), 400
+    if len(mutations) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {BATCH_MAX_ITEMS} mutations per batch"}), 413
+    items = [(i, m if isinstance(m, dict) else {}) for i, m in enumerate(mutations)]
+    headers = {k: v for k, v in request.headers.items()
+               if k.lower() in ('authorization', 'x-project-id')}
+
+    saved = {f: getattr(g, f, None) for f in _BATCH_G_FIELDS}
+    results = []
+    try:
+        for _, group in itertools.groupby(items, key=lambda im: _batch_group_key(im[1])):
+            results.extend(_run_batch_group(list(group), headers))
+    finally:
+        for f, v in saved.items():
+            setattr(g, f, v)
+    return jsonify({"results": results})
+
+
+# ─── Production bootstrap (first-load bundle) ────────────────────────────────
+
+# Module name -> GET path served in the bundle ({pid} = production id)
+BOOTSTRAP_MODULES = {
+    "shooting_days":             "/api/productions/{pid}/shooting-days",
+    "boats":                     "/api/productions/{pid}/boats",
+    "boat_functions":            "/api/productions/{pid}/boat-functions?context=boats",
+    "boat_assignments":          "/api/productions/{pid}/assignments?context=boats",
+    "picture_boats":             "/api/productions/{pid}/picture-boats",
+    "picture_functions":         "/api/productions/{pid}/boat-functions?context=picture",
+    "picture_boat_assignments":  "/api/productions/{pid}/picture-boat-assignments",
+    "security_boats":            "/api/productions/{pid}/security-boats",
+    "security_boat_assignments": "/api/productions/{pid}/security-boat-assignments",
+    "transport_vehicles":        "/api/productions/{pid}/transport-vehicles",
+    "transport_assignments":     "/api/productions/{pid}/transport-assignments",
+    "helpers":                   "/api/productions/{pid}/helpers",
+    "helper_assignments":        "/api/productions/{pid}/helper-assignments",
+    "guard_posts":               "/api/productions/{pid}/guard-posts",
+    "guard_schedules":           "/api/productions/{pid}/guard-schedules",
+    "locations":                 "/api/productions/{pid}/locations",
+    "location_schedules":        "/api/productions/{pid}/location-schedules",
+    "fuel_entries":              "/api/productions/{pid}/fuel-entries",
+    "fuel_prices":               "/api/fuel-prices",
+    "fuel_locked_prices":        "/api/fuel-locked-prices",
+    "fnb_categories":            "/api/productions/{pid}/fnb-categories",
+    "fnb_items":                 "/api/productions/{pid}/fnb-items",
+    "notifications":             "/api/notifications",
+}
+
+
+def _rbac_allows(path, method="GET"):
+    """Check `path` against the role/permissions already resolved on g."""
+    if g.is_admin:
+        return True
+    if g.permissions:
+        return check_permission_access(g.permissions, g.global_permissions, path, method)[0]
+    if g.role:
+        return check_role_access(g.role, path, method)[0]
+    return True
+
+
+def _parse_module_etags(raw):
+    """Parse ?etags=boats:abc,shooting_days:def into {module: etag}."""
+    etags = {}
+    for part in (raw or "").split(","):
+        name, sep, tag = part.partition(":")
+        if sep and tag:
+            etags[name.strip()] = tag.strip().strip('"')
+    return etags
+
+
+@app.route("/api/productions/<int:prod_id>/bootstrap", methods=["GET"])
+def api_production_bootstrap(prod_id):
+    """First-load bundle: every module payload the user may read, in one response.
+
+    ?modules=a,b restricts the bundle; ?etags=a:<etag>,b:<etag> leaves out
+    modules whose payload is unchanged (listed under "unchanged"). Auth and
+    permissions are resolved once for the request; all modules are read on
+    one DB connection. Modules the user cannot read are listed under "denied".
+    """
+    prod_or_404(prod_id)
+    wanted = [m.strip() for m in request.args.get("modules", "").split(",") if m.strip()]
+    unknown = [m for m in wanted if m not in BOOTSTRAP_MODULES]
+    if unknown:
+        return jsonify({"error": f"Unknown modules: {', '.join(unknown)}"}), 400
+    client_etags = _parse_module_etags(request.args.get("etags"))
+    headers = {k: v for k, v in request.headers.items()
+               if k.lower() in ('authorization', 'x-project-id')}
+
+    parts, unchanged, denied, failed = [], [], [], {}
+    with shared_transaction():
+        for name in wanted or BOOTSTRAP_MODULES:
+            path = BOOTSTRAP_MODULES[name].format(pid=prod_id)
+            if not _rbac_allows(path.split("?")[0]):
+                denied.append(name)
+                continue
+            item_headers = dict(headers)
+            if name in client_etags:
+                # Versioned handlers answer 304 before doing any work
+                item_headers['If-None-Match'] = f'"{client_etags[name]}"'
+            with app.test_request_context(path, headers=item_headers):
+                resp = _dispatch_batch_item()
+            if resp.status_code == 304:
+                unchanged.append(name)
+                continue
+            if resp.status_code != 200:
+                failed[name] = resp.status_code
+                continue
+            body = resp.get_data(as_text=True)
+            etag = (resp.headers.get("ETag") or hashlib.md5(body.encode()).hexdigest()).strip('"')
+            if client_etags.get(name) == etag:
+                unchanged.append(name)
+                continue
+            parts.append(f'{json.dumps(name)}:{{"etag":{json.dumps(etag)},"data":{body}}}')
+
+    # Module bodies are already JSON: splice them in instead of re-encoding
+    body = (f'{{"production_id":{prod_id},"modules":{{{",".join(parts)}}},'
+            f'"unchanged":{json.dumps(unchanged)},"denied":{json.dumps(denied)},'
+            f'"failed":{json.dumps(failed)}}}')
+    resp = make_response(body)
+    resp.headers['Content-Type'] = 'application/json'
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 def prod_or_404(prod_id):
@@ -541,6 +859,7 @@ def api_departments(prod_id):
 # ─── Shooting days ────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/shooting-days", methods=["GET"])
+@data_versioned("shooting_days")
 def api_shooting_days(prod_id):
     prod_or_404(prod_id)
     return jsonify_cached(get_shooting_days(prod_id))
@@ -693,45 +1012,109 @@ def api_parse_pdt(prod_id):
             "existing_count": len(existing),
         }), 409
 
-    # Delete existing if force
-    if existing:
-        with get_db() as conn:
-            conn.execute(
-                "DELETE FROM shooting_days WHERE production_id=?", (prod_id,)
-            )
-
     days = parse_pdt_pdf()
-    created = []
-    for d in days:
-        events = d.pop("events", [])
-        d["production_id"] = prod_id
-        day_id = create_shooting_day(d)
-        created.append(day_id)
-        for ev in events:
-            ev["shooting_day_id"] = day_id
-            create_event(ev)
+    stats = merge_pdt_days(prod_id, days, replace=bool(existing))
+    created = stats["created"]
 
     return jsonify({
-        "created": len(created),
-        "message": f"{len(created)} shooting days imported from PDT PDF",
+        "created": created,
+        "message": f"{created} shooting days imported from PDT PDF",
     }), 201
 
 
 # ─── Upload PDT PDF (browser file picker + smart merge) ─────────────────────
+# Parsing runs as a background job in a process pool (PyMuPDF is CPU-bound and
+# holds the GIL); the client polls the job for progress. Parsed days are cached
+# by the SHA-256 of the PDF, so re-uploading the same file skips parsing.
+
+_pdt_jobs = {}  # { job_id: { status, stage, progress, prod_id, result, error, created_at } }
+_PDT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pdt_cache')
+_pdt_pool = None
+_pdt_pool_lock = threading.Lock()
+
+
+def _get_pdt_pool():
+    """Lazily create the process pool used for PDF parsing."""
+    global _pdt_pool
+    with _pdt_pool_lock:
+        if _pdt_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: never fork a threaded server process holding DB connections
+            _pdt_pool = ProcessPoolExecutor(
+                max_workers=max(1, min(2, os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdt_pool
+
+
+def _pdt_cache_get(content_hash):
+    path = os.path.join(_PDT_CACHE_DIR, f"{content_hash}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pdt_cache_put(content_hash, parsed_days):
+    os.makedirs(_PDT_CACHE_DIR, exist_ok=True)
+    tmp_path = os.path.join(_PDT_CACHE_DIR, f"{content_hash}.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(parsed_days, f, default=str)
+    os.replace(tmp_path, os.path.join(_PDT_CACHE_DIR, f"{content_hash}.json"))
+
+
+def _cleanup_old_pdt_jobs():
+    """Forget PDT jobs older than 1 hour."""
+    now = _time.time()
+    for jid in [j for j, job in _pdt_jobs.items() if now - job.get("created_at", 0) > 3600]:
+        _pdt_jobs.pop(jid, None)
+
+
+def _run_pdt_job(job_id, prod_id, pdf_bytes, content_hash, user_id, nickname):
+    """Background worker: parse (or reuse cached parse) then merge into the PDT."""
+    job = _pdt_jobs[job_id]
+    try:
+        parsed_days = _pdt_cache_get(content_hash)
+        job["cached"] = parsed_days is not None
+        if parsed_days is None:
+            from pdf_parser import parse_pdt_pdf
+            job.update(stage="parsing", progress=10)
+            tmp_fd, tmp_path = tempfile.mkstemp(suffix='.pdf')
+            try:
+                with os.fdopen(tmp_fd, "wb") as f:
+                    f.write(pdf_bytes)
+                parsed_days = _get_pdt_pool().submit(parse_pdt_pdf, pdf_path=tmp_path).result()
+            finally:
+                os.unlink(tmp_path)
+            _pdt_cache_put(content_hash, parsed_days)
+
+        job.update(stage="merging", progress=80)
+        # Run the merge as the uploading user so history is attributed correctly
+        with app.test_request_context():
+            g.user_id = user_id
+            g.nickname = nickname
+            stats = merge_pdt_days(prod_id, json.loads(json.dumps(parsed_days, default=str)))
+        job.update(status="done", stage="done", progress=100, result=stats)
+    except Exception as e:
+        job.update(status="error", error=str(e))
+
 
 @app.route("/api/productions/<int:prod_id>/upload-pdt", methods=["POST"])
 def api_upload_pdt(prod_id):
     """
-    Receive a PDF file upload, parse it, and smart-merge with existing days.
+    Receive a PDF file upload and start a background parse + smart-merge job.
+    Returns 202 with a job_id to poll at /upload-pdt/jobs/<job_id>.
     Merge logic:
       - Match by day_number
       - If existing day has status='modifie' -> skip (preserve manual edits)
-      - If existing day has other status -> update fields from PDF
+      - If existing day has other status -> update fields/events that differ
       - If day doesn't exist -> create it
       - Days in DB but not in PDF -> keep them (no delete)
+    See database.merge_pdt_days().
     """
     prod_or_404(prod_id)
-    from pdf_parser import parse_pdt_pdf
 
     if 'pdf' not in request.files:
         return jsonify({"error": "No PDF file provided"}), 400
@@ -740,59 +1123,42 @@ def api_upload_pdt(prod_id):
     if not pdf_file.filename:
         return jsonify({"error": "Empty filename"}), 400
 
-    # Save to temp file, parse, then delete
-    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.pdf')
-    try:
-        pdf_file.save(tmp_path)
-        parsed_days = parse_pdt_pdf(pdf_path=tmp_path)
-    finally:
-        os.close(tmp_fd)
-        os.unlink(tmp_path)
-
-    # Build lookup of existing days by day_number
-    existing = get_shooting_days(prod_id)
-    existing_by_dn = {}
-    for d in existing:
-        if d.get('day_number'):
-            existing_by_dn[d['day_number']] = d
-
-    stats = {"created": 0, "updated": 0, "skipped": 0}
+    _cleanup_old_pdt_jobs()
+    pdf_bytes = pdf_file.read()
+    content_hash = hashlib.sha256(pdf_bytes).hexdigest()
 
-    for parsed in parsed_days:
-        events = parsed.pop("events", [])
-        dn = parsed.get("day_number")
-        if not dn:
-            continue
+    job_id = str(uuid.uuid4())[:8]
+    _pdt_jobs[job_id] = {"status": "processing", "stage": "queued", "progress": 0,
+                         "prod_id": prod_id, "result": None, "created_at": _time.time()}
+    t = threading.Thread(
+        target=_run_pdt_job,
+        args=(job_id, prod_id, pdf_bytes, content_hash,
+              getattr(g, 'user_id', None), getattr(g, 'nickname', None)),
+        daemon=True,
+    )
+    t.start()
+    return jsonify({"job_id": job_id, "status": "processing"}), 202
 
-        if dn in existing_by_dn:
-            ex = existing_by_dn[dn]
-            # Skip days manually edited by user
-            if ex.get('status') == 'modifié':
-                stats["skipped"] += 1
-                continue
-            # Update day fields from PDF
-            update_shooting_day(ex['id'], parsed)
-            # Replace events: delete old, insert new
-            delete_events_for_day(ex['id'])
-            for ev in events:
-                ev["shooting_day_id"] = ex['id']
-                create_event(ev)
-            stats["updated"] += 1
-        else:
-            # Create new day
-            parsed["production_id"] = prod_id
-            day_id = create_shooting_day(parsed)
-            for ev in events:
-                ev["shooting_day_id"] = day_id
-                create_event(ev)
-            stats["created"] += 1
 
-    return jsonify(stats), 200
+@app.route("/api/productions/<int:prod_id>/upload-pdt/jobs/<job_id>", methods=["GET"])
+def api_upload_pdt_status(prod_id, job_id):
+    """Poll a PDT parse job: stage, progress (0-100) and merge stats when done."""
+    job = _pdt_jobs.get(job_id)
+    if not job or job["prod_id"] != prod_id:
+        return jsonify({"error": "Job not found"}), 404
+    body = {"status": job["status"], "stage": job["stage"], "progress": job["progress"],
+            "cached": job.get("cached", False)}
+    if job["status"] == "done":
+        body.update(job["result"])
+    elif job["status"] == "error":
+        body["error"] = job.get("error", "Unknown error")
+    return jsonify(body)
 
 
 # ─── Boats ────────────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/boats", methods=["GET"])
+@data_versioned("boats")
 def api_boats(prod_id):
     prod_or_404(prod_id)
     include_deleted = request.args.get('include_deleted', '').lower() == 'true'
@@ -885,6 +1251,7 @@ def api_upload_boat_image(boat_id):
 # ─── Boat functions ───────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/boat-functions", methods=["GET"])
+@data_versioned("boat_functions")
 def api_boat_functions(prod_id):
     prod_or_404(prod_id)
     context = request.args.get('context')
@@ -946,10 +1313,12 @@ def api_reorder_boat_functions(prod_id):
 # ─── Boat assignments ─────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/assignments", methods=["GET"])
+@data_versioned("boat_assignments")
 def api_assignments(prod_id):
     prod_or_404(prod_id)
     context = request.args.get('context')
-    return jsonify_cached(get_boat_assignments(prod_id, context=context))
+    return jsonify_cached(get_boat_assignments(
+        prod_id, context=context, query=parse_collection_query(request.args)))
 
 
 @app.route("/api/productions/<int:prod_id>/assignments", methods=["POST"])
@@ -1032,6 +1401,7 @@ def api_delete_assignment_by_function(prod_id, func_id):
 # ─── Picture Boats ────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/picture-boats", methods=["GET"])
+@data_versioned("picture_boats")
 def api_picture_boats(prod_id):
     prod_or_404(prod_id)
     include_deleted = request.args.get('include_deleted', '').lower() == 'true'
@@ -1115,6 +1485,7 @@ def api_upload_picture_boat_image(pb_id):
 # ─── Picture Boat Assignments ─────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/picture-boat-assignments", methods=["GET"])
+@data_versioned("picture_boat_assignments")
 def api_picture_boat_assignments(prod_id):
     prod_or_404(prod_id)
     return jsonify_cached(get_picture_boat_assignments(prod_id))
@@ -1200,6 +1571,7 @@ def api_delete_picture_boat_assignment_by_function(prod_id, func_id):
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/helpers", methods=["GET"])
+@data_versioned("helpers")
 def api_helpers(prod_id):
     prod_or_404(prod_id)
     include_deleted = request.args.get('include_deleted', '').lower() == 'true'
@@ -1302,29 +1674,8 @@ def api_bulk_create_helpers(prod_id):
 
 @app.route("/api/productions/<int:prod_id>/helpers/import-csv", methods=["POST"])
 def api_import_helpers_csv(prod_id):
-    import csv, io
     prod_or_404(prod_id)
-    f = request.files.get("file")
-    if not f:
-        return jsonify({"error": "No file provided"}), 400
-    content = f.read().decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(content))
-    created = []
-    for row in reader:
-        name = (row.get("name") or "").strip()
-        if not name:
-            continue
-        rec = {
-            "production_id": prod_id,
-            "name": name,
-            "role": (row.get("role") or "").strip() or None,
-            "group_name": (row.get("group") or row.get("group_name") or "GENERAL").strip(),
-            "daily_rate_estimate": float(row.get("rate") or row.get("daily_rate_estimate") or 45),
-            "notes": (row.get("notes") or "").strip() or None,
-        }
-        hid = create_helper(rec)
-        created.append(hid)
-    return jsonify({"created": len(created), "ids": created}), 201
+    return _import_csv_upload(prod_id, "helpers", _LABOUR_CSV_FIELDS)
 
 
 @app.route("/api/helpers/<int:helper_id>/upload-image", methods=["POST"])
@@ -1347,9 +1698,11 @@ def api_upload_helper_image(helper_id):
 
 
 @app.route("/api/productions/<int:prod_id>/helper-assignments", methods=["GET"])
+@data_versioned("helper_assignments")
 def api_helper_assignments(prod_id):
     prod_or_404(prod_id)
-    return jsonify_cached(get_helper_assignments(prod_id))
+    return jsonify_cached(get_helper_assignments(
+        prod_id, query=parse_collection_query(request.args)))
 
 
 @app.route("/api/productions/<int:prod_id>/helper-assignments", methods=["POST"])
@@ -1479,6 +1832,7 @@ def api_export_helpers_csv(prod_id):
 # ─── Security Boats ──────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/security-boats", methods=["GET"])
+@data_versioned("security_boats")
 def api_security_boats(prod_id):
     prod_or_404(prod_id)
     include_deleted = request.args.get('include_deleted', '').lower() == 'true'
@@ -1560,6 +1914,7 @@ def api_upload_security_boat_image(sb_id):
 
 
 @app.route("/api/productions/<int:prod_id>/security-boat-assignments", methods=["GET"])
+@data_versioned("security_boat_assignments")
 def api_security_boat_assignments(prod_id):
     prod_or_404(prod_id)
     return jsonify_cached(get_security_boat_assignments(prod_id))
@@ -1871,6 +2226,16 @@ def api_delete_physical_vessel(vessel_id):
     return jsonify({"deleted": vessel_id})
 
 
+# ─── Assignment conflicts ─────────────────────────────────────────────────────
+
+@app.route("/api/productions/<int:prod_id>/assignment-conflicts", methods=["GET"])
+@data_versioned("assignment_conflicts")
+def api_assignment_conflicts(prod_id):
+    """Every double-booked entity and cross-module vessel conflict of the production."""
+    prod_or_404(prod_id)
+    return jsonify_cached(get_assignment_conflicts(prod_id))
+
+
 # ─── FNB ──────────────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/fnb", methods=["GET"])
@@ -1906,10 +2271,11 @@ def api_guards(prod_id):
 # ─── Budget ───────────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/budget", methods=["GET"])
+@data_versioned("budget")
 def api_budget(prod_id):
     prod_or_404(prod_id)
     ref_cur = request.args.get("currency", "USD").upper()
-    return jsonify(get_budget(prod_id, ref_currency=ref_cur))
+    return jsonify_cached(get_budget(prod_id, ref_currency=ref_cur))
 
 
 # ─── Exchange Rates (P6.4) ───────────────────────────────────────────────────
@@ -1959,7 +2325,7 @@ def api_activity(prod_id):
 @app.route("/api/productions/<int:prod_id>/history", methods=["GET"])
 def api_history(prod_id):
     prod_or_404(prod_id)
-    limit = int(request.args.get("limit", 50))
+    query = parse_collection_query(request.args, default_limit=50)
     entity_type = request.args.get("entity_type")
     entity_id = request.args.get("entity_id")
     user_id = request.args.get("user_id")
@@ -1970,11 +2336,11 @@ def api_history(prod_id):
         entity_id = int(entity_id)
     if user_id:
         user_id = int(user_id)
-    return jsonify(get_history(
-        prod_id, limit,
+    return jsonify_cached(get_history(
+        prod_id,
         entity_type=entity_type, entity_id=entity_id,
         user_id=user_id, action_type=action_type,
-        date_from=date_from, date_to=date_to
+        date_from=date_from, date_to=date_to, query=query
     ))
 
 
@@ -2282,6 +2648,7 @@ def api_export_pb_json(prod_id):
 # ─── Transport ────────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/transport-vehicles", methods=["GET"])
+@data_versioned("transport_vehicles")
 def api_transport_vehicles(prod_id):
     prod_or_404(prod_id)
     include_deleted = request.args.get('include_deleted', '').lower() == 'true'
@@ -2368,9 +2735,11 @@ def api_upload_transport_vehicle_image(vehicle_id):
 
 
 @app.route("/api/productions/<int:prod_id>/transport-assignments", methods=["GET"])
+@data_versioned("transport_assignments")
 def api_transport_assignments(prod_id):
     prod_or_404(prod_id)
-    return jsonify_cached(get_transport_assignments(prod_id))
+    return jsonify_cached(get_transport_assignments(
+        prod_id, query=parse_collection_query(request.args)))
 
 
 @app.route("/api/productions/<int:prod_id>/transport-assignments", methods=["POST"])
@@ -2493,103 +2862,26 @@ def api_export_transport_json(prod_id):
 # ─── Fuel overview ────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/fuel/overview", methods=["GET"])
+@data_versioned("fuel_overview")
 def api_fuel_overview(prod_id):
+    """Liters per source and date for the fuel grid. Optional ?from=&to= window."""
     prod_or_404(prod_id)
-    from database import get_db
-    with get_db() as conn:
-        # All fuel entries for this production
-        entries = conn.execute(
-            "SELECT fe.source_type, fe.assignment_id, fe.date, fe.liters, fe.fuel_type "
-            "FROM fuel_entries fe WHERE fe.production_id=? ORDER BY fe.date, fe.source_type",
-            (prod_id,)
-        ).fetchall()
-
-        # Get source names from assignments / machinery
-        boat_names = {}
-        for tbl, ctx in [('boat_assignments','boats'), ('picture_boat_assignments','picture_boats'),
-                         ('security_boat_assignments','security_boats'), ('transport_assignments','transport')]:
-            name_col = 'vehicle_name_override' if ctx == 'transport' else 'boat_name_override'
-            fallback_col = 'vehicle_name' if ctx == 'transport' else 'boat_name'
-            try:
-                rows = conn.execute(
-                    f"SELECT a.id, COALESCE(a.{name_col}, a.{fallback_col}, '?') as name "
-                    f"FROM {tbl} a WHERE a.production_id=?", (prod_id,)
-                ).fetchall()
-                for r in rows:
-                    boat_names[(ctx, r['id'])] = r['name']
-            except Exception:
-                pass
-
-        mach_rows = conn.execute(
-            "SELECT id, name FROM fuel_machinery WHERE production_id=?", (prod_id,)
-        ).fetchall()
-        for r in mach_rows:
-            boat_names[('machinery', r['id'])] = r['name']
-
-    # Build overview data
-    dates_set = set()
-    sources = {}  # key = "source_type:assignment_id"
-    for e in entries:
-        dk = e['date']
-        dates_set.add(dk)
-        skey = f"{e['source_type']}:{e['assignment_id']}"
-        if skey not in sources:
-            sources[skey] = {
-                'key': skey,
-                'source_type': e['source_type'],
-                'assignment_id': e['assignment_id'],
-                'name': boat_names.get((e['source_type'], e['assignment_id']), '?'),
-                'by_date': {},
-                'total': 0,
-                'diesel': 0,
-                'petrol': 0,
-            }
-        src = sources[skey]
-        liters = e['liters'] or 0
-        ft = e['fuel_type'] or 'DIESEL'
-        if dk not in src['by_date']:
-            src['by_date'][dk] = 0
-        src['by_date'][dk] += liters
-        src['total'] += liters
-        if ft == 'PETROL':
-            src['petrol'] += liters
-        else:
-            src['diesel'] += liters
-
-    dates = sorted(dates_set)
-
-    # Daily totals
-    daily_totals = {}
-    for dk in dates:
-        daily_totals[dk] = 0
-    for src in sources.values():
-        for dk, l in src['by_date'].items():
-            daily_totals[dk] = daily_totals.get(dk, 0) + l
-
-    # Category labels
-    cat_labels = {
-        'boats': 'BOAT', 'picture_boats': 'PB',
-        'security_boats': 'SB', 'transport': 'TRANSPO', 'machinery': 'MACH'
-    }
-    source_list = sorted(sources.values(), key=lambda s: (s['source_type'], s['name']))
-    for s in source_list:
-        s['category'] = cat_labels.get(s['source_type'], s['source_type'].upper())
-
-    return jsonify({
-        'dates': dates,
-        'sources': source_list,
-        'daily_totals': daily_totals,
-        'grand_total': sum(daily_totals.values()),
-    })
+    date_from, date_to = _export_date_params()
+    for field, value in (("from", date_from), ("to", date_to)):
+        if value:
+            validate_iso_date(value, field)
+    return jsonify_cached(get_fuel_overview(prod_id, date_from, date_to))
 
 
 # ─── Fuel entries ────────────────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/fuel-entries", methods=["GET"])
+@data_versioned("fuel_entries")
 def api_get_fuel_entries(prod_id):
     prod_or_404(prod_id)
     source = request.args.get('source')
-    return jsonify_cached(get_fuel_entries(prod_id, source_type=source or None))
+    return jsonify_cached(get_fuel_entries(
+        prod_id, source_type=source or None, query=parse_collection_query(request.args)))
 
 
 @app.route("/api/productions/<int:prod_id>/fuel-entries", methods=["POST"])
@@ -2724,25 +3016,10 @@ def api_unlock_fuel_day(date):
 
 # ─── Fuel budget export (from BUDGET tab) ────────────────────────────────────
 
-@app.route("/api/productions/<int:prod_id>/export/fuel-budget/csv")
-def api_export_fuel_budget_csv(prod_id):
-    """Export fuel budget breakdown by consumer: total litres + total price.
-    Filename: KLAS7_FUEL_YYMMDD
-    """
-    from datetime import datetime as dt
-    prod = prod_or_404(prod_id)
-    date_from, date_to = _export_date_params()
-    entries = get_fuel_entries(prod_id)
-    entries = _filter_entries_by_date(entries, date_from, date_to)
-    machinery = get_fuel_machinery(prod_id)
-    locked_prices = get_fuel_locked_prices()
-
-    # Current global prices
-    cur_diesel = float(get_setting("fuel_price_diesel", "0"))
-    cur_petrol = float(get_setting("fuel_price_petrol", "0"))
-
-    # Build consumer breakdown: group by source_type + entity name
-    # We need assignment data to resolve consumer names
+def _fuel_consumers(prod_id, priced):
+    """Group priced fuel rows (get_fuel_costs) by consumer:
+    {"SOURCE | name | function" or "MACHINERY | name":
+     {diesel_l, petrol_l, cost_up_to_date, cost_estimate}}."""
     from database import (get_boat_assignments, get_picture_boat_assignments,
                           get_transport_assignments, get_security_boat_assignments)
     asgn_map = {}
@@ -2758,55 +3035,39 @@ def api_export_fuel_budget_csv(prod_id):
                 a.get('vehicle_name_override') or a.get('vehicle_name') or '?',
                 a.get('function_name') or '?'
             )
+    machinery_names = {m['id']: m['name'] for m in get_fuel_machinery(prod_id)}
 
-    # Group entries by consumer (skip machinery — handled separately below)
     consumers = {}
-    for e in entries:
-        if e['source_type'] == 'machinery':
-            continue
-        key = (e['source_type'], e['assignment_id'])
-        name_info = asgn_map.get(key, (f"#{e['assignment_id']}", '?'))
-        consumer_key = f"{e['source_type'].upper()} | {name_info[0]} | {name_info[1]}"
-        if consumer_key not in consumers:
-            consumers[consumer_key] = {'diesel_l': 0, 'petrol_l': 0, 'cost_up_to_date': 0, 'cost_estimate': 0}
-        ft = e.get('fuel_type', 'DIESEL')
-        liters = e.get('liters', 0) or 0
-        date = e.get('date', '')
-        # Price: use locked price if day is locked, else current price
-        if date in locked_prices:
-            price = locked_prices[date]['diesel_price'] if ft == 'DIESEL' else locked_prices[date]['petrol_price']
-            consumers[consumer_key]['cost_up_to_date'] += liters * price
-        else:
-            price = cur_diesel if ft == 'DIESEL' else cur_petrol
-            consumers[consumer_key]['cost_estimate'] += liters * price
-        if ft == 'PETROL':
-            consumers[consumer_key]['petrol_l'] += liters
+    for r in priced:
+        if r['source_type'] == 'machinery':
+            m_name = machinery_names.get(r['assignment_id'], f"Machine #{r['assignment_id']}")
+            consumer_key = f"MACHINERY | {m_name}"
         else:
-            consumers[consumer_key]['diesel_l'] += liters
+            name_info = asgn_map.get((r['source_type'], r['assignment_id']),
+                                     (f"#{r['assignment_id']}", '?'))
+            consumer_key = f"{r['source_type'].upper()} | {name_info[0]} | {name_info[1]}"
+        data = consumers.get(consumer_key)
+        if data is None:
+            data = consumers[consumer_key] = {'diesel_l': 0, 'petrol_l': 0,
+                                              'cost_up_to_date': 0, 'cost_estimate': 0}
+        data['petrol_l' if r['fuel'] == 'PETROL' else 'diesel_l'] += r['liters']
+        data['cost_up_to_date' if r['locked'] else 'cost_estimate'] += r['cost']
+    return consumers
 
-    # Machinery — computed from actual fuel_entries (source_type='machinery')
-    # Build a name lookup from machinery records
-    machinery_names = {m['id']: m['name'] for m in machinery}
-    for e in entries:
-        if e['source_type'] != 'machinery':
-            continue
-        m_name = machinery_names.get(e['assignment_id'], f"Machine #{e['assignment_id']}")
-        consumer_key = f"MACHINERY | {m_name}"
-        if consumer_key not in consumers:
-            consumers[consumer_key] = {'diesel_l': 0, 'petrol_l': 0, 'cost_up_to_date': 0, 'cost_estimate': 0}
-        ft = e.get('fuel_type', 'DIESEL')
-        liters = e.get('liters', 0) or 0
-        date = e.get('date', '')
-        if date in locked_prices:
-            price = locked_prices[date]['diesel_price'] if ft == 'DIESEL' else locked_prices[date]['petrol_price']
-            consumers[consumer_key]['cost_up_to_date'] += liters * price
-        else:
-            price = cur_diesel if ft == 'DIESEL' else cur_petrol
-            consumers[consumer_key]['cost_estimate'] += liters * price
-        if ft == 'PETROL':
-            consumers[consumer_key]['petrol_l'] += liters
-        else:
-            consumers[consumer_key]['diesel_l'] += liters
+
+@app.route("/api/productions/<int:prod_id>/export/fuel-budget/csv")
+def api_export_fuel_budget_csv(prod_id):
+    """Export fuel budget breakdown by consumer: total litres + total price.
+    Filename: KLAS7_FUEL_YYMMDD
+    """
+    from datetime import datetime as dt
+    prod = prod_or_404(prod_id)
+    date_from, date_to = _export_date_params()
+    fuel_costs = get_fuel_costs(prod_id)
+    cur_diesel = fuel_costs['diesel_price']
+    cur_petrol = fuel_costs['petrol_price']
+    priced = _filter_entries_by_date(fuel_costs['rows'], date_from, date_to)
+    consumers = _fuel_consumers(prod_id, priced)
 
     out = io.StringIO()
     w = csv.writer(out)
@@ -2829,23 +3090,10 @@ def api_export_fuel_budget_csv(prod_id):
     w.writerow([])
     grand_total_l = grand_diesel + grand_petrol
     grand_total_cost = grand_cost_utd + grand_cost_est
-    # Compute average price per fuel type (cost / litres for each type separately)
-    diesel_cost_total = 0
-    petrol_cost_total = 0
-    for e in entries:
-        ft = e.get('fuel_type', 'DIESEL')
-        liters = e.get('liters', 0) or 0
-        date = e.get('date', '')
-        if date in locked_prices:
-            price = locked_prices[date]['diesel_price'] if ft == 'DIESEL' else locked_prices[date]['petrol_price']
-        else:
-            price = cur_diesel if ft == 'DIESEL' else cur_petrol
-        if ft == 'PETROL':
-            petrol_cost_total += liters * price
-        else:
-            diesel_cost_total += liters * price
-    avg_diesel = diesel_cost_total / grand_diesel if grand_diesel > 0 else 0
-    avg_petrol = petrol_cost_total / grand_petrol if grand_petrol > 0 else 0
+    # Average price per fuel type (cost / litres for each type separately)
+    totals = summarize_fuel_costs(priced)
+    avg_diesel = totals['diesel_cost'] / grand_diesel if grand_diesel > 0 else 0
+    avg_petrol = totals['petrol_cost'] / grand_petrol if grand_petrol > 0 else 0
     w.writerow(["GRAND TOTAL", round(grand_diesel, 1), round(grand_petrol, 1),
                 round(grand_total_l, 1), round(grand_cost_utd, 2),
                 round(grand_cost_est, 2), round(grand_total_cost, 2)])
@@ -3285,6 +3533,19 @@ def api_delete_location_schedule_by_id(prod_id, schedule_id):
     return jsonify({"deleted": schedule_id})
 
 
+@app.route("/api/productions/<int:prod_id>/location-schedules/bulk", methods=["POST"])
+def api_bulk_location_schedules(prod_id):
+    """Apply a batch of location grid cell changes in one transaction.
+    Body: {changes: [{op: upsert|delete|lock, location_name|location_id, date, status, ...}]}.
+    Returns the resulting diff, including the guard cells created/removed by the sync."""
+    prod_or_404(prod_id)
+    changes = (request.json or {}).get('changes')
+    validate_schedule_cell_changes(changes, grid='location')
+    result = apply_schedule_cell_changes(prod_id, 'location', changes)
+    _snapshot_bulk_lock(prod_id, result, 'Location')
+    return jsonify(result)
+
+
 @app.route("/api/productions/<int:prod_id>/location-schedules/lock", methods=["PUT"])
 def api_lock_location_schedules(prod_id):
     prod_or_404(prod_id)
@@ -3337,27 +3598,9 @@ def api_sync_pdt_locations(prod_id):
 
 @app.route("/api/productions/<int:prod_id>/resync-pdt-locations", methods=["POST"])
 def api_resync_all_pdt_locations(prod_id):
-    """Full resync: iterate all shooting days and sync their locations."""
+    """Full resync of all shooting days' locations, applied in one transaction."""
     prod_or_404(prod_id)
-    days = get_shooting_days(prod_id)
-    total_log = {'created': [], 'matched': [], 'ignored': []}
-    for day in days:
-        day_date = day.get('date')
-        if not day_date:
-            continue
-        locations = []
-        if day.get('location'):
-            locations.append(day['location'])
-        events = get_events_for_day(day['id'])
-        for ev in events:
-            if ev.get('location'):
-                locations.append(ev['location'])
-        if locations:
-            log = sync_pdt_day_to_locations(prod_id, day_date, locations)
-            if log:
-                total_log['created'].extend(log.get('created', []))
-                total_log['matched'].extend(log.get('matched', []))
-                total_log['ignored'].extend(log.get('ignored', []))
+    total_log = resync_pdt_locations(prod_id)
     # Deduplicate
     total_log['created'] = list(set(total_log['created']))
     total_log['matched'] = list(set(total_log['matched']))
@@ -3416,11 +3659,40 @@ def api_lock_guard_location_schedules(prod_id):
     return jsonify({"ok": True})
 
 
+@app.route("/api/productions/<int:prod_id>/guard-schedules/bulk", methods=["POST"])
+def api_bulk_guard_location_schedules(prod_id):
+    """Apply a batch of guard grid cell changes (upsert/delete/lock) in one transaction."""
+    prod_or_404(prod_id)
+    changes = (request.json or {}).get('changes')
+    validate_schedule_cell_changes(changes, grid='guard')
+    result = apply_schedule_cell_changes(prod_id, 'guard', changes)
+    _snapshot_bulk_lock(prod_id, result, 'Guard')
+    return jsonify(result)
+
+
+def _snapshot_bulk_lock(prod_id, result, label):
+    """AXE 6.3: auto-snapshot when a bulk edit locked some dates."""
+    dates = [l['date'] for l in result.get('locked', []) if l['locked']]
+    if not dates:
+        return
+    try:
+        create_budget_snapshot(
+            prod_id, trigger_type='lock',
+            trigger_detail=f"{label} lock: {', '.join(dates[:5])}{'...' if len(dates) > 5 else ''}",
+            user_id=getattr(g, 'user_id', None),
+            user_nickname=getattr(g, 'nickname', None)
+        )
+    except Exception:
+        pass
+
+
 @app.route("/api/productions/<int:prod_id>/guard-schedules/sync", methods=["POST"])
 def api_sync_guard_location_schedules(prod_id):
-    """Sync guard_location_schedules from location_schedules (auto-populate defaults)."""
+    """Sync guard_location_schedules from location_schedules (auto-populate defaults).
+    ?diff=1 returns only the created/deleted rows instead of the full list."""
     prod_or_404(prod_id)
-    result = sync_guard_location_from_locations(prod_id)
+    diff = request.args.get('diff') in ('1', 'true')
+    result = sync_guard_location_from_locations(prod_id, diff=diff)
     return jsonify(result)
 
 
@@ -3495,29 +3767,8 @@ def api_bulk_create_guard_camp_workers(prod_id):
 
 @app.route("/api/productions/<int:prod_id>/guard-camp-workers/import-csv", methods=["POST"])
 def api_import_guard_camp_workers_csv(prod_id):
-    import csv, io
     prod_or_404(prod_id)
-    f = request.files.get("file")
-    if not f:
-        return jsonify({"error": "No file provided"}), 400
-    content = f.read().decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(content))
-    created = []
-    for row in reader:
-        name = (row.get("name") or "").strip()
-        if not name:
-            continue
-        rec = {
-            "production_id": prod_id,
-            "name": name,
-            "role": (row.get("role") or "").strip() or None,
-            "group_name": (row.get("group") or row.get("group_name") or "GENERAL").strip(),
-            "daily_rate_estimate": float(row.get("rate") or row.get("daily_rate_estimate") or 45),
-            "notes": (row.get("notes") or "").strip() or None,
-        }
-        wid = create_guard_camp_worker(rec)
-        created.append(wid)
-    return jsonify({"created": len(created), "ids": created}), 201
+    return _import_csv_upload(prod_id, "guard_camp_workers", _LABOUR_CSV_FIELDS)
 
 
 @app.route("/api/guard-camp-workers/<int:worker_id>", methods=["PUT"])
@@ -3584,6 +3835,33 @@ def api_duplicate_assignment(atype, assignment_id):
     return jsonify(result), 201
 
 
+@app.route("/api/productions/<int:prod_id>/assignments/<string:atype>/duplicate", methods=["POST"])
+def api_duplicate_assignments(prod_id, atype):
+    """Duplicate many assignments at once with dates shifted (default +7 days).
+    Body: { ids?: [..], boat_function_id?, function_group?, offset_days?: 7 }
+    (at least one selector). Copies keep their day overrides, shifted too."""
+    prod_or_404(prod_id)
+    table = _ASSIGNMENT_TABLES.get(atype)
+    if not table:
+        return jsonify({"error": f"Unknown assignment type: {atype}"}), 400
+    data = request.json or {}
+    ids = data.get("ids")
+    if ids is not None and (not isinstance(ids, list)
+                            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        raise ValidationError({"ids": "ids must be a list of assignment ids"})
+    if ids is None and not data.get("boat_function_id") and not data.get("function_group"):
+        raise ValidationError({"ids": "Give ids, boat_function_id or function_group"})
+    try:
+        offset = int(data.get("offset_days", 7))
+        func_id = int(data["boat_function_id"]) if data.get("boat_function_id") else None
+    except (ValueError, TypeError):
+        raise ValidationError({"offset_days": "offset_days and boat_function_id must be integers"})
+    rows = duplicate_assignments(table, prod_id, ids=ids, boat_function_id=func_id,
+                                 function_group=data.get("function_group") or None,
+                                 date_offset_days=offset)
+    return jsonify({"created": len(rows), "assignments": rows}), 201
+
+
 # ─── Bulk Operations (AXE 10.3) ───────────────────────────────────────────────
 
 _ENTITY_TABLES = {
@@ -3818,7 +4096,7 @@ def api_export_fnb_budget_csv(prod_id):
     from datetime import datetime as dt
     prod = prod_or_404(prod_id)
     date_from, date_to = _export_date_params()
-    budget = get_fnb_budget_data(prod_id)
+    budget = get_fnb_budget_data(prod_id, date_from, date_to)
 
     out = io.StringIO()
     w = csv.writer(out)
@@ -3972,10 +4250,12 @@ def api_delete_fnb_item(item_id):
 
 
 @app.route("/api/productions/<int:prod_id>/fnb-entries", methods=["GET"])
+@data_versioned("fnb_entries")
 def api_get_fnb_entries(prod_id):
     prod_or_404(prod_id)
     entry_type = request.args.get('type')
-    return jsonify(get_fnb_entries(prod_id, entry_type))
+    return jsonify_cached(get_fnb_entries(
+        prod_id, entry_type, query=parse_collection_query(request.args)))
 
 
 @app.route("/api/productions/<int:prod_id>/fnb-entries", methods=["POST"])
@@ -3999,9 +4279,17 @@ def api_delete_fnb_entry(entry_id):
 
 
 @app.route("/api/productions/<int:prod_id>/fnb-budget", methods=["GET"])
+@data_versioned("fnb_budget")
 def api_fnb_budget(prod_id):
+    """Category totals. Optional ?from=&to= window; ?by_date=1 adds the
+    per-date purchase/consumption costs."""
     prod_or_404(prod_id)
-    return jsonify(get_fnb_budget_data(prod_id))
+    date_from, date_to = _export_date_params()
+    for field, value in (("from", date_from), ("to", date_to)):
+        if value:
+            validate_iso_date(value, field)
+    by_date = request.args.get("by_date") == "1"
+    return jsonify_cached(get_fnb_budget_data(prod_id, date_from, date_to, by_date=by_date))
 
 
 # ─── Global Budget Export (multi-sheet Excel) ────────────────────────────────
@@ -4249,73 +4537,11 @@ def api_export_budget_global(prod_id):
 
     # ── Sheet 6: FUEL ─────────────────────────────────────────────────────────
     ws = wb.create_sheet("Fuel")
-    entries = get_fuel_entries(prod_id)
-    machinery = get_fuel_machinery(prod_id)
-    locked_prices = get_fuel_locked_prices()
-    cur_diesel = float(get_setting("fuel_price_diesel", "0"))
-    cur_petrol = float(get_setting("fuel_price_petrol", "0"))
-
-    # Build consumer breakdown (same logic as fuel-budget CSV export)
-    asgn_map = {}
-    for ctx, fetcher in [
-        ('boats', lambda: get_boat_assignments(prod_id, context='boats')),
-        ('picture_boats', lambda: get_picture_boat_assignments(prod_id)),
-        ('security_boats', lambda: get_security_boat_assignments(prod_id)),
-        ('transport', lambda: get_transport_assignments(prod_id)),
-    ]:
-        for a in fetcher():
-            asgn_map[(ctx, a['id'])] = (
-                a.get('boat_name_override') or a.get('boat_name') or
-                a.get('vehicle_name_override') or a.get('vehicle_name') or '?',
-                a.get('function_name') or '?'
-            )
-
-    consumers = {}
-    for e in entries:
-        if e['source_type'] == 'machinery':
-            continue  # handled separately below with proper name resolution
-        key = (e['source_type'], e['assignment_id'])
-        name_info = asgn_map.get(key, (f"#{e['assignment_id']}", '?'))
-        consumer_key = f"{e['source_type'].upper()} | {name_info[0]} | {name_info[1]}"
-        if consumer_key not in consumers:
-            consumers[consumer_key] = {'diesel_l': 0, 'petrol_l': 0, 'cost_up_to_date': 0, 'cost_estimate': 0}
-        ft = e.get('fuel_type', 'DIESEL')
-        liters = e.get('liters', 0) or 0
-        date = e.get('date', '')
-        if date in locked_prices:
-            price = locked_prices[date]['diesel_price'] if ft == 'DIESEL' else locked_prices[date]['petrol_price']
-            consumers[consumer_key]['cost_up_to_date'] += liters * price
-        else:
-            price = cur_diesel if ft == 'DIESEL' else cur_petrol
-            consumers[consumer_key]['cost_estimate'] += liters * price
-        if ft == 'PETROL':
-            consumers[consumer_key]['petrol_l'] += liters
-        else:
-            consumers[consumer_key]['diesel_l'] += liters
-
-    # Machinery entries from fuel_entries with source_type='machinery'
-    # Resolve machinery names for consumer keys
-    machinery_names = {m['id']: m['name'] for m in machinery}
-    for e in entries:
-        if e['source_type'] != 'machinery':
-            continue
-        m_name = machinery_names.get(e['assignment_id'], f"Machine #{e['assignment_id']}")
-        consumer_key = f"MACHINERY | {m_name}"
-        if consumer_key not in consumers:
-            consumers[consumer_key] = {'diesel_l': 0, 'petrol_l': 0, 'cost_up_to_date': 0, 'cost_estimate': 0}
-        ft = e.get('fuel_type', 'DIESEL')
-        liters = e.get('liters', 0) or 0
-        date = e.get('date', '')
-        if date in locked_prices:
-            price = locked_prices[date]['diesel_price'] if ft == 'DIESEL' else locked_prices[date]['petrol_price']
-            consumers[consumer_key]['cost_up_to_date'] += liters * price
-        else:
-            price = cur_diesel if ft == 'DIESEL' else cur_petrol
-            consumers[consumer_key]['cost_estimate'] += liters * price
-        if ft == 'PETROL':
-            consumers[consumer_key]['petrol_l'] += liters
-        else:
-            consumers[consumer_key]['diesel_l'] += liters
+    fuel_costs = get_fuel_costs(prod_id)
+    cur_diesel = fuel_costs['diesel_price']
+    cur_petrol = fuel_costs['petrol_price']
+    # Same consumer breakdown as the fuel-budget CSV export
+    consumers = _fuel_consumers(prod_id, fuel_costs['rows'])
 
     ws.append(["KLAS 7 - FUEL BUDGET"])
     ws.cell(row=1, column=1).font = title_font
@@ -4824,9 +5050,6 @@ def api_export_logistics(prod_id):
     transport_rows = get_transport_assignments(prod_id)
     fuel_entries = get_fuel_entries(prod_id)
     fuel_machinery = get_fuel_machinery(prod_id)
-    locked_prices = get_fuel_locked_prices()
-    cur_diesel = float(get_setting("fuel_price_diesel", "0"))
-    cur_petrol = float(get_setting("fuel_price_petrol", "0"))
     helper_rows = get_helper_assignments(prod_id)
     guard_loc_data = get_guard_location_schedules(prod_id)
     gc_rows = get_guard_camp_assignments(prod_id)
@@ -6150,24 +6373,16 @@ def api_today(prod_id):
             })
 
     # ── 8. Fuel for the day ──
-    fuel_entries = get_fuel_entries(prod_id)
-    fuel_today = [e for e in fuel_entries if e.get("date") == target_date]
-    cur_diesel = float(get_setting("fuel_price_diesel", "0"))
-    cur_petrol = float(get_setting("fuel_price_petrol", "0"))
-    locked_prices = get_fuel_locked_prices()
-    fuel_liters = sum(e.get("liters", 0) or 0 for e in fuel_today)
-    fuel_cost = 0
-    for e in fuel_today:
-        liters = e.get("liters", 0) or 0
-        ft = e.get("fuel_type", "DIESEL")
-        if target_date in locked_prices:
-            price = locked_prices[target_date]["diesel_price"] if ft == "DIESEL" else locked_prices[target_date]["petrol_price"]
-        else:
-            price = cur_diesel if ft == "DIESEL" else cur_petrol
-        fuel_cost += liters * price
+    fuel_costs = get_fuel_costs(prod_id)
+    fuel_today = summarize_fuel_costs(
+        [r for r in fuel_costs["rows"] if r["date"] == target_date])
+    cur_diesel = fuel_costs["diesel_price"]
+    cur_petrol = fuel_costs["petrol_price"]
+    fuel_liters = fuel_today["liters"]
+    fuel_cost = fuel_today["cost"]
 
     fuel_summary = {
-        "entries": len(fuel_today),
+        "entries": fuel_today["entries"],
         "total_liters": round(fuel_liters, 1),
         "total_cost": round(fuel_cost, 2),
         "diesel_price": cur_diesel,
@@ -6207,88 +6422,45 @@ def api_today(prod_id):
 
 # ─── Dashboard ───────────────────────────────────────────────────────────────
 
-@app.route("/api/productions/<int:prod_id>/dashboard", methods=["GET"])
-def api_dashboard(prod_id):
-    """Return budget summary, KPIs, and alerts for the dashboard."""
-    prod_or_404(prod_id)
-    from datetime import datetime as dt
-
-    shooting_days = get_shooting_days(prod_id)
-    budget = get_budget(prod_id)
-
-    # Gather all department totals
-    departments = {}
-
-    # Boats
-    boat_rows = [r for r in get_boat_assignments(prod_id, context='boats') if r.get("working_days")]
-    departments["boats"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in boat_rows),
-        "actual": sum(r.get("amount_actual") or 0 for r in boat_rows),
-        "count": len(boat_rows),
-    }
+_dashboard_cache = {}  # { prod_id: (production data version, aggregate) }
+_dashboard_cache_lock = threading.Lock()
 
-    # Picture boats
-    pb_rows = [r for r in get_picture_boat_assignments(prod_id) if r.get("working_days")]
-    departments["picture_boats"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in pb_rows),
-        "actual": sum(r.get("amount_actual") or 0 for r in pb_rows),
-        "count": len(pb_rows),
-    }
+_DASHBOARD_DEPT_LABELS = {
+    "boats": "Boats", "picture_boats": "Picture Boats",
+    "security_boats": "Security Boats", "transport": "Transport",
+    "labour": "Labour", "guards": "Guards",
+}
 
-    # Security boats
-    sb_rows = [r for r in get_security_boat_assignments(prod_id) if r.get("working_days")]
-    departments["security_boats"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in sb_rows),
-        "actual": sum(r.get("amount_actual") or 0 for r in sb_rows),
-        "count": len(sb_rows),
-    }
 
-    # Transport
-    tr_rows = [r for r in get_transport_assignments(prod_id) if r.get("working_days")]
-    departments["transport"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in tr_rows),
-        "actual": sum(r.get("amount_actual") or 0 for r in tr_rows),
-        "count": len(tr_rows),
+def _build_dashboard_aggregate(prod_id):
+    """Load every dashboard module once and derive the date-independent totals."""
+    assignments = {
+        "boats": get_boat_assignments(prod_id, context='boats'),
+        "picture_boats": get_picture_boat_assignments(prod_id),
+        "security_boats": get_security_boat_assignments(prod_id),
+        "transport": get_transport_assignments(prod_id),
+        "labour": get_helper_assignments(prod_id),
+        "guards": get_guard_camp_assignments(prod_id),
     }
 
-    # Labour
-    lb_rows = [r for r in get_helper_assignments(prod_id) if r.get("working_days")]
-    departments["labour"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in lb_rows),
-        "actual": sum(r.get("amount_actual") or 0 for r in lb_rows),
-        "count": len(lb_rows),
-    }
-
-    # Guards (base camp)
-    gc_rows = get_guard_camp_assignments(prod_id)
-    gc_active = [r for r in gc_rows if r.get("working_days")]
-    departments["guards"] = {
-        "estimate": sum(r.get("amount_estimate") or 0 for r in gc_active),
-        "actual": sum(r.get("amount_actual") or 0 for r in gc_active),
-        "count": len(gc_active),
-    }
+    # Assignment departments (only rows with working days count)
+    departments = {}
+    for key, rows in assignments.items():
+        active = [r for r in rows if r.get("working_days")]
+        departments[key] = {
+            "estimate": sum(r.get("amount_estimate") or 0 for r in active),
+            "actual": sum(r.get("amount_actual") or 0 for r in active),
+            "count": len(active),
+        }
 
     # Fuel
-    fuel_entries = get_fuel_entries(prod_id)
-    cur_diesel = float(get_setting("fuel_price_diesel", "0"))
-    cur_petrol = float(get_setting("fuel_price_petrol", "0"))
-    locked_prices = get_fuel_locked_prices()
-    fuel_total = 0
-    fuel_liters = 0
-    for e in fuel_entries:
-        liters = e.get("liters", 0) or 0
-        fuel_liters += liters
-        ft = e.get("fuel_type", "DIESEL")
-        date = e.get("date", "")
-        if date in locked_prices:
-            price = locked_prices[date]["diesel_price"] if ft == "DIESEL" else locked_prices[date]["petrol_price"]
-        else:
-            price = cur_diesel if ft == "DIESEL" else cur_petrol
-        fuel_total += liters * price
+    fuel_totals = get_fuel_costs(prod_id)["totals"]
+    fuel_total = fuel_totals["cost"]
+    fuel_liters = fuel_totals["liters"]
     departments["fuel"] = {
         "estimate": fuel_total,
         "actual": fuel_total,
-        "count": len(fuel_entries),
+        "count": fuel_totals["entries"],
         "liters": round(fuel_liters, 0),
     }
 
@@ -6335,23 +6507,8 @@ def api_dashboard(prod_id):
         "count": len(fnb_budget.get("categories", [])),
     }
 
-    # Compute grand totals
-    total_estimate = sum(d["estimate"] for d in departments.values())
-    total_actual = sum(d["actual"] for d in departments.values())
-
-    # Compute KPIs
-    pdt_dates = sorted(set(d.get("date", "") for d in shooting_days if d.get("date")))
-    days_elapsed = 0
-    days_remaining = 0
-    today = dt.now().strftime("%Y-%m-%d")
-    if pdt_dates:
-        days_elapsed = sum(1 for d in pdt_dates if d <= today)
-        days_remaining = sum(1 for d in pdt_dates if d > today)
-
-    burn_rate = total_actual / max(days_elapsed, 1)
-
     # Variance % per department
-    for dept_name, dept_data in departments.items():
+    for dept_data in departments.values():
         est = dept_data["estimate"]
         act = dept_data["actual"]
         if est > 0:
@@ -6361,34 +6518,104 @@ def api_dashboard(prod_id):
             dept_data["variance_pct"] = 0.0
             dept_data["usage_pct"] = 0.0
 
-    # Alerts (75% = caution, 90% = warning, 100%+ = over_budget)
-    alerts = []
+    # Budget usage alerts (75% = caution, 90% = warning, 100%+ = over_budget)
+    budget_alerts = []
     for dept_name, dept_data in departments.items():
         est = dept_data["estimate"]
         act = dept_data["actual"]
         if est > 0 and act > 0:
             pct = round(act / est * 100)
+            label = dept_name.replace('_', ' ').title()
             if pct >= 100:
-                alerts.append({
-                    "type": "over_budget",
-                    "dept": dept_name,
-                    "pct": pct,
-                    "msg": f"{dept_name.replace('_', ' ').title()} is at {pct}% of estimate"
-                })
+                budget_alerts.append({"type": "over_budget", "dept": dept_name, "pct": pct,
+                                      "msg": f"{label} is at {pct}% of estimate"})
             elif pct >= 90:
-                alerts.append({
-                    "type": "warning",
-                    "dept": dept_name,
-                    "pct": pct,
-                    "msg": f"{dept_name.replace('_', ' ').title()} approaching budget ({pct}%)"
-                })
+                budget_alerts.append({"type": "warning", "dept": dept_name, "pct": pct,
+                                      "msg": f"{label} approaching budget ({pct}%)"})
             elif pct >= 75:
-                alerts.append({
-                    "type": "caution",
-                    "dept": dept_name,
-                    "pct": pct,
-                    "msg": f"{dept_name.replace('_', ' ').title()} at {pct}% of budget"
-                })
+                budget_alerts.append({"type": "caution", "dept": dept_name, "pct": pct,
+                                      "msg": f"{label} at {pct}% of budget"})
+
+    # PDT dates and arena days (events come embedded with each shooting day)
+    shooting_days = get_shooting_days(prod_id)
+    pdt_dates = sorted(set(d.get("date", "") for d in shooting_days if d.get("date")))
+    arena_dates = sorted(
+        d["date"] for d in shooting_days
+        if d.get("date") and any(ev.get("event_type") == "arena" for ev in d.get("events", []))
+    )
+
+    return {
+        "assignments": assignments,
+        "fleet": (assignments["boats"] + assignments["picture_boats"]
+                  + assignments["security_boats"] + assignments["transport"]),
+        "crew": assignments["labour"] + assignments["guards"],
+        "departments": departments,
+        "total_estimate": sum(d["estimate"] for d in departments.values()),
+        "total_actual": sum(d["actual"] for d in departments.values()),
+        "assignments_estimate": sum(departments[k]["estimate"] for k in assignments),
+        "fuel_liters": round(fuel_liters, 0),
+        "budget_alerts": budget_alerts,
+        "shooting_days_total": len(shooting_days),
+        "pdt_dates": pdt_dates,
+        "arena_dates": arena_dates,
+        "daily": None,  # filled lazily by _dashboard_daily()
+    }
+
+
+def _get_dashboard_aggregate(prod_id):
+    """Return the shared dashboard aggregate for a production.
+
+    Computed once per production data version (writes to other productions
+    keep it) and reused by /dashboard, /dashboard/kpis, /dashboard/alerts,
+    /dashboard/burnrate and the PDF export. The aggregate is shared between
+    requests: treat it as read-only; only _dashboard_daily() fills "daily",
+    under _dashboard_cache_lock.
+    """
+    if in_shared_transaction():
+        return _build_dashboard_aggregate(prod_id)
+    version = get_production_version(prod_id, _MODULE_TABLES["dashboard"])
+    cached = _dashboard_cache.get(prod_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    aggregate = _build_dashboard_aggregate(prod_id)
+    with _dashboard_cache_lock:
+        _dashboard_cache[prod_id] = (version, aggregate)
+    return aggregate
+
+
+def _dashboard_daily(prod_id, aggregate):
+    """Daily budget breakdown for the aggregate, computed on first use and
+    published under _dashboard_cache_lock (the first result wins)."""
+    daily = aggregate["daily"]
+    if daily is None:
+        daily = get_daily_budget(prod_id, assignments=aggregate["assignments"])
+        with _dashboard_cache_lock:
+            if aggregate["daily"] is None:
+                aggregate["daily"] = daily
+            daily = aggregate["daily"]
+    return daily
+
+
+@app.route("/api/productions/<int:prod_id>/dashboard", methods=["GET"])
+@data_versioned("dashboard", daily=True)
+def api_dashboard(prod_id):
+    """Return budget summary, KPIs, and alerts for the dashboard."""
+    prod_or_404(prod_id)
+    from datetime import datetime as dt
+
+    agg = _get_dashboard_aggregate(prod_id)
+    total_actual = agg["total_actual"]
+    pdt_dates = agg["pdt_dates"]
+
+    # Compute KPIs
+    days_elapsed = 0
+    days_remaining = 0
+    today = dt.now().strftime("%Y-%m-%d")
+    if pdt_dates:
+        days_elapsed = sum(1 for d in pdt_dates if d <= today)
+        days_remaining = sum(1 for d in pdt_dates if d > today)
+
+    burn_rate = total_actual / max(days_elapsed, 1)
 
     # Cumulative burn rate data per shooting day (for burn rate chart)
     burn_data = []
@@ -6397,65 +6624,44 @@ def api_dashboard(prod_id):
         if elapsed_dates:
             daily_rate = total_actual / len(elapsed_dates)
             cumulative = 0
-            for i, d in enumerate(pdt_dates):
-                if d <= today:
-                    cumulative += daily_rate
-                    burn_data.append({"date": d, "cumulative": round(cumulative, 2), "is_actual": True})
-                else:
-                    # Linear projection from current burn rate
-                    cumulative += daily_rate
-                    burn_data.append({"date": d, "cumulative": round(cumulative, 2), "is_actual": False})
+            for d in pdt_dates:
+                # Past days are actuals, future days a linear projection
+                cumulative += daily_rate
+                burn_data.append({"date": d, "cumulative": round(cumulative, 2), "is_actual": d <= today})
 
     # Next arena day
-    next_arena = None
-    for day in shooting_days:
-        if day.get("date", "") > today:
-            # Check if it has arena events
-            events = get_events_for_day(day["id"])
-            for ev in events:
-                if ev.get("event_type") == "arena":
-                    next_arena = day["date"]
-                    break
-            if next_arena:
-                break
+    next_arena = next((d for d in agg["arena_dates"] if d > today), None)
 
     return jsonify_cached({
-        "departments": departments,
-        "total_estimate": round(total_estimate, 2),
+        "departments": agg["departments"],
+        "total_estimate": round(agg["total_estimate"], 2),
         "total_actual": round(total_actual, 2),
         "kpis": {
-            "shooting_days_total": len(shooting_days),
+            "shooting_days_total": agg["shooting_days_total"],
             "days_elapsed": days_elapsed,
             "days_remaining": days_remaining,
             "burn_rate_per_day": round(burn_rate, 2),
             "projected_total": round(burn_rate * (days_elapsed + days_remaining), 2),
             "next_arena": next_arena,
-            "fuel_liters": round(fuel_liters, 0),
+            "fuel_liters": agg["fuel_liters"],
         },
-        "alerts": alerts,
+        "alerts": agg["budget_alerts"],
         "burn_data": burn_data,
     })
 
 
 # ─── Executive Dashboard KPIs (P5.1) ──────────────────────────────────────────
 
-@app.route("/api/productions/<int:prod_id>/dashboard/kpis", methods=["GET"])
-def api_dashboard_kpis(prod_id):
-    """Return executive KPIs: fleet coverage, crew coverage, unconfirmed assignments, breakdowns."""
-    prod_or_404(prod_id)
+def _dashboard_kpis_payload(prod_id):
+    """Executive KPIs: fleet coverage, crew coverage, unconfirmed assignments, breakdowns."""
     from datetime import datetime as dt, timedelta
 
     from database import _is_assignment_active_on
 
-    today = dt.now().strftime("%Y-%m-%d")
+    agg = _get_dashboard_aggregate(prod_id)
     horizon = [(dt.now() + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
-
-    # All fleet assignments (boats + picture boats + security boats + transport)
-    boat_assigns = get_boat_assignments(prod_id, context='boats')
-    pb_assigns = get_picture_boat_assignments(prod_id)
-    sb_assigns = get_security_boat_assignments(prod_id)
-    tr_assigns = get_transport_assignments(prod_id)
-    fleet_all = boat_assigns + pb_assigns + sb_assigns + tr_assigns
+    fleet_all = agg["fleet"]
+    crew_all = agg["crew"]
 
     # Fleet coverage: % of functions with a vessel/vehicle assigned for next 3 days
     functions_needing = 0
@@ -6472,10 +6678,6 @@ def api_dashboard_kpis(prod_id):
     fleet_coverage = round(functions_covered / max(functions_needing, 1) * 100, 1)
 
     # Crew coverage: % of guard + labour posts filled
-    helper_assigns = get_helper_assignments(prod_id)
-    guard_assigns = get_guard_camp_assignments(prod_id)
-    crew_all = helper_assigns + guard_assigns
-
     crew_needing = 0
     crew_covered = 0
     for a in crew_all:
@@ -6489,12 +6691,10 @@ def api_dashboard_kpis(prod_id):
     crew_coverage = round(crew_covered / max(crew_needing, 1) * 100, 1)
 
     # Unconfirmed at J-2 (assignments still 'estimate' within 2 days)
-    j2 = [(dt.now() + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
-    all_assigns = fleet_all + crew_all
     unconfirmed = 0
-    for a in all_assigns:
+    for a in fleet_all + crew_all:
         if a.get("assignment_status") == "estimate":
-            for d in j2:
+            for d in horizon:
                 if _is_assignment_active_on(d, a):
                     unconfirmed += 1
                     break
@@ -6502,38 +6702,34 @@ def api_dashboard_kpis(prod_id):
     # Breakdowns: fleet items with status 'breakdown'
     breakdowns = sum(1 for a in fleet_all if a.get("assignment_status") == "breakdown")
 
-    return jsonify({
+    return {
         "fleet_coverage": fleet_coverage,
         "crew_coverage": crew_coverage,
         "unconfirmed_assignments": unconfirmed,
         "breakdowns": breakdowns,
-    })
+    }
 
 
-@app.route("/api/productions/<int:prod_id>/dashboard/alerts", methods=["GET"])
-def api_dashboard_alerts(prod_id):
-    """Return executive alerts: unconfirmed at J-2, breakdowns, budget overruns >10%."""
+@app.route("/api/productions/<int:prod_id>/dashboard/kpis", methods=["GET"])
+def api_dashboard_kpis(prod_id):
+    """Return executive KPIs: fleet coverage, crew coverage, unconfirmed assignments, breakdowns."""
     prod_or_404(prod_id)
+    return jsonify(_dashboard_kpis_payload(prod_id))
+
+
+def _dashboard_alerts_payload(prod_id):
+    """Executive alerts: unconfirmed at J-2, breakdowns, budget overruns >10%."""
     from datetime import datetime as dt, timedelta
 
     from database import _is_assignment_active_on
 
-    today = dt.now().strftime("%Y-%m-%d")
+    agg = _get_dashboard_aggregate(prod_id)
     j2 = [(dt.now() + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
     alerts = []
-
-    # All assignments
-    boat_assigns = get_boat_assignments(prod_id, context='boats')
-    pb_assigns = get_picture_boat_assignments(prod_id)
-    sb_assigns = get_security_boat_assignments(prod_id)
-    tr_assigns = get_transport_assignments(prod_id)
-    helper_assigns = get_helper_assignments(prod_id)
-    guard_assigns = get_guard_camp_assignments(prod_id)
-    fleet_all = boat_assigns + pb_assigns + sb_assigns + tr_assigns
-    all_assigns = fleet_all + helper_assigns + guard_assigns
+    fleet_all = agg["fleet"]
 
     # 1. Unconfirmed assignments at J-2
-    for a in all_assigns:
+    for a in fleet_all + agg["crew"]:
         if a.get("assignment_status") == "estimate":
             for d in j2:
                 if _is_assignment_active_on(d, a):
@@ -6559,54 +6755,41 @@ def api_dashboard_alerts(prod_id):
                 "entity_id": a.get("id"),
             })
 
-    # 3. Budget overruns >10% per department
-    dept_data = {}
-    def _add_dept(key, rows):
-        est = sum(r.get("amount_estimate") or 0 for r in rows if r.get("working_days"))
-        act = sum(r.get("amount_actual") or 0 for r in rows if r.get("working_days"))
-        dept_data[key] = {"estimate": est, "actual": act}
-
-    _add_dept("boats", boat_assigns)
-    _add_dept("picture_boats", pb_assigns)
-    _add_dept("security_boats", sb_assigns)
-    _add_dept("transport", tr_assigns)
-    _add_dept("labour", helper_assigns)
-    _add_dept("guards", guard_assigns)
-
-    dept_labels = {
-        "boats": "Boats", "picture_boats": "Picture Boats",
-        "security_boats": "Security Boats", "transport": "Transport",
-        "labour": "Labour", "guards": "Guards",
-    }
-    for key, d in dept_data.items():
-        est = d["estimate"]
-        act = d["actual"]
+    # 3. Budget overruns >10% per assignment department
+    for key, label in _DASHBOARD_DEPT_LABELS.items():
+        est = agg["departments"][key]["estimate"]
+        act = agg["departments"][key]["actual"]
         if est > 0:
             overrun_pct = round((act - est) / est * 100, 1)
             if overrun_pct > 10:
                 alerts.append({
                     "type": "budget_overrun",
                     "severity": "danger" if overrun_pct > 25 else "warning",
-                    "msg": f"{dept_labels.get(key, key)}: +{overrun_pct}% over budget",
+                    "msg": f"{label}: +{overrun_pct}% over budget",
                     "dept": key,
                     "overrun_pct": overrun_pct,
                 })
-                _notify_budget_overrun(prod_id, dept_labels.get(key, key), overrun_pct)
+                _notify_budget_overrun(prod_id, label, overrun_pct)
 
-    return jsonify({"alerts": alerts, "count": len(alerts)})
+    return {"alerts": alerts, "count": len(alerts)}
 
 
-@app.route("/api/productions/<int:prod_id>/dashboard/burnrate", methods=["GET"])
-def api_dashboard_burnrate(prod_id):
-    """Return burn rate data: cumulative spend per day, linear projection, % consumed."""
+@app.route("/api/productions/<int:prod_id>/dashboard/alerts", methods=["GET"])
+def api_dashboard_alerts(prod_id):
+    """Return executive alerts: unconfirmed at J-2, breakdowns, budget overruns >10%."""
     prod_or_404(prod_id)
+    return jsonify(_dashboard_alerts_payload(prod_id))
+
+
+def _dashboard_burnrate_payload(prod_id):
+    """Burn rate data: cumulative spend per day, linear projection, % consumed."""
     from datetime import datetime as dt
 
-    shooting_days = get_shooting_days(prod_id)
+    agg = _get_dashboard_aggregate(prod_id)
     today = dt.now().strftime("%Y-%m-%d")
 
     # Get daily budget breakdown
-    daily = get_daily_budget(prod_id)
+    daily = _dashboard_daily(prod_id, agg)
     days_list = daily.get("days", [])
 
     # Cumulative spend per day
@@ -6646,19 +6829,11 @@ def api_dashboard_burnrate(prod_id):
             projected_cumulative += daily_rate
             d["projected_cumulative"] = round(projected_cumulative, 2)
 
-    # Total budget estimate
-    boat_assigns = get_boat_assignments(prod_id, context='boats')
-    pb_assigns = get_picture_boat_assignments(prod_id)
-    sb_assigns = get_security_boat_assignments(prod_id)
-    tr_assigns = get_transport_assignments(prod_id)
-    helper_assigns = get_helper_assignments(prod_id)
-    guard_assigns = get_guard_camp_assignments(prod_id)
-    all_assigns = boat_assigns + pb_assigns + sb_assigns + tr_assigns + helper_assigns + guard_assigns
-
-    total_estimate = sum(r.get("amount_estimate") or 0 for r in all_assigns if r.get("working_days"))
+    # Total budget estimate (assignment departments)
+    total_estimate = agg["assignments_estimate"]
     budget_consumed_pct = round(total_spent / max(total_estimate, 1) * 100, 1)
 
-    return jsonify({
+    return {
         "burn_data": burn_data,
         "total_spent": round(total_spent, 2),
         "total_estimate": round(total_estimate, 2),
@@ -6667,7 +6842,14 @@ def api_dashboard_burnrate(prod_id):
         "projected_total": round(daily_rate * total_days, 2),
         "days_elapsed": days_elapsed,
         "days_remaining": days_remaining,
-    })
+    }
+
+
+@app.route("/api/productions/<int:prod_id>/dashboard/burnrate", methods=["GET"])
+def api_dashboard_burnrate(prod_id):
+    """Return burn rate data: cumulative spend per day, linear projection, % consumed."""
+    prod_or_404(prod_id)
+    return jsonify(_dashboard_burnrate_payload(prod_id))
 
 
 # ─── Export PDF Dashboard (P5.4) ─────────────────────────────────────────────
@@ -6680,10 +6862,10 @@ def api_export_dashboard_pdf(prod_id):
 
     prod = prod_or_404(prod_id)
 
-    # Fetch KPI data by calling endpoint functions directly
-    kpis = api_dashboard_kpis(prod_id).get_json()
-    alerts_data = api_dashboard_alerts(prod_id).get_json()
-    burnrate = api_dashboard_burnrate(prod_id).get_json()
+    # All three payloads read from the same cached dashboard aggregate
+    kpis = _dashboard_kpis_payload(prod_id)
+    alerts_data = _dashboard_alerts_payload(prod_id)
+    burnrate = _dashboard_burnrate_payload(prod_id)
 
     production_name = prod.get("name", prod.get("title", f"Production #{prod_id}"))
     pdf_bytes = generate_dashboard_pdf(production_name, kpis, alerts_data, burnrate)
@@ -6701,172 +6883,21 @@ def api_export_dashboard_pdf(prod_id):
 
 @app.route("/api/productions/<int:prod_id>/alerts", methods=["GET"])
 def api_alerts(prod_id):
-    """Detect scheduling conflicts and return alerts:
+    """Scheduling conflicts, danger first:
     - Boats assigned on Off days
     - Locations in Film without guards
-    - Cumulative boat capacity issues
+    - Boat function groups with only unknown-capacity boats
+    Alerts are kept up to date as the schedule is edited (see get_alerts).
     """
     prod_or_404(prod_id)
-
-    alerts = []
-
-    # ── 1. Boats assigned on Off days ──
-    shooting_days = get_shooting_days(prod_id)
-    # Build a set of dates that are "off" days (have at least one 'off' event)
-    off_dates = set()
-    day_date_map = {}  # date -> day info
-    for day in shooting_days:
-        d = day.get("date", "")
-        if not d:
-            continue
-        day_date_map[d] = day
-        for ev in day.get("events", []):
-            if (ev.get("event_type") or "").lower() == "off":
-                off_dates.add(d)
-
-    if off_dates:
-        # Check boat assignments (all contexts: boats, picture_boats, security_boats)
-        for context_label, getter in [
-            ("Boats", lambda: get_boat_assignments(prod_id, context='boats')),
-            ("Picture Boats", lambda: get_picture_boat_assignments(prod_id)),
-            ("Security Boats", lambda: get_security_boat_assignments(prod_id)),
-        ]:
-            assignments = getter()
-            for asgn in assignments:
-                start = (asgn.get("start_date") or "")[:10]
-                end = (asgn.get("end_date") or "")[:10]
-                if not start or not end:
-                    continue
-                overrides = json.loads(asgn.get("day_overrides") or "{}")
-                boat_name = asgn.get("boat_name") or asgn.get("boat_name_override") or "Unknown"
-                func_name = asgn.get("function_name") or ""
-                for off_d in off_dates:
-                    if off_d < start or off_d > end:
-                        # Check if override explicitly activates this date
-                        ov = overrides.get(off_d, "")
-                        if ov and ov != "empty":
-                            alerts.append({
-                                "type": "boat_on_off",
-                                "severity": "warning",
-                                "module": context_label.lower().replace(" ", "_"),
-                                "date": off_d,
-                                "msg": f"{context_label}: '{boat_name}' ({func_name}) assigned on Off day {off_d}",
-                                "entity": boat_name,
-                                "function": func_name,
-                            })
-                        continue
-                    # Date is in range - check if override disables it
-                    ov = overrides.get(off_d, "")
-                    if ov == "empty":
-                        continue  # Explicitly disabled, no conflict
-                    alerts.append({
-                        "type": "boat_on_off",
-                        "severity": "warning",
-                        "module": context_label.lower().replace(" ", "_"),
-                        "date": off_d,
-                        "msg": f"{context_label}: '{boat_name}' ({func_name}) assigned on Off day {off_d}",
-                        "entity": boat_name,
-                        "function": func_name,
-                    })
-
-    # ── 2. Locations in Film without guards ──
-    loc_schedules = get_location_schedules(prod_id)
-    guard_loc_schedules = get_guard_location_schedules(prod_id)
-
-    # Build guard lookup: {(location_name, date): nb_guards}
-    guard_lookup = {}
-    for gs in guard_loc_schedules:
-        key = (gs["location_name"], gs["date"])
-        guard_lookup[key] = gs.get("nb_guards") or 0
-
-    for ls in loc_schedules:
-        if ls.get("status") == "F":  # Film day
-            loc_name = ls["location_name"]
-            date = ls["date"]
-            nb_guards = guard_lookup.get((loc_name, date), 0)
-            if nb_guards == 0:
-                alerts.append({
-                    "type": "film_no_guards",
-                    "severity": "danger",
-                    "module": "guards",
-                    "date": date,
-                    "msg": f"Location '{loc_name}' in Film on {date} with no guards assigned",
-                    "entity": loc_name,
-                })
-
-    # ── 3. Cumulative boat capacity vs function needs ──
-    # For each date, sum up the capacity of all assigned boats per function group
-    # Flag if any function has boats with capacity "?" or total seems low
-    boat_assignments = get_boat_assignments(prod_id, context='boats')
-    boats_data = get_boats(prod_id)
-    boat_cap_map = {}  # boat_id -> numeric capacity (None if "EQ" or "?")
-    for b in boats_data:
-        cap = b.get("capacity", "")
-        try:
-            boat_cap_map[b["id"]] = int(cap)
-        except (ValueError, TypeError):
-            boat_cap_map[b["id"]] = None
-
-    # Group assignments by function_group + date
-    from collections import defaultdict
-    func_group_daily_cap = defaultdict(lambda: {"total_cap": 0, "unknown": 0, "boats": []})
-
-    for asgn in boat_assignments:
-        start = (asgn.get("start_date") or "")[:10]
-        end = (asgn.get("end_date") or "")[:10]
-        if not start or not end:
-            continue
-        overrides = json.loads(asgn.get("day_overrides") or "{}")
-        fg = asgn.get("function_group") or "Other"
-        boat_id = asgn.get("boat_id")
-        cap = boat_cap_map.get(boat_id)
-        boat_name = asgn.get("boat_name") or asgn.get("boat_name_override") or "Unknown"
-
-        # Iterate through all PDT dates
-        for day in shooting_days:
-            d = day.get("date", "")
-            if not d or d in off_dates:
-                continue
-            # Check if assignment is active on this date
-            if d in overrides:
-                if overrides[d] == "empty":
-                    continue
-            elif d < start or d > end:
-                continue
-
-            key = (fg, d)
-            if cap is not None:
-                func_group_daily_cap[key]["total_cap"] += cap
-            else:
-                func_group_daily_cap[key]["unknown"] += 1
-            func_group_daily_cap[key]["boats"].append(boat_name)
-
-    # Check for function groups with only unknown-capacity boats
-    seen_cap_alerts = set()
-    for (fg, d), info in func_group_daily_cap.items():
-        if info["unknown"] > 0 and info["total_cap"] == 0 and len(info["boats"]) > 0:
-            alert_key = f"{fg}"
-            if alert_key not in seen_cap_alerts:
-                seen_cap_alerts.add(alert_key)
-                alerts.append({
-                    "type": "capacity_unknown",
-                    "severity": "info",
-                    "module": "boats",
-                    "date": d,
-                    "msg": f"Boats ({fg}): all boats have unknown capacity - verify manually",
-                    "entity": fg,
-                })
-
-    # Sort alerts: danger first, then warning, then info
-    severity_order = {"danger": 0, "warning": 1, "info": 2}
-    alerts.sort(key=lambda a: (severity_order.get(a.get("severity"), 3), a.get("date", "")))
-
+    alerts = get_alerts(prod_id)
     return jsonify({"alerts": alerts, "count": len(alerts)})
 
 
 # ─── Budget Daily (AXE 6.2) ──────────────────────────────────────────────────
 
 @app.route("/api/productions/<int:prod_id>/budget/daily", methods=["GET"])
+@data_versioned("budget_daily")
 def api_budget_daily(prod_id):
     """Return cost breakdown per shooting day."""
     prod_or_404(prod_id)
@@ -6970,7 +7001,7 @@ def api_budget_snapshot_detail(prod_id, snap_id):
 def api_delete_budget_snapshot(prod_id, snap_id):
     """Delete a budget snapshot."""
     prod_or_404(prod_id)
-    snap = get_budget_snapshot(snap_id)
+    snap = get_budget_snapshot(snap_id, with_data=False)
     if not snap or snap['production_id'] != prod_id:
         abort(404)
     delete_budget_snapshot(snap_id)
@@ -7113,6 +7144,51 @@ def api_mark_all_read():
     return jsonify({"ok": True})
 
 
+# ─── Live events (Server-Sent Events) ───────────────────────────────────────
+# One stream per open project tab: "notifications" (unread count, on connect),
+# "notification" (new notification for this user), "change" (history-logged
+# write) and "resync" (events were missed: refetch everything). Streams end
+# after SSE_MAX_SECONDS; EventSource-style clients reconnect with Last-Event-ID.
+
+SSE_HEARTBEAT_SECONDS = int(os.environ.get("SSE_HEARTBEAT_SECONDS", "20"))
+SSE_MAX_SECONDS = int(os.environ.get("SSE_MAX_SECONDS", "600"))
+
+
+@app.route("/api/productions/<int:prod_id>/events", methods=["GET"])
+def api_production_events(prod_id):
+    prod_or_404(prod_id)
+    user_id = g.user_id
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    sub = events.subscribe(prod_id, user_id, last_event_id=last_event_id)
+    if sub is None:
+        # Stream slots are full: the client falls back to polling the count
+        resp = jsonify({"error": "Too many open event streams"})
+        resp.headers["Retry-After"] = str(SSE_HEARTBEAT_SECONDS)
+        return resp, 503
+    unread = get_unread_notification_count(user_id, prod_id)
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield events.format_sse(None, "notifications", {"unread": unread})
+            deadline = _time.monotonic() + SSE_MAX_SECONDS
+            while _time.monotonic() < deadline:
+                item = sub.get(timeout=SSE_HEARTBEAT_SECONDS)
+                yield events.format_sse(*item) if item else ": ping\n\n"
+        finally:
+            events.unsubscribe(sub)
+
+    resp = Response(stream(), mimetype="text/event-stream")
+    resp.call_on_close(lambda: events.unsubscribe(sub))  # also if never iterated
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # no proxy buffering
+    return resp
+
+
 # ─── Notification triggers (AXE 9.2) ────────────────────────────────────────
 # Helper to send notifications on key mutations. Called from within endpoints.
 
@@ -7178,7 +7254,7 @@ _CSV_TEMPLATES = {
     "boats": {
         "header": "name,boat_nr,capacity,wave_rating,captain,vendor,group_name,daily_rate_estimate,night_ok,notes",
         "example": "Panga 1,1,12,Waves,Carlos,QS Marine,Shared,80,0,Fast boat",
-        "create_fn": "create_boat",
+        "table": "boats",
         "fields": {
             "name": {"type": "str", "required": True},
             "boat_nr": {"type": "int"},
@@ -7195,7 +7271,7 @@ _CSV_TEMPLATES = {
     "picture_boats": {
         "header": "name,boat_nr,capacity,wave_rating,captain,vendor,group_name,daily_rate_estimate,night_ok,notes",
         "example": "Camera Boat A,1,8,Waves,Pedro,QS Marine,Custom,120,0,Stabilized",
-        "create_fn": "create_picture_boat",
+        "table": "picture_boats",
         "fields": {
             "name": {"type": "str", "required": True},
             "boat_nr": {"type": "int"},
@@ -7212,7 +7288,7 @@ _CSV_TEMPLATES = {
     "security_boats": {
         "header": "name,boat_nr,capacity,wave_rating,captain,vendor,group_name,daily_rate_estimate,night_ok,notes",
         "example": "Safety 1,1,6,Big Waves,Jose,Local,SAFETY,60,1,Night capable",
-        "create_fn": "create_security_boat",
+        "table": "security_boats",
         "fields": {
             "name": {"type": "str", "required": True},
             "boat_nr": {"type": "int"},
@@ -7229,7 +7305,7 @@ _CSV_TEMPLATES = {
     "transport": {
         "header": "name,vehicle_nr,type,driver,vendor,group_name,daily_rate_estimate,notes",
         "example": "SUV-01,1,SUV,Miguel,Rent-a-Car,UNIT,120,Air conditioned",
-        "create_fn": "create_transport_vehicle",
+        "table": "transport_vehicles",
         "fields": {
             "name": {"type": "str", "required": True},
             "vehicle_nr": {"type": "int"},
@@ -7244,7 +7320,7 @@ _CSV_TEMPLATES = {
     "locations": {
         "header": "name,type,location_type,lat,lng,access_note,price_p,price_f,price_w,global_deal",
         "example": "Mogo Mogo,ile,game,8.35,-78.92,By boat only,100,200,100,",
-        "create_fn": "create_location_site",
+        "table": "locations",
         "fields": {
             "name": {"type": "str", "required": True},
             "type": {"type": "str", "default": "ile"},
@@ -7260,86 +7336,120 @@ _CSV_TEMPLATES = {
     },
 }
 
-# Map create function names to actual functions
-_CSV_CREATE_FNS = {
-    "create_boat": create_boat,
-    "create_picture_boat": create_picture_boat,
-    "create_security_boat": create_security_boat,
-    "create_transport_vehicle": create_transport_vehicle,
-    "create_location_site": create_location_site,
+# Helpers and guard camp workers share one layout: their template uses the
+# "group" and "rate" headers, the column names are accepted too
+_LABOUR_CSV_FIELDS = {
+    "name": {"type": "str", "required": True},
+    "role": {"type": "str"},
+    "group_name": {"type": "str", "default": "GENERAL", "aliases": ("group",)},
+    "daily_rate_estimate": {"type": "float", "default": 45, "aliases": ("rate",)},
+    "notes": {"type": "str"},
 }
 
+# Rows validated and inserted per batch (one multi-row INSERT or executemany)
+CSV_IMPORT_BATCH = int(os.environ.get("CSV_IMPORT_BATCH", "500"))
 
-@app.route("/api/productions/<int:prod_id>/import-csv/<string:module>", methods=["POST"])
-def api_import_csv(prod_id, module):
-    """Generic CSV import. Module: boats, picture_boats, security_boats, transport, locations."""
-    prod_or_404(prod_id)
-    tpl = _CSV_TEMPLATES.get(module)
-    if not tpl:
-        return jsonify({"error": f"Unknown module: {module}. Available: {', '.join(_CSV_TEMPLATES.keys())}"}), 400
 
+def _parse_csv_row(row, fields):
+    """Coerce one CSV row with a _CSV_TEMPLATES-style field spec.
+    Returns (record, errors); invalid values fall back to the field default."""
+    rec, errors = {}, []
+    for field_name, field_spec in fields.items():
+        raw = ""
+        for key in (*field_spec.get("aliases", ()), field_name):
+            raw = (row.get(key) or "").strip()
+            if raw:
+                break
+        if field_spec.get("required") and not raw:
+            errors.append(f"Missing required field '{field_name}'")
+            continue
+        if not raw:
+            rec[field_name] = field_spec.get("default")
+            continue
+        ftype = field_spec["type"]
+        try:
+            if ftype == "int":
+                rec[field_name] = int(raw)
+            elif ftype == "float":
+                rec[field_name] = float(raw)
+            else:
+                rec[field_name] = raw
+        except (ValueError, TypeError):
+            errors.append(f"Invalid {ftype} for '{field_name}': '{raw}'")
+            rec[field_name] = field_spec.get("default")
+    return rec, errors
+
+
+def _import_csv_upload(prod_id, table, fields):
+    """Stream the uploaded CSV into `table`.
+
+    The file is decoded and parsed as it is read, validated in batches of
+    CSV_IMPORT_BATCH rows and inserted by import_rows() in one transaction.
+    A row with errors is still imported when it has a name (bad values take
+    their default). A row the database rejects fails the whole import (422,
+    nothing written). With ?dry_run=1 nothing is written and the response
+    only reports what would be imported.
+    """
     f = request.files.get("file")
     if not f:
         return jsonify({"error": "No file provided"}), 400
-
-    content = f.read().decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(content))
-
-    create_fn = _CSV_CREATE_FNS[tpl["create_fn"]]
-    fields = tpl["fields"]
-    created = []
+    dry_run = request.args.get("dry_run", "").lower() in ("1", "true", "yes")
+    reader = csv.DictReader(io.TextIOWrapper(f.stream, encoding="utf-8-sig", newline=""))
     errors = []
-    line_num = 1
-
-    for line_num, row in enumerate(reader, start=2):  # CSV header is line 1
-        # Validate required fields
-        rec = {"production_id": prod_id}
-        row_errors = []
-
-        for field_name, field_spec in fields.items():
-            raw = (row.get(field_name) or "").strip()
-            if field_spec.get("required") and not raw:
-                row_errors.append(f"Missing required field '{field_name}'")
-                continue
+    lines = []  # CSV line of each row handed to import_rows()
+    stats = {"rows": 0, "valid": 0}
+
+    def batches():
+        for chunk in iter(lambda: list(itertools.islice(reader, CSV_IMPORT_BATCH)), []):
+            batch = []
+            for row in chunk:
+                stats["rows"] += 1
+                rec, row_errors = _parse_csv_row(row, fields)
+                if row_errors:  # CSV header is line 1
+                    errors.append({"line": stats["rows"] + 1, "errors": row_errors})
+                if rec.get("name"):
+                    batch.append(rec)
+                    lines.append(stats["rows"] + 1)
+            stats["valid"] += len(batch)
+            yield batch
 
-            if not raw:
-                if "default" in field_spec:
-                    rec[field_name] = field_spec["default"]
-                else:
-                    rec[field_name] = None
-                continue
+    try:
+        if dry_run:
+            for _ in batches():
+                pass
+            ids = []
+        else:
+            ids = import_rows(table, prod_id, list(fields), batches())
+    except UnicodeDecodeError:
+        return jsonify({"error": "File is not valid UTF-8 CSV"}), 400
+    except ImportRowError as e:
+        line = lines[e.index]
+        errors.append({"line": line, "errors": [str(e)]})
+        return jsonify({
+            "error": f"Line {line} could not be imported, nothing was written",
+            "created": 0, "ids": [], "errors": errors, "total_rows": stats["rows"],
+        }), 422
 
-            ftype = field_spec["type"]
-            try:
-                if ftype == "int":
-                    rec[field_name] = int(raw)
-                elif ftype == "float":
-                    rec[field_name] = float(raw)
-                else:
-                    rec[field_name] = raw
-            except (ValueError, TypeError):
-                row_errors.append(f"Invalid {ftype} for '{field_name}': '{raw}'")
-                rec[field_name] = field_spec.get("default")
+    result = {
+        "created": len(ids),
+        "ids": ids,
+        "errors": errors,
+        "total_rows": stats["rows"],
+    }
+    if dry_run:
+        result.update(dry_run=True, valid_rows=stats["valid"])
+        return jsonify(result), 200
+    return jsonify(result), 201
 
-        if row_errors:
-            errors.append({"line": line_num, "errors": row_errors})
-            # Still try to create if name is present
-            if not rec.get("name"):
-                continue
 
-        try:
-            result = create_fn(rec)
-            eid = result["id"] if isinstance(result, dict) else result
-            created.append(eid)
-        except Exception as e:
-            errors.append({"line": line_num, "errors": [str(e)]})
-
-    return jsonify({
-        "created": len(created),
-        "ids": created,
-        "errors": errors,
-        "total_rows": line_num - 1,
-    }), 201
+@app.route("/api/productions/<int:prod_id>/import-csv/<string:module>", methods=["POST"])
+def api_import_csv(prod_id, module):
+    """Generic CSV import. Module: boats, picture_boats, security_boats, transport, locations."""
+    prod_or_404(prod_id)
+    tpl = _CSV_TEMPLATES.get(module)
+    if not tpl:
+        return jsonify({"error": f"Unknown module: {module}. Available: {', '.join(_CSV_TEMPLATES.keys())}"}), 400
+    return _import_csv_upload(prod_id, tpl["table"], tpl["fields"])
 
 
 @app.route("/api/csv-template/<string:module>", methods=["GET"])
@@ -7946,13 +8056,33 @@ def _timeline_assign(row):
 
 # ─── Daily Checklists ─────────────────────────────────────────────────────────
 
+# Longest run of checklists one generate call can pre-build
+CHECKLIST_MAX_DAYS = 31
+
+
 @app.route("/api/productions/<int:prod_id>/checklists/generate", methods=["POST"])
 def api_generate_checklist(prod_id):
-    date = request.args.get("date") or (request.json or {}).get("date")
+    """Generate the checklist of `date`. With `days` (e.g. 7), pre-generate that
+    many consecutive days at once and return {"checklists": [...]}."""
+    body = request.get_json(silent=True) or {}
+    date = request.args.get("date") or body.get("date")
     if not date:
         return jsonify({"error": "date parameter required"}), 400
-    checklist = generate_daily_checklist(prod_id, date)
-    return jsonify(checklist), 201
+    days = request.args.get("days") or body.get("days")
+    if days is None:
+        checklist = generate_daily_checklist(prod_id, date)
+        return jsonify(checklist), 201
+    start = validate_iso_date(date)
+    try:
+        days = int(days)
+    except (TypeError, ValueError):
+        raise ValidationError({"days": "days must be an integer"})
+    if not 1 <= days <= CHECKLIST_MAX_DAYS:
+        raise ValidationError({"days": f"days must be between 1 and {CHECKLIST_MAX_DAYS}"})
+    from datetime import timedelta
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    checklists = generate_daily_checklists(prod_id, dates)
+    return jsonify({"checklists": [checklists[d] for d in dates]}), 201
 
 
 @app.route("/api/productions/<int:prod_id>/checklists", methods=["GET"])
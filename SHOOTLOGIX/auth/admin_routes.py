@@ -14,6 +14,7 @@ Endpoints:
   GET  /api/admin/projects           — List all projects
   POST /api/admin/projects           — Create a new project
   PUT  /api/admin/projects/<id>      — Rename/archive a project
+  POST /api/admin/projects/<id>/duplicate — Copy a project (optionally date-shifted)
 
   GET  /api/admin/projects/<id>/members       — List project members
   POST /api/admin/projects/<id>/members       — Invite user to project
@@ -58,6 +59,7 @@ from database import (
     save_production_as_template,
     create_production_from_template,
     delete_production_template,
+    clone_production,
     seed_departments,
 )
 
@@ -493,6 +495,44 @@ def create_project_from_template():
     return jsonify({"id": prod_id, "name": name, "from_template": True}), 201
 
 
+@admin_bp.route("/projects/<int:project_id>/duplicate", methods=["POST"])
+@require_admin
+def duplicate_project(project_id):
+    """Duplicate a project. Body: { name, date_offset_days?, include_schedule? }
+    Configuration is always copied; entities, PDT, schedules and assignments
+    too unless include_schedule is false, with dates moved by date_offset_days."""
+    data = request.json or {}
+    name = (data.get("name") or "").strip()
+    if not name:
+        return jsonify({"error": "name required"}), 400
+    try:
+        offset = int(data.get("date_offset_days") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "date_offset_days must be an integer"}), 400
+
+    with get_auth_db() as conn:
+        existing = conn.execute("SELECT id FROM productions WHERE name = ?", (name,)).fetchone()
+        if existing:
+            return jsonify({"error": f"Project '{name}' already exists"}), 409
+
+    prod_id = clone_production(
+        project_id, name, date_offset_days=offset,
+        include_schedule=bool(data.get("include_schedule", True)),
+        creator_id=g.user_id, creator_nickname=getattr(g, "nickname", None)
+    )
+    if not prod_id:
+        return jsonify({"error": "Project not found"}), 404
+
+    # Auto-add creating admin to the project
+    with get_auth_db() as conn:
+        conn.execute(
+            "INSERT INTO project_memberships (user_id, production_id, role) VALUES (?, ?, 'ADMIN')",
+            (g.user_id, prod_id)
+        )
+
+    return jsonify({"id": prod_id, "name": name, "from_project": project_id}), 201
+
+
 # ─── Entity Permissions (P6.15) ───────────────────────────────────────────────
 
 @admin_bp.route("/users/<int:user_id>/entity-permissions", methods=["GET"])
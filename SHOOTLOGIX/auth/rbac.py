@@ -110,6 +110,13 @@ IMPORT_ROUTES = [
     "/sync-pdt-locations",
 ]
 
+# Batched mutation replay; items are authorized individually by the app
+BATCH_ROUTE = "/api/batch"
+# Production bootstrap bundle; each module is authorized individually
+BOOTSTRAP_ROUTE_RE = r'^/api/productions/\d+/bootstrap$'
+# Live event stream: open to every member of the production
+EVENTS_ROUTE_RE = r'^/api/productions/\d+/events$'
+
 # Routes related to price/money editing
 PRICE_ROUTES = [
     "/fuel-prices", "/fuel-locked-prices",
@@ -184,6 +191,11 @@ def check_permission_access(permissions, global_perms, path, method, is_admin=Fa
     if "/health" in path:
         return True, None
 
+    # Batch replay / bootstrap bundle: each item is checked on its own path
+    if (path == BATCH_ROUTE or re.match(BOOTSTRAP_ROUTE_RE, path)
+            or re.match(EVENTS_ROUTE_RE, path)):
+        return True, None
+
     # Reload: ADMIN only
     if "/reload" in path:
         return False, "Only ADMIN can reload data"
@@ -260,6 +272,9 @@ def check_role_access(role, path, method):
         return True, None
     if "/health" in path:
         return True, None
+    if (path == BATCH_ROUTE or re.match(BOOTSTRAP_ROUTE_RE, path)
+            or re.match(EVENTS_ROUTE_RE, path)):
+        return True, None
     if "/reload" in path:
         return False, "Only ADMIN can reload data"
 
@@ -6,14 +6,24 @@ import os
 import sqlite3
 import json
 import math
+import threading
+import time
+import bisect
+import base64
+import zlib
 import unicodedata
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from contextlib import contextmanager
 
+from validation import ValidationError
 from db_compat import (
-    get_db, get_table_columns, get_table_names, is_postgres,
-    DATABASE_PATH as DB_PATH,
+    get_db, shared_transaction, get_table_columns, get_table_names, is_postgres,
+    get_data_version, get_production_version, on_commit, commit_key, add_commit_listener,
+    get_write_scope, in_shared_transaction, insert_returning_ids, insert_rows_returning_ids,
+    BatchInsertError, DATABASE_PATH as DB_PATH,
 )
+import events
 
 
 # ─── Entity labels for human-readable history descriptions ───────────────────
@@ -167,6 +177,10 @@ def _generate_human_description(table_name, action, old_data, new_data, nickname
     elif action == "cascade":
         return f"{who} a cascadé un déplacement de {label}"
 
+    elif action == "bulk":
+        summary = (new_data or {}).get("summary") if isinstance(new_data, dict) else None
+        return f"{who} a modifié en lot {label}" + (f" — {summary}" if summary else "")
+
     else:
         name = _extract_entity_name(table_name, new_data or old_data)
         return f"{who} : {action} sur {label} '{name}'"
@@ -193,12 +207,7 @@ def _log_history(conn, table_name, record_id, action, old_data=None, new_data=No
 
     # Auto-extract production_id from the data if not provided
     if production_id is None:
-        for src in (new_data, old_data):
-            if src:
-                d = dict(src) if not isinstance(src, dict) else src
-                if "production_id" in d:
-                    production_id = d["production_id"]
-                    break
+        production_id = _history_production(conn, new_data, old_data)
 
     # Serialize data
     old_json = json.dumps(dict(old_data)) if old_data else None
@@ -212,6 +221,10 @@ def _log_history(conn, table_name, record_id, action, old_data=None, new_data=No
             table_name, action, old_d, new_d, user_nickname
         )
 
+    if action in ("create", "update", "delete", "undo") and (
+            table_name in _TABLE_TO_ATYPE or table_name == "shooting_days"):
+        _hint_history_alerts(conn, table_name, old_data, new_data, production_id)
+
     cur = conn.execute(
         """INSERT INTO history
            (table_name, record_id, action, old_data, new_data,
@@ -220,9 +233,37 @@ def _log_history(conn, table_name, record_id, action, old_data=None, new_data=No
         (table_name, record_id, action, old_json, new_json,
          user_id, user_nickname, human_description, production_id)
     )
+    # Live "change" event for the production's SSE streams, once committed.
+    # A change whose production is unknown is not published (None would
+    # reach every production's streams).
+    if production_id is not None:
+        change = {"history_id": cur.lastrowid, "table": table_name, "record_id": record_id,
+                  "action": action, "user_id": user_id, "user_nickname": user_nickname}
+        on_commit(conn, lambda: events.publish(production_id, "change", change))
     return cur.lastrowid
 
 
+# Parent tables that give the production of rows without a production_id
+_HISTORY_PARENTS = (("boat_function_id", "boat_functions"), ("shooting_day_id", "shooting_days"))
+
+
+def _history_production(conn, *snapshots):
+    """production_id of a logged row: its own column, else its function's or
+    PDT day's. None when neither snapshot tells."""
+    rows = [dict(s) for s in snapshots if s]
+    for d in rows:
+        if d.get("production_id") is not None:
+            return d["production_id"]
+    for col, parent in _HISTORY_PARENTS:
+        for d in rows:
+            if d.get(col):
+                r = conn.execute(f"SELECT production_id FROM {parent} WHERE id=?",
+                                 (d[col],)).fetchone()
+                if r:
+                    return r["production_id"]
+    return None
+
+
 def _run_ddl(conn, sql_script):
     """Execute a DDL script on both SQLite and PostgreSQL."""
     if is_postgres():
@@ -891,6 +932,14 @@ CREATE TABLE IF NOT EXISTS notifications (
     created_at      TEXT DEFAULT (datetime('now'))
 );
 
+-- Unread notifications per (user, production), kept in step with notifications
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id         INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    production_id   INTEGER NOT NULL REFERENCES productions(id) ON DELETE CASCADE,
+    unread          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, production_id)
+);
+
 -- ═══════════════════════════════════════════════
 -- ASSIGNMENT DAY OVERRIDES (P2.2)
 -- ═══════════════════════════════════════════════
@@ -905,31 +954,51 @@ CREATE TABLE IF NOT EXISTS assignment_day_overrides (
 CREATE UNIQUE INDEX IF NOT EXISTS idx_ado_type_id_date
     ON assignment_day_overrides(assignment_type, assignment_id, date);
 
+-- ═══════════════════════════════════════════════
+-- CONFLICT ALERTS (AXE 7.3) — kept current by the alerts engine
+-- ═══════════════════════════════════════════════
+CREATE TABLE IF NOT EXISTS alerts (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    production_id   INTEGER NOT NULL REFERENCES productions(id) ON DELETE CASCADE,
+    type            TEXT NOT NULL,          -- 'boat_on_off', 'film_no_guards', 'capacity_unknown'
+    alert_key       TEXT NOT NULL,          -- what the alert is about within its type
+    date            TEXT NOT NULL,
+    severity        TEXT NOT NULL,          -- 'danger', 'warning', 'info'
+    module          TEXT,
+    msg             TEXT NOT NULL,
+    entity          TEXT,
+    function        TEXT,
+    created_at      TEXT DEFAULT (datetime('now')),
+    UNIQUE(production_id, type, alert_key, date)
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_prod_date ON alerts(production_id, date);
+
 -- ═══════════════════════════════════════════════
 -- INDEXES FOR PERFORMANCE
 -- ═══════════════════════════════════════════════
-CREATE INDEX IF NOT EXISTS idx_boat_assignments_boat ON boat_assignments(boat_id);
+CREATE INDEX IF NOT EXISTS idx_boat_assignments_boat_dates ON boat_assignments(boat_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_boat_assignments_func ON boat_assignments(boat_function_id);
-CREATE INDEX IF NOT EXISTS idx_picture_boat_assignments_boat ON picture_boat_assignments(picture_boat_id);
+CREATE INDEX IF NOT EXISTS idx_picture_boat_assignments_boat_dates ON picture_boat_assignments(picture_boat_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_picture_boat_assignments_func ON picture_boat_assignments(boat_function_id);
-CREATE INDEX IF NOT EXISTS idx_security_boat_assignments_boat ON security_boat_assignments(security_boat_id);
+CREATE INDEX IF NOT EXISTS idx_security_boat_assignments_boat_dates ON security_boat_assignments(security_boat_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_security_boat_assignments_func ON security_boat_assignments(boat_function_id);
-CREATE INDEX IF NOT EXISTS idx_transport_assignments_vehicle ON transport_assignments(vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_transport_assignments_vehicle_dates ON transport_assignments(vehicle_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_fuel_entries_assignment ON fuel_entries(assignment_id);
 CREATE INDEX IF NOT EXISTS idx_fuel_entries_date ON fuel_entries(date);
 CREATE INDEX IF NOT EXISTS idx_fuel_entries_source_date ON fuel_entries(source_type, assignment_id, date);
+CREATE INDEX IF NOT EXISTS idx_fuel_entries_prod_date ON fuel_entries(production_id, date);
 CREATE INDEX IF NOT EXISTS idx_fuel_logs_boat ON fuel_logs(boat_id);
 CREATE INDEX IF NOT EXISTS idx_shooting_days_prod ON shooting_days(production_id);
 CREATE INDEX IF NOT EXISTS idx_shooting_days_date ON shooting_days(date);
 CREATE INDEX IF NOT EXISTS idx_helper_assignments_func ON helper_assignments(boat_function_id);
-CREATE INDEX IF NOT EXISTS idx_helper_assignments_helper ON helper_assignments(helper_id);
+CREATE INDEX IF NOT EXISTS idx_helper_assignments_helper_dates ON helper_assignments(helper_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_helper_schedules_helper ON helper_schedules(helper_id);
 CREATE INDEX IF NOT EXISTS idx_helper_schedules_day ON helper_schedules(shooting_day_id);
 CREATE INDEX IF NOT EXISTS idx_guard_schedules_guard ON guard_schedules(guard_id);
 CREATE INDEX IF NOT EXISTS idx_guard_schedules_day ON guard_schedules(shooting_day_id);
 CREATE INDEX IF NOT EXISTS idx_guard_location_schedules_prod ON guard_location_schedules(production_id);
 CREATE INDEX IF NOT EXISTS idx_guard_location_schedules_date ON guard_location_schedules(date);
-CREATE INDEX IF NOT EXISTS idx_guard_camp_assignments_helper ON guard_camp_assignments(helper_id);
+CREATE INDEX IF NOT EXISTS idx_guard_camp_assignments_helper_dates ON guard_camp_assignments(helper_id, start_date, end_date);
 CREATE INDEX IF NOT EXISTS idx_location_schedules_prod ON location_schedules(production_id);
 CREATE INDEX IF NOT EXISTS idx_location_schedules_date ON location_schedules(date);
 CREATE INDEX IF NOT EXISTS idx_fnb_entries_item ON fnb_entries(item_id);
@@ -947,6 +1016,7 @@ CREATE INDEX IF NOT EXISTS idx_price_change_log_created ON price_change_log(crea
 CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id);
 CREATE INDEX IF NOT EXISTS idx_notifications_prod ON notifications(production_id);
 CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(user_id, is_read);
+CREATE INDEX IF NOT EXISTS idx_notifications_created ON notifications(created_at);
 
 -- Daily checklists (auto-generated from assignments)
 CREATE TABLE IF NOT EXISTS daily_checklists (
@@ -1231,12 +1301,19 @@ def _migrate_db():
             _migrate_day_overrides_to_table(conn)
             conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('p2_2_day_overrides_migrated', '1')")
 
+        # Unread counters for notifications created before notification_counters existed
+        r = conn.execute("SELECT value FROM settings WHERE key='notification_counters_built'").fetchone()
+        if not r:
+            _rebuild_notification_counters(conn)
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('notification_counters_built', '1')")
+
         # P2.3: Add physical_vessel_id FK to boats, picture_boats, security_boats
         for tbl in ('boats', 'picture_boats', 'security_boats'):
             cols = get_table_columns(conn, tbl)
             if 'physical_vessel_id' not in cols:
                 conn.execute(f"ALTER TABLE {tbl} ADD COLUMN physical_vessel_id INTEGER REFERENCES physical_vessels(id) ON DELETE SET NULL")
                 print(f"Migration P2.3: added {tbl}.physical_vessel_id")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{tbl}_vessel ON {tbl}(physical_vessel_id)")
 
         # P2.7: Add version column for optimistic locking
         _VERSION_TABLES = [
@@ -1386,6 +1463,7 @@ def _migrate_db():
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_fuel_entries_assignment ON fuel_entries(assignment_id)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_fuel_entries_date ON fuel_entries(date)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_fuel_entries_source_date ON fuel_entries(source_type, assignment_id, date)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_fuel_entries_prod_date ON fuel_entries(production_id, date)")
                 conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('p6_11_fuel_multi_entry', '1')")
                 print("Migration P6.11: fuel_entries — removed UNIQUE constraint, added note column")
             else:
@@ -1419,6 +1497,27 @@ def _migrate_db():
         conn.execute("CREATE INDEX IF NOT EXISTS idx_access_logs_user_id ON access_logs(user_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs(timestamp)")
 
+        # Daily cost series: persisted per-day budget, refreshed per department
+        conn.execute("""CREATE TABLE IF NOT EXISTS daily_cost_series (
+            production_id INTEGER NOT NULL REFERENCES productions(id) ON DELETE CASCADE,
+            department    TEXT NOT NULL,
+            date          TEXT NOT NULL,
+            amount        REAL DEFAULT 0,
+            UNIQUE(production_id, department, date)
+        )""")
+
+        # Compressed budget snapshots: storage format, delta base and compare index
+        bs_cols = get_table_columns(conn, 'budget_snapshots')
+        if 'storage_format' not in bs_cols:
+            conn.execute("ALTER TABLE budget_snapshots ADD COLUMN storage_format TEXT DEFAULT 'json'")
+            print("Migration: added budget_snapshots.storage_format")
+        if 'base_snapshot_id' not in bs_cols:
+            conn.execute("ALTER TABLE budget_snapshots ADD COLUMN base_snapshot_id INTEGER DEFAULT NULL")
+            print("Migration: added budget_snapshots.base_snapshot_id")
+        if 'line_index' not in bs_cols:
+            conn.execute("ALTER TABLE budget_snapshots ADD COLUMN line_index TEXT DEFAULT NULL")
+            print("Migration: added budget_snapshots.line_index")
+
 
 def _migrate_day_overrides_to_table(conn):
     """Parse existing day_overrides JSON from all assignment tables and insert into assignment_day_overrides."""
@@ -1483,6 +1582,12 @@ def save_day_overrides(conn, assignment_type, assignment_id, overrides_json):
         overrides = json.loads(overrides_json or "{}")
     except Exception:
         overrides = {}
+    old_dates = [r["date"] for r in conn.execute(
+        "SELECT date FROM assignment_day_overrides WHERE assignment_type=? AND assignment_id=?",
+        (assignment_type, assignment_id)
+    ).fetchall()]
+    _hint_override_alerts(conn, assignment_type, assignment_id,
+                          set(old_dates) | {d for d, st in overrides.items() if st})
     # Delete existing
     conn.execute(
         "DELETE FROM assignment_day_overrides WHERE assignment_type=? AND assignment_id=?",
@@ -1502,12 +1607,35 @@ def save_day_overrides(conn, assignment_type, assignment_id, overrides_json):
 
 def delete_day_overrides(conn, assignment_type, assignment_id):
     """Remove all overrides for a given assignment (used on delete)."""
+    _hint_override_alerts(conn, assignment_type, assignment_id, [
+        r["date"] for r in conn.execute(
+            "SELECT date FROM assignment_day_overrides WHERE assignment_type=? AND assignment_id=?",
+            (assignment_type, assignment_id)
+        ).fetchall()])
     conn.execute(
         "DELETE FROM assignment_day_overrides WHERE assignment_type=? AND assignment_id=?",
         (assignment_type, assignment_id)
     )
 
 
+def get_day_overrides_map(conn, assignment_type, assignment_ids, chunk=500):
+    """Read overrides for many assignments at once: {assignment_id: {date: status}}.
+    Assignments without overrides are absent from the result."""
+    result = {}
+    ids = list(assignment_ids)
+    for i in range(0, len(ids), chunk):
+        part = ids[i:i + chunk]
+        rows = conn.execute(
+            f"""SELECT assignment_id, date, status FROM assignment_day_overrides
+                WHERE assignment_type=? AND assignment_id IN ({','.join('?' * len(part))})
+                ORDER BY assignment_id, date""",
+            [assignment_type] + part
+        ).fetchall()
+        for r in rows:
+            result.setdefault(r["assignment_id"], {})[r["date"]] = r["status"]
+    return result
+
+
 # Map assignment table names to assignment_type values
 _TABLE_TO_ATYPE = {
     "boat_assignments": "boats",
@@ -1636,6 +1764,241 @@ def compute_working_days(d):
     )
 
 
+# ─── Collection queries (fields / sort / pagination) ──────────────────────────
+# Collection getters accept an optional `query` from parse_collection_query():
+#   fields  -> only these keys are selected (and computed) and returned
+#   sort    -> ORDER BY on whitelisted columns, "-" prefix for descending
+#   limit / cursor -> one page of rows; the result is then a CollectionPage
+# Every order ends with the row id so pages are stable.
+
+COLLECTION_MAX_LIMIT = 5000
+
+# Computed assignment fields -> columns they are derived from
+_ASSIGNMENT_COMPUTED = {
+    "day_overrides": ("id",),
+    "working_days": ("id", "start_date", "end_date", "include_sunday", "exclude_holidays"),
+    "amount_estimate": ("id", "start_date", "end_date", "include_sunday", "exclude_holidays",
+                        "price_override", "{rate}_daily_rate_estimate"),
+    "amount_actual": ("id", "start_date", "end_date", "include_sunday", "exclude_holidays",
+                      "{rate}_daily_rate_actual"),
+}
+
+_COLLECTIONS = {
+    "boat_assignments": {
+        "from": """boat_assignments ba
+            LEFT JOIN boats b         ON ba.boat_id = b.id
+            LEFT JOIN boat_functions bf ON ba.boat_function_id = bf.id""",
+        "table": "boat_assignments", "alias": "ba",
+        "joined": {
+            "boat_name": "b.name", "boat_capacity": "b.capacity", "captain": "b.captain",
+            "wave_rating": "b.wave_rating", "image_path": "b.image_path", "boat_nr": "b.boat_nr",
+            "boat_daily_rate_estimate": "b.daily_rate_estimate",
+            "boat_daily_rate_actual": "b.daily_rate_actual",
+            "vendor": "b.vendor", "entity_currency": "b.currency",
+            "function_name": "bf.name", "function_group": "bf.function_group", "color": "bf.color",
+        },
+        "order": "bf.sort_order, bf.id",
+        "computed": _ASSIGNMENT_COMPUTED, "rate": "boat",
+    },
+    "transport_assignments": {
+        "from": """transport_assignments ta
+            LEFT JOIN transport_vehicles tv ON ta.vehicle_id = tv.id
+            LEFT JOIN boat_functions bf ON ta.boat_function_id = bf.id""",
+        "table": "transport_assignments", "alias": "ta",
+        "joined": {
+            "vehicle_name": "tv.name", "vehicle_type": "tv.type", "driver": "tv.driver",
+            "image_path": "tv.image_path", "vehicle_nr": "tv.vehicle_nr",
+            "vehicle_daily_rate_estimate": "tv.daily_rate_estimate",
+            "vehicle_daily_rate_actual": "tv.daily_rate_actual",
+            "vendor": "tv.vendor", "entity_currency": "tv.currency",
+            "function_name": "bf.name", "function_group": "bf.function_group", "color": "bf.color",
+        },
+        "order": "bf.sort_order, bf.id",
+        "computed": _ASSIGNMENT_COMPUTED, "rate": "vehicle",
+    },
+    "helper_assignments": {
+        "from": """helper_assignments ha
+            LEFT JOIN helpers h ON ha.helper_id = h.id
+            LEFT JOIN boat_functions bf ON ha.boat_function_id = bf.id""",
+        "table": "helper_assignments", "alias": "ha",
+        "joined": {
+            "helper_name": "h.name", "helper_role": "h.role", "helper_contact": "h.contact",
+            "helper_group": "h.group_name",
+            "helper_daily_rate_estimate": "h.daily_rate_estimate",
+            "helper_daily_rate_actual": "h.daily_rate_actual",
+            "entity_currency": "h.currency",
+            "function_name": "bf.name", "function_group": "bf.function_group", "color": "bf.color",
+        },
+        "order": "bf.sort_order, bf.id",
+        "computed": _ASSIGNMENT_COMPUTED, "rate": "helper",
+    },
+    "fuel_entries": {
+        "from": "fuel_entries fe", "table": "fuel_entries", "alias": "fe",
+        "order": "fe.source_type, fe.assignment_id, fe.date",
+    },
+    "fnb_entries": {
+        "from": "fnb_entries fn", "table": "fnb_entries", "alias": "fn",
+        "order": "fn.date, fn.item_id",
+    },
+    "history": {
+        "from": "history hi", "table": "history", "alias": "hi",
+        "order": None, "descending": True,
+    },
+}
+
+_collection_columns_cache = {}
+
+
+class CollectionPage(list):
+    """One page of collection rows. next_cursor is None on the last page."""
+
+    def __init__(self, rows, next_cursor=None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+def _encode_cursor(offset):
+    raw = json.dumps({"o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset = json.loads(raw)["o"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    return offset if isinstance(offset, int) and offset >= 0 else None
+
+
+def parse_collection_query(args, default_limit=None):
+    """Parse fields/sort/limit/cursor from request args. Returns None when none
+    are given (and there is no default_limit) so getters keep their full output.
+    Field and sort names are checked against the collection by the getter."""
+    if not any(args.get(k) for k in ("fields", "sort", "limit", "cursor")) and default_limit is None:
+        return None
+    errors = {}
+    fields = [f.strip() for f in (args.get("fields") or "").split(",") if f.strip()] or None
+    sort = []
+    for term in (args.get("sort") or "").split(","):
+        term = term.strip()
+        if term:
+            sort.append((term.lstrip("-"), term.startswith("-")))
+    limit = default_limit
+    if args.get("limit"):
+        try:
+            limit = int(args.get("limit"))
+        except ValueError:
+            limit = None
+        if limit is None or not 1 <= limit <= COLLECTION_MAX_LIMIT:
+            errors["limit"] = f"limit must be an integer between 1 and {COLLECTION_MAX_LIMIT}"
+    offset = 0
+    if args.get("cursor"):
+        offset = _decode_cursor(args.get("cursor"))
+        if offset is None:
+            errors["cursor"] = "cursor is invalid"
+        elif limit is None:
+            errors["limit"] = "limit is required with cursor"
+    if errors:
+        raise ValidationError(errors)
+    return {"fields": fields, "sort": sort, "limit": limit, "offset": offset}
+
+
+def _collection_columns(conn, spec):
+    """{field name: SQL expression} for the selectable columns of a collection."""
+    cols = _collection_columns_cache.get(spec["table"])
+    if cols is None:
+        cols = {c: f"{spec['alias']}.{c}" for c in get_table_columns(conn, spec["table"])}
+        cols.update(spec.get("joined", {}))
+        _collection_columns_cache[spec["table"]] = cols
+    return cols
+
+
+def _query_collection(conn, name, where, params, query=None):
+    """SELECT rows of collection `name` (see _COLLECTIONS) matching `where`,
+    pushing the fields, sort and page of `query` into the SQL.
+    Returns (rows, next_cursor); rows hold the selected columns only."""
+    spec = _COLLECTIONS[name]
+    alias = spec["alias"]
+    query = query or {}
+    columns = _collection_columns(conn, spec)
+    computed = spec.get("computed", {})
+    errors = {}
+
+    fields = query.get("fields")
+    if fields is None:
+        select = [f"{alias}.*"] + [f"{expr} AS {key}" for key, expr in spec.get("joined", {}).items()]
+    else:
+        unknown = [f for f in fields if f not in columns and f not in computed]
+        if unknown:
+            errors["fields"] = f"Unknown field(s): {', '.join(unknown)}"
+        needed = {}
+        for f in fields:
+            if f in computed:
+                for dep in computed[f]:
+                    needed[dep.format(rate=spec.get("rate"))] = None
+            elif f in columns:
+                needed[f] = None
+        select = [columns[f] if columns[f] == f"{alias}.{f}" else f"{columns[f]} AS {f}"
+                  for f in needed]
+
+    order = []
+    for key, desc in query.get("sort") or ():
+        if key not in columns:
+            errors["sort"] = f"Cannot sort by {key}"
+            continue
+        order.append(columns[key] + (" DESC" if desc else ""))
+    if errors:
+        raise ValidationError(errors)
+    if not order and spec["order"]:
+        order.append(spec["order"])
+    order.append(f"{alias}.id DESC" if spec.get("descending") else f"{alias}.id")
+
+    sql = f"SELECT {', '.join(select)} FROM {spec['from']} {where} ORDER BY {', '.join(order)}"
+    params = list(params)
+    limit = query.get("limit")
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit + 1, query.get("offset", 0)]
+    rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(query.get("offset", 0) + limit)
+    return rows, next_cursor
+
+
+def _finish_collection(rows, next_cursor, query):
+    """Trim rows to the requested fields and wrap pages in a CollectionPage."""
+    if query is None:
+        return rows
+    fields = query.get("fields")
+    if fields:
+        rows = [{f: r.get(f) for f in fields} for r in rows]
+    return CollectionPage(rows, next_cursor)
+
+
+def _enrich_assignments(conn, rows, assignment_type, rate, fields=None):
+    """Add day_overrides, working_days and amounts to assignment rows (only the
+    requested ones when `fields` is given). `rate` is the entity prefix of the
+    daily rate columns, e.g. "boat"."""
+    wanted = set(_ASSIGNMENT_COMPUTED) if fields is None else set(fields) & set(_ASSIGNMENT_COMPUTED)
+    if not wanted:
+        return rows
+    overrides = get_day_overrides_map(conn, assignment_type, [d["id"] for d in rows])
+    for d in rows:
+        d["day_overrides"] = json.dumps(overrides.get(d["id"], {}))
+        if wanted == {"day_overrides"}:
+            continue
+        rate_est = d.get("price_override") or d.get(f"{rate}_daily_rate_estimate") or 0
+        rate_act = d.get(f"{rate}_daily_rate_actual") or 0
+        wd = compute_working_days(d)
+        d["working_days"]    = wd
+        d["amount_estimate"] = round(wd * rate_est, 2)
+        d["amount_actual"]   = round(wd * rate_act, 2) if rate_act else None
+    return rows
+
+
 # ─── Productions ──────────────────────────────────────────────────────────────
 
 def get_productions():
@@ -1794,6 +2157,7 @@ def create_event(data):
             f"INSERT INTO shooting_day_events ({col_names}) VALUES ({placeholders})",
             list(fields.values())
         )
+        _hint_day_event_alerts(conn, shooting_day_id=fields.get("shooting_day_id"))
         return cur.lastrowid
 
 
@@ -1808,19 +2172,139 @@ def update_event(event_id, data):
     sets = ", ".join(f"{k}=?" for k in fields)
     vals = list(fields.values()) + [event_id]
     with get_db() as conn:
+        _hint_day_event_alerts(conn, event_id=event_id)
         conn.execute(f"UPDATE shooting_day_events SET {sets} WHERE id=?", vals)
 
 
 def delete_event(event_id):
     with get_db() as conn:
+        _hint_day_event_alerts(conn, event_id=event_id)
         conn.execute("DELETE FROM shooting_day_events WHERE id=?", (event_id,))
 
 
 def delete_events_for_day(day_id):
     with get_db() as conn:
+        _hint_day_event_alerts(conn, shooting_day_id=day_id)
         conn.execute("DELETE FROM shooting_day_events WHERE shooting_day_id=?", (day_id,))
 
 
+# ─── Bulk PDT merge ──────────────────────────────────────────────────────────
+
+_SHOOTING_DAY_FIELDS = ["date", "day_number", "location", "game_name",
+                        "heure_rehearsal", "heure_animateur", "heure_game",
+                        "heure_depart_candidats", "maree_hauteur", "maree_statut",
+                        "nb_candidats", "recompense", "conseil_soir", "notes", "status"]
+
+_EVENT_FIELDS = ["sort_order", "event_type", "name", "location",
+                 "heure_rehearsal", "heure_host", "heure_event", "heure_depart",
+                 "heure_arrivee", "heure_teaser", "heure_fin",
+                 "maree_hauteur", "maree_statut", "reward", "notes"]
+
+
+def _event_signature(events):
+    """Comparable tuple form of a day's event list."""
+    return [tuple(ev.get(k, 0 if k == "sort_order" else None) for k in _EVENT_FIELDS)
+            for ev in events]
+
+
+def merge_pdt_days(prod_id, parsed_days, replace=False):
+    """Smart-merge parsed PDT days into a production in a single transaction.
+
+    Days are matched by day_number. Days with status 'modifié' are kept as is,
+    other matches get their fields and events replaced only where they differ,
+    unknown days are created and days missing from the PDF are kept.
+    With replace=True, existing days are deleted first and every parsed day is
+    created (full re-import).
+    Logs one grouped history entry. Returns {created, updated, unchanged, skipped}.
+    """
+    stats = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    with get_db() as conn:
+        if replace:
+            conn.execute("DELETE FROM shooting_days WHERE production_id=?", (prod_id,))
+        existing_by_dn = {}
+        for r in conn.execute(
+            "SELECT * FROM shooting_days WHERE production_id=? ORDER BY date, day_number",
+            (prod_id,)
+        ).fetchall():
+            if r["day_number"]:
+                existing_by_dn.setdefault(r["day_number"], dict(r))
+        events_by_day = {}
+        for ev in conn.execute(
+            """SELECT e.* FROM shooting_day_events e
+               JOIN shooting_days sd ON e.shooting_day_id = sd.id
+               WHERE sd.production_id = ?
+               ORDER BY e.shooting_day_id, e.sort_order""",
+            (prod_id,)
+        ).fetchall():
+            events_by_day.setdefault(ev["shooting_day_id"], []).append(dict(ev))
+
+        updates = {}          # column tuple -> [params]
+        replaced_days = []    # day ids whose events are rewritten
+        new_events = []       # (day_id, event) rows to insert
+        touched = []
+
+        for parsed in parsed_days:
+            events = parsed.get("events", [])
+            dn = parsed.get("day_number")
+            if not dn and not replace:
+                continue
+            ex = existing_by_dn.get(dn) if dn else None
+            if ex is None:
+                fields = {"production_id": prod_id}
+                fields.update((k, parsed[k]) for k in _SHOOTING_DAY_FIELDS if k in parsed)
+                cur = conn.execute(
+                    f"INSERT INTO shooting_days ({', '.join(fields)}) "
+                    f"VALUES ({', '.join('?' * len(fields))})",
+                    list(fields.values())
+                )
+                new_events.extend((cur.lastrowid, ev) for ev in events)
+                stats["created"] += 1
+                touched.append(dn)
+                continue
+            # Skip days manually edited by user
+            if ex.get("status") == "modifié":
+                stats["skipped"] += 1
+                continue
+            changed = {k: parsed[k] for k in _SHOOTING_DAY_FIELDS
+                       if k in parsed and parsed[k] != ex.get(k)}
+            events_changed = (_event_signature(events)
+                              != _event_signature(events_by_day.get(ex["id"], [])))
+            if changed:
+                cols = tuple(sorted(changed))
+                updates.setdefault(cols, []).append([changed[c] for c in cols] + [ex["id"]])
+            if events_changed:
+                replaced_days.append(ex["id"])
+                new_events.extend((ex["id"], ev) for ev in events)
+            if changed or events_changed:
+                stats["updated"] += 1
+                touched.append(dn)
+            else:
+                stats["unchanged"] += 1
+
+        for cols, params in updates.items():
+            sets = ", ".join(f"{c}=?" for c in cols)
+            conn.executemany(f"UPDATE shooting_days SET {sets} WHERE id=?", params)
+        if replaced_days:
+            conn.executemany("DELETE FROM shooting_day_events WHERE shooting_day_id=?",
+                             [(day_id,) for day_id in replaced_days])
+        if new_events:
+            conn.executemany(
+                f"INSERT INTO shooting_day_events (shooting_day_id, {', '.join(_EVENT_FIELDS)}) "
+                f"VALUES ({', '.join('?' * (len(_EVENT_FIELDS) + 1))})",
+                [[day_id] + [ev.get(k, 0 if k == "sort_order" else None) for k in _EVENT_FIELDS]
+                 for day_id, ev in new_events]
+            )
+
+        if touched or replace:
+            _log_history(conn, 'shooting_days', None, 'bulk',
+                         new_data={**stats, "day_numbers": touched,
+                                   "summary": f"PDT : {stats['created']} créés, "
+                                              f"{stats['updated']} modifiés, "
+                                              f"{stats['skipped']} ignorés"},
+                         production_id=prod_id)
+    return stats
+
+
 # ─── Boats ────────────────────────────────────────────────────────────────────
 
 def get_boats(prod_id, include_deleted=False):
@@ -1931,48 +2415,18 @@ def delete_boat_assignment_by_function(func_id):
 
 # ─── Boat assignments ─────────────────────────────────────────────────────────
 
-def get_boat_assignments(prod_id, context=None):
-    """Return assignments enriched with boat and function info."""
+def get_boat_assignments(prod_id, context=None, query=None):
+    """Return assignments enriched with boat and function info.
+    `query` (parse_collection_query) selects fields, sort and a page."""
     with get_db() as conn:
         where = "WHERE bf.production_id = ?"
         params = [prod_id]
         if context:
             where += " AND bf.context = ?"
             params.append(context)
-        rows = conn.execute(f"""
-            SELECT ba.*,
-                   b.name  AS boat_name,
-                   b.capacity AS boat_capacity,
-                   b.captain,
-                   b.wave_rating,
-                   b.image_path,
-                   b.boat_nr,
-                   b.daily_rate_estimate AS boat_daily_rate_estimate,
-                   b.daily_rate_actual   AS boat_daily_rate_actual,
-                   b.vendor,
-                   b.currency AS entity_currency,
-                   bf.name  AS function_name,
-                   bf.function_group,
-                   bf.color
-            FROM boat_assignments ba
-            LEFT JOIN boats b         ON ba.boat_id = b.id
-            LEFT JOIN boat_functions bf ON ba.boat_function_id = bf.id
-            {where}
-            ORDER BY bf.sort_order, bf.id
-        """, params).fetchall()
-
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["day_overrides"] = get_day_overrides_json(conn, "boats", d["id"])
-            rate_est = d.get("price_override") or d.get("boat_daily_rate_estimate") or 0
-            rate_act = d.get("boat_daily_rate_actual") or 0
-            wd = compute_working_days(d)
-            d["working_days"]      = wd
-            d["amount_estimate"]   = round(wd * rate_est, 2)
-            d["amount_actual"]     = round(wd * rate_act, 2) if rate_act else None
-            result.append(d)
-        return result
+        rows, next_cursor = _query_collection(conn, "boat_assignments", where, params, query)
+        _enrich_assignments(conn, rows, "boats", "boat", query and query.get("fields"))
+        return _finish_collection(rows, next_cursor, query)
 
 
 def create_boat_assignment(data):
@@ -2270,41 +2724,12 @@ def delete_transport_vehicle(vehicle_id):
         conn.execute("UPDATE transport_vehicles SET deleted_at = datetime('now') WHERE id=?", (vehicle_id,))
 
 
-def get_transport_assignments(prod_id):
+def get_transport_assignments(prod_id, query=None):
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT ta.*,
-                   tv.name  AS vehicle_name,
-                   tv.type  AS vehicle_type,
-                   tv.driver,
-                   tv.image_path,
-                   tv.vehicle_nr,
-                   tv.daily_rate_estimate AS vehicle_daily_rate_estimate,
-                   tv.daily_rate_actual   AS vehicle_daily_rate_actual,
-                   tv.vendor,
-                   tv.currency AS entity_currency,
-                   bf.name  AS function_name,
-                   bf.function_group,
-                   bf.color
-            FROM transport_assignments ta
-            LEFT JOIN transport_vehicles tv ON ta.vehicle_id = tv.id
-            LEFT JOIN boat_functions bf ON ta.boat_function_id = bf.id
-            WHERE bf.production_id = ?
-            ORDER BY bf.sort_order, bf.id
-        """, (prod_id,)).fetchall()
-
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["day_overrides"] = get_day_overrides_json(conn, "transport", d["id"])
-            rate_est = d.get("price_override") or d.get("vehicle_daily_rate_estimate") or 0
-            rate_act = d.get("vehicle_daily_rate_actual") or 0
-            wd = compute_working_days(d)
-            d["working_days"]    = wd
-            d["amount_estimate"] = round(wd * rate_est, 2)
-            d["amount_actual"]   = round(wd * rate_act, 2) if rate_act else None
-            result.append(d)
-        return result
+        rows, next_cursor = _query_collection(
+            conn, "transport_assignments", "WHERE bf.production_id = ?", [prod_id], query)
+        _enrich_assignments(conn, rows, "transport", "vehicle", query and query.get("fields"))
+        return _finish_collection(rows, next_cursor, query)
 
 
 def create_transport_assignment(data):
@@ -2376,19 +2801,15 @@ def delete_transport_assignment_by_function(func_id):
 
 # ─── Fuel ─────────────────────────────────────────────────────────────────────
 
-def get_fuel_entries(prod_id, source_type=None):
+def get_fuel_entries(prod_id, source_type=None, query=None):
     with get_db() as conn:
+        where = "WHERE fe.production_id=?"
+        params = [prod_id]
         if source_type:
-            rows = conn.execute(
-                "SELECT * FROM fuel_entries WHERE production_id=? AND source_type=? ORDER BY source_type, assignment_id, date",
-                (prod_id, source_type)
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                "SELECT * FROM fuel_entries WHERE production_id=? ORDER BY source_type, assignment_id, date",
-                (prod_id,)
-            ).fetchall()
-        return [dict(r) for r in rows]
+            where += " AND fe.source_type=?"
+            params.append(source_type)
+        rows, next_cursor = _query_collection(conn, "fuel_entries", where, params, query)
+        return _finish_collection(rows, next_cursor, query)
 
 
 def upsert_fuel_entry(data):
@@ -2435,6 +2856,112 @@ def delete_fuel_entries_for_assignment(source_type, assignment_id):
         )
 
 
+# Fuel overview: source_type -> (assignment table, entity table, entity column,
+# name override column); machinery entries point at fuel_machinery directly
+_FUEL_SOURCES = {
+    "boats": ("boat_assignments", "boats", "boat_id", "boat_name_override"),
+    "picture_boats": ("picture_boat_assignments", "picture_boats", "picture_boat_id",
+                      "boat_name_override"),
+    "security_boats": ("security_boat_assignments", "security_boats", "security_boat_id",
+                       "boat_name_override"),
+    "transport": ("transport_assignments", "transport_vehicles", "vehicle_id",
+                  "vehicle_name_override"),
+}
+_FUEL_CATEGORY_LABELS = {
+    "boats": "BOAT", "picture_boats": "PB",
+    "security_boats": "SB", "transport": "TRANSPO", "machinery": "MACH",
+}
+FUEL_OVERVIEW_TABLES = ("fuel_entries", "fuel_machinery") + tuple(
+    t for spec in _FUEL_SOURCES.values() for t in spec[:2])
+
+_fuel_overviews = {}  # { (prod_id, date_from, date_to): (data version, overview) }
+
+
+def _fuel_source_names(conn, prod_id):
+    """{(source_type, assignment_id): display name} for the sources that have
+    fuel entries in the production."""
+    branches, params = [], []
+    for source_type, (table, entity_table, entity_col, name_col) in _FUEL_SOURCES.items():
+        branches.append(
+            f"""SELECT '{source_type}' AS source_type, a.id, COALESCE(a.{name_col}, e.name) AS name
+                FROM {table} a LEFT JOIN {entity_table} e ON a.{entity_col} = e.id
+                WHERE a.id IN (SELECT assignment_id FROM fuel_entries
+                               WHERE production_id=? AND source_type='{source_type}')""")
+        params.append(prod_id)
+    branches.append(
+        "SELECT 'machinery' AS source_type, id, name FROM fuel_machinery WHERE production_id=?")
+    params.append(prod_id)
+    return {(r["source_type"], r["id"]): r["name"]
+            for r in conn.execute(" UNION ALL ".join(branches), params).fetchall()}
+
+
+def get_fuel_overview(prod_id, date_from=None, date_to=None):
+    """Fuel pivot for the overview grid: liters per source per date, summed
+    with GROUP BY (source_type, assignment_id, date, fuel_type), optionally
+    restricted to [date_from, date_to]. Cached per data version.
+    Returns {'dates', 'sources', 'daily_totals', 'grand_total'}."""
+    version = None if in_shared_transaction() else get_data_version(FUEL_OVERVIEW_TABLES)
+    key = (prod_id, date_from, date_to)
+    cached = _fuel_overviews.get(key)
+    if cached and version is not None and cached[0] == version:
+        return cached[1]
+
+    where, params = "WHERE production_id=?", [prod_id]
+    if date_from:
+        where += " AND date >= ?"
+        params.append(date_from)
+    if date_to:
+        where += " AND date <= ?"
+        params.append(date_to)
+    with get_db() as conn:
+        totals = conn.execute(
+            f"""SELECT source_type, assignment_id, date,
+                       CASE WHEN fuel_type='PETROL' THEN 'PETROL' ELSE 'DIESEL' END AS fuel,
+                       SUM(COALESCE(liters, 0)) AS liters
+                FROM fuel_entries {where}
+                GROUP BY source_type, assignment_id, date, fuel""",
+            params
+        ).fetchall()
+        names = _fuel_source_names(conn, prod_id) if totals else {}
+
+    sources, daily_totals = {}, {}
+    for r in totals:
+        skey = f"{r['source_type']}:{r['assignment_id']}"
+        src = sources.get(skey)
+        if src is None:
+            src = sources[skey] = {
+                'key': skey,
+                'source_type': r['source_type'],
+                'assignment_id': r['assignment_id'],
+                'name': names.get((r['source_type'], r['assignment_id'])) or '?',
+                'by_date': {},
+                'total': 0,
+                'diesel': 0,
+                'petrol': 0,
+            }
+        liters = r['liters']
+        src['by_date'][r['date']] = src['by_date'].get(r['date'], 0) + liters
+        src['total'] += liters
+        src['petrol' if r['fuel'] == 'PETROL' else 'diesel'] += liters
+        daily_totals[r['date']] = daily_totals.get(r['date'], 0) + liters
+
+    source_list = sorted(sources.values(), key=lambda s: (s['source_type'], s['name']))
+    for s in source_list:
+        s['category'] = _FUEL_CATEGORY_LABELS.get(s['source_type'], s['source_type'].upper())
+    dates = sorted(daily_totals)
+    overview = {
+        'dates': dates,
+        'sources': source_list,
+        'daily_totals': {d: daily_totals[d] for d in dates},
+        'grand_total': sum(daily_totals.values()),
+    }
+    if len(_fuel_overviews) > 64:
+        _fuel_overviews.clear()
+    if version is not None:
+        _fuel_overviews[key] = (version, overview)
+    return overview
+
+
 def get_fuel_machinery(prod_id, include_deleted=False):
     with get_db() as conn:
         sql = "SELECT * FROM fuel_machinery WHERE production_id=?"
@@ -2517,6 +3044,119 @@ def delete_fuel_locked_price(date):
         conn.execute("DELETE FROM fuel_locked_prices WHERE date=?", (date,))
 
 
+# ─── Fuel costs ──────────────────────────────────────────────────────────────
+
+FUEL_COST_TABLES = ("fuel_entries", "fuel_locked_prices", "settings")
+
+_fuel_costs = {}  # { prod_id: (data version, costs) }
+
+# Budget line of each fuel source_type
+_FUEL_BUDGET_LINES = {
+    "boats": "BOAT FUEL & OIL",
+    "picture_boats": "BOAT FUEL & OIL",
+    "security_boats": "BOAT FUEL & OIL",
+    "transport": "VEHICLE FUEL & OIL",
+    "machinery": "MACHINERY FUEL",
+}
+
+
+class FuelPriceTimeline:
+    """Per-litre prices by date. A locked day uses its own price snapshot;
+    any other day falls back to the current fuel_price_* settings. Locked
+    dates are kept sorted and looked up by bisection."""
+
+    def __init__(self, locked_rows, current_diesel, current_petrol):
+        rows = sorted(locked_rows, key=lambda r: r["date"])
+        self.dates = [r["date"] for r in rows]
+        self._prices = [(r["diesel_price"] or 0, r["petrol_price"] or 0) for r in rows]
+        self.current = (current_diesel, current_petrol)
+
+    @classmethod
+    def load(cls, conn):
+        settings = {r["key"]: r["value"] for r in conn.execute(
+            "SELECT key, value FROM settings WHERE key IN ('fuel_price_diesel', 'fuel_price_petrol')"
+        ).fetchall()}
+        return cls(
+            conn.execute("SELECT date, diesel_price, petrol_price FROM fuel_locked_prices").fetchall(),
+            float(settings.get("fuel_price_diesel") or 0),
+            float(settings.get("fuel_price_petrol") or 0),
+        )
+
+    def price(self, date, fuel):
+        """(price per litre, locked) of `fuel` ('DIESEL' or 'PETROL') on `date`."""
+        i = bisect.bisect_left(self.dates, date)
+        locked = i < len(self.dates) and self.dates[i] == date
+        prices = self._prices[i] if locked else self.current
+        return (prices[1] if fuel == "PETROL" else prices[0]), locked
+
+
+def get_fuel_costs(prod_id):
+    """Price every fuel entry of a production in one pass: liters are summed
+    with GROUP BY (source_type, assignment_id, date, fuel) and each group is
+    priced from the FuelPriceTimeline. Fuel is PETROL when fuel_type says so,
+    DIESEL otherwise. Locked days count as cost up to date, the others as
+    estimate. Cached per data version.
+    Returns {'rows', 'by_date', 'diesel_price', 'petrol_price', 'totals'}."""
+    version = None if in_shared_transaction() else get_data_version(FUEL_COST_TABLES)
+    cached = _fuel_costs.get(prod_id)
+    if cached and version is not None and cached[0] == version:
+        return cached[1]
+
+    with get_db() as conn:
+        groups = conn.execute(
+            """SELECT source_type, assignment_id, date,
+                      CASE WHEN fuel_type='PETROL' THEN 'PETROL' ELSE 'DIESEL' END AS fuel,
+                      SUM(COALESCE(liters, 0)) AS liters, COUNT(*) AS entries
+               FROM fuel_entries WHERE production_id=?
+               GROUP BY source_type, assignment_id, date, fuel""",
+            (prod_id,)
+        ).fetchall()
+        timeline = FuelPriceTimeline.load(conn)
+
+    rows, by_date = [], {}
+    for g in groups:
+        price, locked = timeline.price(g["date"], g["fuel"])
+        cost = g["liters"] * price
+        rows.append({
+            "source_type": g["source_type"],
+            "assignment_id": g["assignment_id"],
+            "date": g["date"],
+            "fuel": g["fuel"],
+            "liters": g["liters"],
+            "entries": g["entries"],
+            "price": price,
+            "cost": cost,
+            "locked": locked,
+        })
+        by_date[g["date"]] = by_date.get(g["date"], 0) + cost
+    costs = {
+        "rows": rows,
+        "by_date": by_date,
+        "diesel_price": timeline.current[0],
+        "petrol_price": timeline.current[1],
+        "totals": summarize_fuel_costs(rows),
+    }
+    if version is not None:
+        _fuel_costs[prod_id] = (version, costs)
+    return costs
+
+
+def summarize_fuel_costs(rows):
+    """Liters and cost totals of priced fuel rows (see get_fuel_costs)."""
+    totals = {"entries": 0, "diesel_liters": 0, "petrol_liters": 0,
+              "diesel_cost": 0, "petrol_cost": 0,
+              "cost_up_to_date": 0, "cost_estimate": 0}
+    for r in rows:
+        fuel = "petrol" if r["fuel"] == "PETROL" else "diesel"
+        totals["entries"] += r["entries"]
+        totals[f"{fuel}_liters"] += r["liters"]
+        totals[f"{fuel}_cost"] += r["cost"]
+        totals["cost_up_to_date" if r["locked"] else "cost_estimate"] += r["cost"]
+    totals["liters"] = totals["diesel_liters"] + totals["petrol_liters"]
+    totals["cost"] = totals["cost_up_to_date"] + totals["cost_estimate"]
+    return totals
+
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 def get_helpers(prod_id, include_deleted=False):
@@ -2569,39 +3209,12 @@ def delete_helper(helper_id):
         conn.execute("UPDATE helpers SET deleted_at = datetime('now') WHERE id=?", (helper_id,))
 
 
-def get_helper_assignments(prod_id):
+def get_helper_assignments(prod_id, query=None):
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT ha.*,
-                   h.name  AS helper_name,
-                   h.role  AS helper_role,
-                   h.contact AS helper_contact,
-                   h.group_name AS helper_group,
-                   h.daily_rate_estimate AS helper_daily_rate_estimate,
-                   h.daily_rate_actual   AS helper_daily_rate_actual,
-                   h.currency AS entity_currency,
-                   bf.name  AS function_name,
-                   bf.function_group,
-                   bf.color
-            FROM helper_assignments ha
-            LEFT JOIN helpers h ON ha.helper_id = h.id
-            LEFT JOIN boat_functions bf ON ha.boat_function_id = bf.id
-            WHERE bf.production_id = ?
-            ORDER BY bf.sort_order, bf.id
-        """, (prod_id,)).fetchall()
-
-        result = []
-        for r in rows:
-            d = dict(r)
-            d["day_overrides"] = get_day_overrides_json(conn, "labour", d["id"])
-            rate_est = d.get("price_override") or d.get("helper_daily_rate_estimate") or 0
-            rate_act = d.get("helper_daily_rate_actual") or 0
-            wd = compute_working_days(d)
-            d["working_days"]    = wd
-            d["amount_estimate"] = round(wd * rate_est, 2)
-            d["amount_actual"]   = round(wd * rate_act, 2) if rate_act else None
-            result.append(d)
-        return result
+        rows, next_cursor = _query_collection(
+            conn, "helper_assignments", "WHERE bf.production_id = ?", [prod_id], query)
+        _enrich_assignments(conn, rows, "labour", "helper", query and query.get("fields"))
+        return _finish_collection(rows, next_cursor, query)
 
 
 def create_helper_assignment(data):
@@ -3122,6 +3735,7 @@ def get_location_schedules(prod_id):
 def upsert_location_schedule(data):
     """Create or update a location schedule cell (P/F/W)."""
     with get_db() as conn:
+        _hint_alerts(conn, data['production_id'], ('location_schedules', 'locations'), [data['date']])
         _resolve_location_id(conn, data['production_id'], data)
         conn.execute(
             """INSERT OR REPLACE INTO location_schedules
@@ -3144,6 +3758,7 @@ def upsert_location_schedule(data):
 
 def delete_location_schedule(prod_id, location_name, date, location_id=None):
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'location_schedules', [date])
         if location_id:
             conn.execute(
                 "DELETE FROM location_schedules WHERE production_id=? AND location_id=? AND date=?",
@@ -3158,12 +3773,17 @@ def delete_location_schedule(prod_id, location_name, date, location_id=None):
 
 def delete_location_schedule_by_id(schedule_id):
     with get_db() as conn:
+        r = conn.execute("SELECT production_id, date FROM location_schedules WHERE id=?",
+                         (schedule_id,)).fetchone()
+        if r:
+            _hint_alerts(conn, r['production_id'], 'location_schedules', [r['date']])
         conn.execute("DELETE FROM location_schedules WHERE id=?", (schedule_id,))
 
 
 def lock_location_schedules(prod_id, dates, locked):
     """Lock or unlock location schedule cells for given dates."""
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'location_schedules')
         for d in dates:
             conn.execute(
                 "UPDATE location_schedules SET locked=? WHERE production_id=? AND date=?",
@@ -3173,57 +3793,22 @@ def lock_location_schedules(prod_id, dates, locked):
 
 def auto_fill_locations_from_pdt(prod_id):
     """Auto-fill location schedules with 'F' from shooting days data."""
-    from database import get_shooting_days
     days = get_shooting_days(prod_id)
+    matcher = get_location_matcher(prod_id)
 
-    # Load location sites from DB dynamically
-    db_sites = get_location_sites(prod_id)
-    # Build lookup: uppercase name -> (original_name, location_type, id)
-    site_lookup = {}
-    for s in db_sites:
-        site_lookup[s['name'].upper()] = (s['name'], s.get('location_type', 'game'), s['id'])
-    # Add common aliases
-    if any(s['name'] == 'ARENA (SABOGA)' for s in db_sites):
-        arena_site = next(s for s in db_sites if s['name'] == 'ARENA (SABOGA)')
-        site_lookup['ARENA'] = ('ARENA (SABOGA)', 'game', arena_site['id'])
-        site_lookup['SABOGA'] = ('ARENA (SABOGA)', 'game', arena_site['id'])
-
-    created = 0
-    with get_db() as conn:
-        for day in days:
-            locations_found = set()  # set of (original_name, location_type, location_id)
-            # Check main location
-            if day.get('location'):
-                loc_upper = day['location'].strip().upper()
-                for uname, (orig, ltype, lid) in site_lookup.items():
-                    if uname in loc_upper or loc_upper in uname:
-                        locations_found.add((orig, ltype, lid))
-            # Check events
-            for ev in day.get('events', []):
-                if ev.get('location'):
-                    ev_loc = ev['location'].strip().upper()
-                    for uname, (orig, ltype, lid) in site_lookup.items():
-                        if uname in ev_loc or ev_loc in uname:
-                            locations_found.add((orig, ltype, lid))
-                # Also map ARENA from arena event type
-                if ev.get('event_type') == 'arena' and 'ARENA (SABOGA)' in site_lookup:
-                    locations_found.add(site_lookup['ARENA (SABOGA)'])
-                elif ev.get('event_type') == 'arena':
-                    # fallback
-                    locations_found.add(('ARENA (SABOGA)', 'game', None))
-
-            for loc_name, loc_type, loc_id in locations_found:
-                try:
-                    conn.execute(
-                        """INSERT OR IGNORE INTO location_schedules
-                           (production_id, location_name, location_type, date, status, location_id)
-                           VALUES (?,?,?,?,?,?)""",
-                        (prod_id, loc_name, loc_type, day['date'], 'F', loc_id)
-                    )
-                    created += 1
-                except Exception:
-                    pass
-    return created
+    rows = []
+    for day in days:
+        for site in _pdt_day_location_sites(matcher, day):
+            rows.append((prod_id, site['name'], site['location_type'], day['date'], 'F', site['id']))
+    if rows:
+        with get_db() as conn:
+            conn.executemany(
+                """INSERT OR IGNORE INTO location_schedules
+                   (production_id, location_name, location_type, date, status, location_id)
+                   VALUES (?,?,?,?,?,?)""",
+                rows
+            )
+    return len(rows)
 
 
 def _normalize_location_name(name):
@@ -3239,6 +3824,180 @@ def _normalize_location_name(name):
     return s
 
 
+# ─── Location matcher (PDT name → location site) ─────────────────────────────
+
+# Common PDT spellings for sites, as {alias: site name}
+_LOCATION_ALIASES = {
+    'ARENA': 'ARENA (SABOGA)',
+    'SABOGA': 'ARENA (SABOGA)',
+}
+
+
+class LocationMatcher:
+    """Index of a production's location sites for resolving PDT location names.
+
+    Lookups: exact (uppercase), normalized (accent/case/space-insensitive),
+    alias, and substring in both directions (site name inside the PDT name via
+    an Aho-Corasick automaton, PDT name inside a site name via one scan of the
+    joined site names). Substring hits are returned in site order.
+    """
+
+    def __init__(self, sites, aliases=_LOCATION_ALIASES):
+        self.sites = []
+        self._by_upper = {}
+        self._by_norm = {}
+        self._aliases = {}
+        for s in sites:
+            self._index_site(s)
+        by_name = {s['name']: i for i, s in enumerate(self.sites)}
+        for alias, target in aliases.items():
+            if target in by_name:
+                self._aliases[_normalize_location_name(alias)] = by_name[target]
+        self._build_substring_index()
+
+    def _index_site(self, site):
+        idx = len(self.sites)
+        self.sites.append({'id': site.get('id'), 'name': site['name'],
+                           'location_type': site.get('location_type') or 'game'})
+        self._by_upper.setdefault(site['name'].strip().upper(), idx)
+        self._by_norm.setdefault(_normalize_location_name(site['name']), idx)
+
+    def _build_substring_index(self):
+        # Patterns: normalized site names and aliases -> (site index, is_alias)
+        patterns = [(norm, (idx, False)) for norm, idx in self._by_norm.items() if norm]
+        patterns += [(alias, (idx, True)) for alias, idx in self._aliases.items() if alias]
+        goto, fail, out = [{}], [0], [[]]
+        for pat, tag in patterns:
+            node = 0
+            for ch in pat:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                    goto[node][ch] = nxt
+                node = nxt
+            out[node].append(tag)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, out
+        # Joined text for "PDT name inside site name" scans
+        self._joined_parts = [(norm, tag) for norm, tag in patterns]
+        self._joined = '\x00'.join(p for p, _ in self._joined_parts)
+        self._joined_starts = []
+        pos = 0
+        for p, _ in self._joined_parts:
+            self._joined_starts.append(pos)
+            pos += len(p) + 1
+
+    def exact(self, name):
+        idx = self._by_upper.get((name or '').strip().upper())
+        return self.sites[idx] if idx is not None else None
+
+    def normalized(self, name):
+        idx = self._by_norm.get(_normalize_location_name(name))
+        return self.sites[idx] if idx is not None else None
+
+    def alias(self, name):
+        idx = self._aliases.get(_normalize_location_name(name))
+        return self.sites[idx] if idx is not None else None
+
+    def substring(self, name, include_aliases=False):
+        """Sites whose name contains, or is contained in, the given name."""
+        norm = _normalize_location_name(name)
+        if not norm:
+            return []
+        hits = set()
+        # Site names inside the PDT name
+        node = 0
+        for ch in norm:
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            hits.update(self._out[node])
+        # PDT name inside site names
+        start = self._joined.find(norm)
+        while start != -1:
+            part = bisect.bisect_right(self._joined_starts, start) - 1
+            hits.add(self._joined_parts[part][1])
+            start = self._joined.find(norm, start + 1)
+        indexes = sorted({idx for idx, is_alias in hits if include_aliases or not is_alias})
+        return [self.sites[i] for i in indexes]
+
+    def resolve(self, name):
+        """Best single match as (site, how): normalized, exact, alias, then substring."""
+        for how, lookup in (('normalized', self.normalized), ('exact', self.exact),
+                            ('alias', self.alias)):
+            site = lookup(name)
+            if site:
+                return site, how
+        found = self.substring(name)
+        if found:
+            return found[0], 'substring'
+        return None, None
+
+    def add(self, site):
+        """Register a newly created site. Matchers from get_location_matcher()
+        may be shared with other threads: add to a copy() of those."""
+        self._index_site(site)
+        self._build_substring_index()
+
+    def copy(self):
+        """A private matcher over the same sites, safe to add() to."""
+        other = object.__new__(LocationMatcher)
+        other.__dict__.update(self.__dict__)
+        other.sites = list(self.sites)
+        other._by_upper = dict(self._by_upper)
+        other._by_norm = dict(self._by_norm)
+        other._aliases = dict(self._aliases)
+        return other
+
+
+_location_matchers = {}  # { prod_id: (locations data version, LocationMatcher) }
+
+
+def get_location_matcher(prod_id, conn=None):
+    """Return the cached LocationMatcher for a production (rebuilt when locations
+    change; never cached inside a shared transaction)."""
+    version = None if in_shared_transaction() else get_data_version(("locations",))
+    cached = _location_matchers.get(prod_id)
+    if cached and version is not None and cached[0] == version:
+        return cached[1]
+    sql = "SELECT id, name, location_type FROM locations WHERE production_id=? AND deleted_at IS NULL ORDER BY id"
+    if conn is not None:
+        rows = conn.execute(sql, (prod_id,)).fetchall()
+    else:
+        with get_db() as c:
+            rows = c.execute(sql, (prod_id,)).fetchall()
+    matcher = LocationMatcher([dict(r) for r in rows])
+    if version is not None:
+        _location_matchers[prod_id] = (version, matcher)
+    return matcher
+
+
+def _pdt_day_location_sites(matcher, day):
+    """All sites referenced by a PDT day (main location, event locations, arena events)."""
+    found = {}
+    names = [day.get('location')] + [ev.get('location') for ev in day.get('events', [])]
+    for name in names:
+        if name and name.strip():
+            for site in matcher.substring(name, include_aliases=True):
+                found[site['name']] = site
+    if any(ev.get('event_type') == 'arena' for ev in day.get('events', [])):
+        arena = matcher.exact('ARENA (SABOGA)')
+        found['ARENA (SABOGA)'] = arena or {'id': None, 'name': 'ARENA (SABOGA)', 'location_type': 'game'}
+    return list(found.values())
+
+
 def sync_pdt_day_to_locations(prod_id, day_date, locations_from_pdt):
     """Sync a single PDT day's locations to the location_schedules table.
 
@@ -3263,55 +4022,33 @@ def sync_pdt_day_to_locations(prod_id, day_date, locations_from_pdt):
             loc_names.add(name.strip())
 
     with get_db() as conn:
-        # Load existing location sites for matching
-        db_sites = [dict(r) for r in conn.execute(
-            "SELECT * FROM locations WHERE production_id=?", (prod_id,)
-        ).fetchall()]
-        # Build normalized lookup: normalized_name -> (canonical_name, location_type, id)
-        site_lookup = {}
-        site_lookup_upper = {}  # Keep uppercase for backward compat
-        for s in db_sites:
-            norm = _normalize_location_name(s['name'])
-            site_lookup[norm] = (s['name'], s.get('location_type', 'game'), s['id'])
-            site_lookup_upper[s['name'].upper()] = (s['name'], s.get('location_type', 'game'), s['id'])
+        _hint_alerts(conn, prod_id, ('location_schedules', 'locations'), [day_date])
+        matcher = get_location_matcher(prod_id, conn)
+        own_matcher = False
 
         # Resolve each PDT location to a canonical site name + id, auto-creating if needed
         # resolved: set of (canonical_name, location_id)
         resolved = set()
         for raw_name in loc_names:
-            raw_norm = _normalize_location_name(raw_name)
-            raw_upper = raw_name.upper()
-
-            # Try normalized match first
-            if raw_norm in site_lookup:
-                resolved.add((site_lookup[raw_norm][0], site_lookup[raw_norm][2]))
-                sync_log['matched'].append(raw_name)
+            site, how = matcher.resolve(raw_name)
+            if site:
+                resolved.add((site['name'], site['id']))
+                sync_log['matched'].append(
+                    raw_name if how in ('normalized', 'exact') else f"{raw_name} -> {site['name']}")
                 continue
-            # Fallback: uppercase exact match
-            if raw_upper in site_lookup_upper:
-                resolved.add((site_lookup_upper[raw_upper][0], site_lookup_upper[raw_upper][2]))
-                sync_log['matched'].append(raw_name)
-                continue
-            # Try substring match on normalized names
-            matched = False
-            for norm_name, (orig, ltype, lid) in site_lookup.items():
-                if norm_name in raw_norm or raw_norm in norm_name:
-                    resolved.add((orig, lid))
-                    sync_log['matched'].append(f"{raw_name} -> {orig}")
-                    matched = True
-                    break
-            if not matched:
-                # Auto-create a new location site
-                cursor = conn.execute(
-                    "INSERT INTO locations (production_id, name, location_type) VALUES (?,?,?)",
-                    (prod_id, raw_name, 'game')
-                )
-                new_id = cursor.lastrowid
-                norm = _normalize_location_name(raw_name)
-                site_lookup[norm] = (raw_name, 'game', new_id)
-                site_lookup_upper[raw_upper] = (raw_name, 'game', new_id)
-                resolved.add((raw_name, new_id))
-                sync_log['created'].append(raw_name)
+            # Auto-create a new location site
+            cursor = conn.execute(
+                "INSERT INTO locations (production_id, name, location_type) VALUES (?,?,?)",
+                (prod_id, raw_name, 'game')
+            )
+            new_id = cursor.lastrowid
+            # Other threads may hold the cached matcher: never show them a
+            # site this transaction may still roll back
+            if not own_matcher:
+                matcher, own_matcher = matcher.copy(), True
+            matcher.add({'id': new_id, 'name': raw_name, 'location_type': 'game'})
+            resolved.add((raw_name, new_id))
+            sync_log['created'].append(raw_name)
         resolved_names = set(r[0] for r in resolved)
         resolved_id_by_name = {r[0]: r[1] for r in resolved}
 
@@ -3336,10 +4073,8 @@ def sync_pdt_day_to_locations(prod_id, day_date, locations_from_pdt):
             if locked_row and locked_row['locked']:
                 continue
             # Find location_type
-            loc_type = 'game'
-            norm = _normalize_location_name(loc_name)
-            if norm in site_lookup:
-                loc_type = site_lookup[norm][1]
+            site = matcher.normalized(loc_name)
+            loc_type = site['location_type'] if site else 'game'
             conn.execute(
                 """INSERT OR REPLACE INTO location_schedules
                    (production_id, location_name, location_type, date, status, locked, notes, location_id)
@@ -3383,6 +4118,104 @@ def sync_pdt_day_to_locations(prod_id, day_date, locations_from_pdt):
     return sync_log
 
 
+def resync_pdt_locations(prod_id):
+    """Resync 'F' location cells for every PDT day of a production in one transaction.
+
+    Same rules as sync_pdt_day_to_locations(), applied to all dates at once:
+    the target F set is computed in memory, diffed against location_schedules
+    read in one query, then inserts/updates/deletes are applied in bulk.
+    Only dates whose PDT days name a location are touched; locked cells and
+    P/W entries on non-PDT cells are left alone.
+    Returns: dict with 'created', 'matched', 'ignored' lists for logging.
+    """
+    sync_log = {'created': [], 'matched': [], 'ignored': []}
+
+    # date -> set of raw PDT location names (several days may share a date)
+    names_by_date = {}
+    for day in get_shooting_days(prod_id):
+        if not day.get('date'):
+            continue
+        names = [day.get('location')] + [ev.get('location') for ev in day.get('events', [])]
+        names = {n.strip() for n in names if n and n.strip()}
+        if names:
+            names_by_date.setdefault(day['date'], set()).update(names)
+    if not names_by_date:
+        return sync_log
+
+    with get_db() as conn:
+        _hint_alerts(conn, prod_id, ('location_schedules', 'locations'), None)
+        matcher = get_location_matcher(prod_id, conn)
+        own_matcher = False
+
+        # Resolve every distinct PDT name once, auto-creating unknown sites
+        site_by_raw = {}
+        for raw_name in sorted(set().union(*names_by_date.values())):
+            site, how = matcher.resolve(raw_name)
+            if site:
+                sync_log['matched'].append(
+                    raw_name if how in ('normalized', 'exact') else f"{raw_name} -> {site['name']}")
+            else:
+                cursor = conn.execute(
+                    "INSERT INTO locations (production_id, name, location_type) VALUES (?,?,?)",
+                    (prod_id, raw_name, 'game')
+                )
+                site = {'id': cursor.lastrowid, 'name': raw_name, 'location_type': 'game'}
+                if not own_matcher:  # the cached one may be in use by other threads
+                    matcher, own_matcher = matcher.copy(), True
+                matcher.add(site)
+                sync_log['created'].append(raw_name)
+            site_by_raw[raw_name] = site
+
+        # Target F cells
+        target = {}
+        for date, names in names_by_date.items():
+            for raw_name in names:
+                site = site_by_raw[raw_name]
+                target[(site['name'], date)] = site
+
+        existing = {
+            (r['location_name'], r['date']): dict(r)
+            for r in conn.execute(
+                "SELECT id, location_name, location_type, date, status, locked, location_id "
+                "FROM location_schedules WHERE production_id=?", (prod_id,)
+            ).fetchall()
+        }
+
+        inserts, updates, deletes = [], [], []
+        for (loc_name, date), site in target.items():
+            row = existing.get((loc_name, date))
+            if row is None:
+                inserts.append((prod_id, loc_name, site['location_type'], date, site['id']))
+            elif not row['locked'] and (row['status'], row['location_type'], row['location_id']) != \
+                    ('F', site['location_type'], site['id']):
+                updates.append((site['location_type'], site['id'], row['id']))
+        for (loc_name, date), row in existing.items():
+            if (row['status'] != 'F' or row['locked'] or date not in names_by_date
+                    or (loc_name, date) in target):
+                continue
+            # Still referenced by a PDT name on that date (same rule as LIKE '%name%')
+            if any(loc_name.lower() in raw.lower() for raw in names_by_date[date]):
+                continue
+            deletes.append((row['id'],))
+
+        if inserts:
+            conn.executemany(
+                """INSERT INTO location_schedules
+                   (production_id, location_name, location_type, date, status, locked, location_id)
+                   VALUES (?,?,?,?,'F',0,?)""",
+                inserts
+            )
+        if updates:
+            conn.executemany(
+                "UPDATE location_schedules SET status='F', location_type=?, location_id=? WHERE id=?",
+                updates
+            )
+        if deletes:
+            conn.executemany("DELETE FROM location_schedules WHERE id=?", deletes)
+
+    return sync_log
+
+
 def remove_pdt_film_days_for_date(prod_id, day_date):
     """Remove all F entries for a given date that came from PDT sync.
     Called when a shooting day is deleted. Only removes F, never P or W.
@@ -3390,6 +4223,7 @@ def remove_pdt_film_days_for_date(prod_id, day_date):
     if not day_date:
         return
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'location_schedules', [day_date])
         # Only delete F entries that are NOT locked and where no other shooting day
         # on the same date references this location
         f_entries = conn.execute(
@@ -3418,27 +4252,157 @@ def remove_pdt_film_days_for_date(prod_id, day_date):
                 )
 
 
-# ─── Guard Location Schedules ───────────────────────────────────────────────
+# Grid name -> (table, editable cell fields)
+_SCHEDULE_GRIDS = {
+    'location': ('location_schedules', ('status', 'location_type', 'notes')),
+    'guard': ('guard_location_schedules', ('status', 'nb_guards')),
+}
 
-def get_guard_location_schedules(prod_id):
-    with get_db() as conn:
-        rows = conn.execute(
-            """SELECT gls.*, COALESCE(l.name, gls.location_name) AS location_name
-               FROM guard_location_schedules gls
-               LEFT JOIN locations l ON gls.location_id = l.id
-               WHERE gls.production_id=?
-               ORDER BY location_name, date""",
-            (prod_id,)
-        ).fetchall()
-        return [dict(r) for r in rows]
 
+def apply_schedule_cell_changes(prod_id, grid, changes):
+    """Apply a batch of grid cell changes (upsert / delete / lock) in one transaction.
+
+    changes: list of {'op': 'upsert'|'delete'|'lock', 'date', 'location_name'
+    or 'location_id', 'status', ...}, already validated. They are applied in
+    order to an in-memory copy of the touched date range, then the net result
+    is written with executemany. Cells on a locked date are skipped, like in
+    the grid UI. Editing the locations grid re-runs the guard sync once, on
+    the same connection.
+    Returns {'upserted', 'deleted', 'locked', 'skipped'} (+ 'guard' diff for
+    the locations grid).
+    """
+    table, fields = _SCHEDULE_GRIDS[grid]
+    result = {'upserted': [], 'deleted': [], 'locked': [], 'skipped': []}
+    if grid == 'location':
+        result['guard'] = {'created': [], 'deleted': []}
+    if not changes:
+        return result
+    dates = sorted({c['date'] for c in changes})
 
-def upsert_guard_location_schedule(data):
     with get_db() as conn:
-        _resolve_location_id(conn, data['production_id'], data)
-        conn.execute(
-            """INSERT OR REPLACE INTO guard_location_schedules
-               (production_id, location_name, date, status, nb_guards,
+        _hint_alerts(conn, prod_id, (table, 'locations'), dates)
+        sites = [dict(r) for r in conn.execute(
+            "SELECT id, name, location_type FROM locations WHERE production_id=?", (prod_id,)
+        ).fetchall()]
+        site_by_id = {s['id']: s for s in sites}
+        site_by_name = {s['name']: s for s in sites}
+        original = {
+            (r['location_name'], r['date']): dict(r)
+            for r in conn.execute(
+                f"SELECT * FROM {table} WHERE production_id=? AND date BETWEEN ? AND ?",
+                (prod_id, dates[0], dates[-1])
+            ).fetchall()
+        }
+        state = {k: dict(r) for k, r in original.items()}
+        key_by_loc_id = {(r['location_id'], r['date']): k
+                         for k, r in original.items() if r.get('location_id')}
+        locked_dates = {r['date'] for r in original.values() if r['locked']}
+
+        for i, change in enumerate(changes):
+            op, date = change.get('op', 'upsert'), change['date']
+            if op == 'lock':
+                locked = 1 if change.get('locked', True) else 0
+                for (_, d), row in state.items():
+                    if d == date:
+                        row['locked'] = locked
+                (locked_dates.add if locked else locked_dates.discard)(date)
+                result['locked'].append({'date': date, 'locked': bool(locked)})
+                continue
+            if date in locked_dates:
+                result['skipped'].append({'index': i, 'reason': 'locked'})
+                continue
+
+            loc_id, name = change.get('location_id'), change.get('location_name')
+            site = site_by_id.get(loc_id) if loc_id else site_by_name.get(name)
+            if site:
+                loc_id, name = site['id'], name or site['name']
+            key = key_by_loc_id.get((loc_id, date)) or (name, date)
+            row = state.get(key)
+
+            if op == 'delete':
+                state.pop(key, None)
+                continue
+            if row is None:
+                if not change.get('status'):
+                    result['skipped'].append({'index': i, 'reason': 'missing_status'})
+                    continue
+                row = {'production_id': prod_id, 'location_name': key[0], 'date': date,
+                       'locked': 0, 'location_id': loc_id}
+                if grid == 'location':
+                    row.update(location_type=(site or {}).get('location_type') or 'game',
+                               notes=None)
+                else:
+                    row['nb_guards'] = 1
+                state[key] = row
+                if loc_id:
+                    key_by_loc_id[(loc_id, date)] = key
+            for f in fields:
+                if change.get(f) is not None:
+                    row[f] = int(change[f]) if f == 'nb_guards' else change[f]
+
+        tracked = fields + ('locked', 'location_id')
+        inserts = [k for k in state if k not in original]
+        deletes = [k for k in original if k not in state]
+        updates = [k for k in state if k in original
+                   and any(state[k].get(f) != original[k].get(f) for f in tracked)]
+
+        if deletes:
+            conn.executemany(f"DELETE FROM {table} WHERE id=?",
+                             [(original[k]['id'],) for k in deletes])
+        if updates:
+            conn.executemany(
+                f"UPDATE {table} SET {', '.join(f + '=?' for f in tracked)} WHERE id=?",
+                [tuple(state[k].get(f) for f in tracked) + (original[k]['id'],) for k in updates]
+            )
+        if inserts:
+            cols = ('production_id', 'location_name', 'date') + tracked
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                [tuple(state[k].get(c) for c in cols) for k in inserts]
+            )
+
+        changed = set(inserts) | set(updates)
+        if changed:
+            result['upserted'] = [
+                dict(r) for r in conn.execute(
+                    f"SELECT * FROM {table} WHERE production_id=? AND date BETWEEN ? AND ? "
+                    f"ORDER BY location_name, date",
+                    (prod_id, dates[0], dates[-1])
+                ).fetchall()
+                if (r['location_name'], r['date']) in changed
+            ]
+        result['deleted'] = [original[k] for k in deletes]
+
+        if grid == 'location' and (inserts or deletes):
+            created, removed = _sync_guard_location(conn, prod_id)
+            result['guard'] = {'created': created, 'deleted': removed}
+
+    return result
+
+
+# ─── Guard Location Schedules ───────────────────────────────────────────────
+
+def get_guard_location_schedules(prod_id):
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT gls.*, COALESCE(l.name, gls.location_name) AS location_name
+               FROM guard_location_schedules gls
+               LEFT JOIN locations l ON gls.location_id = l.id
+               WHERE gls.production_id=?
+               ORDER BY location_name, date""",
+            (prod_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def upsert_guard_location_schedule(data):
+    with get_db() as conn:
+        _hint_alerts(conn, data['production_id'], ('guard_location_schedules', 'locations'),
+                     [data['date']])
+        _resolve_location_id(conn, data['production_id'], data)
+        conn.execute(
+            """INSERT OR REPLACE INTO guard_location_schedules
+               (production_id, location_name, date, status, nb_guards,
                 locked, location_id)
                VALUES (?,?,?,?,?,
                  COALESCE((SELECT locked FROM guard_location_schedules
@@ -3458,6 +4422,7 @@ def upsert_guard_location_schedule(data):
 
 def delete_guard_location_schedule(prod_id, location_name, date, location_id=None):
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'guard_location_schedules', [date])
         if location_id:
             conn.execute(
                 "DELETE FROM guard_location_schedules WHERE production_id=? AND location_id=? AND date=?",
@@ -3472,6 +4437,7 @@ def delete_guard_location_schedule(prod_id, location_name, date, location_id=Non
 
 def lock_guard_location_schedules(prod_id, dates, locked):
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'guard_location_schedules')
         for d in dates:
             conn.execute(
                 "UPDATE guard_location_schedules SET locked=? WHERE production_id=? AND date=?",
@@ -3479,67 +4445,125 @@ def lock_guard_location_schedules(prod_id, dates, locked):
             )
 
 
-def sync_guard_location_from_locations(prod_id):
+# Effective location name of a location_schedules row (aliased ls, joined l)
+_LOC_ACTIVE_NAME = "COALESCE(l.name, ls.location_name)"
+
+_GUARD_PHASE_COLUMNS = {'P': 'guards_prep', 'F': 'guards_film', 'W': 'guards_wrap'}
+
+
+def sync_guard_location_from_locations(prod_id, diff=False):
     """Sync guard_location_schedules from location_schedules.
     For each location/date with P/F/W activity, ensure a guard_location_schedule
     entry exists (with default nb_guards from guard_post config per phase).
     Remove entries where the location no longer has activity.
-    Returns the full list of guard_location_schedules."""
-    loc_sites = get_location_sites(prod_id)
-    loc_schedules = get_location_schedules(prod_id)
-    type_by_name = {s['name']: s.get('location_type', 'game') for s in loc_sites}
+    Missing and stale pairs are found with two anti-join queries and applied
+    with executemany, so cost follows the number of changed cells.
+    Returns the full list of guard_location_schedules, or with diff=True
+    a dict {'created': [...], 'deleted': [...]} of the changed rows."""
+    with get_db() as conn:
+        created, deleted = _sync_guard_location(conn, prod_id)
 
-    # Build guard_post lookup by name for phase-based defaults
-    guard_posts = get_guard_posts(prod_id)
-    gp_by_name = {gp['name']: gp for gp in guard_posts}
+    if diff:
+        return {'created': created, 'deleted': deleted}
+    return get_guard_location_schedules(prod_id)
 
-    # Build set of active (location_name, date) from location_schedules
-    active_pairs = set()
-    for ls in loc_schedules:
-        active_pairs.add((ls['location_name'], ls['date']))
 
-    with get_db() as conn:
-        # Get existing guard_location_schedules
-        existing = conn.execute(
-            "SELECT * FROM guard_location_schedules WHERE production_id=?",
-            (prod_id,)
-        ).fetchall()
-        existing_pairs = {(r['location_name'], r['date']): dict(r) for r in existing}
-
-        # Insert missing entries with default nb_guards from guard_post config
-        for ls in loc_schedules:
-            key = (ls['location_name'], ls['date'])
-            if key not in existing_pairs:
-                status = ls.get('status', 'P')
-                gp = gp_by_name.get(ls['location_name'])
-                if gp:
-                    phase_map = {'P': 'guards_prep', 'F': 'guards_film', 'W': 'guards_wrap'}
-                    default_guards = gp.get(phase_map.get(status, 'guards_film'), 2) or 2
-                else:
-                    loc_type = type_by_name.get(ls['location_name'], 'game')
-                    default_guards = 4 if loc_type == 'tribal_camp' else 2
-                conn.execute(
-                    """INSERT OR IGNORE INTO guard_location_schedules
-                       (production_id, location_name, date, status, nb_guards, locked, location_id)
-                       VALUES (?,?,?,?,?,0,?)""",
-                    (prod_id, ls['location_name'], ls['date'],
-                     status, default_guards, ls.get('location_id'))
-                )
+def _rows_by_ids(conn, table, ids, chunk=500):
+    """Rows of `table` with the given ids, as dicts in id order."""
+    rows = []
+    for i in range(0, len(ids), chunk):
+        part = ids[i:i + chunk]
+        rows += [dict(r) for r in conn.execute(
+            f"SELECT * FROM {table} WHERE id IN ({','.join('?' * len(part))})", part
+        ).fetchall()]
+    return sorted(rows, key=lambda r: r['id'])
 
-        # Remove entries where the location no longer has activity
-        for (loc_name, date), entry in existing_pairs.items():
-            if (loc_name, date) not in active_pairs:
-                conn.execute(
-                    "DELETE FROM guard_location_schedules WHERE production_id=? AND location_name=? AND date=?",
-                    (prod_id, loc_name, date)
-                )
 
-    return get_guard_location_schedules(prod_id)
+def _guard_cells_by_key(conn, prod_id, keys, chunk=400):
+    """guard_location_schedules rows of a production for the given
+    (location_name, date) keys, as dicts in id order."""
+    rows = []
+    for i in range(0, len(keys), chunk):
+        part = keys[i:i + chunk]
+        rows += [dict(r) for r in conn.execute(
+            f"""SELECT * FROM guard_location_schedules
+               WHERE production_id=? AND (location_name, date) IN ({','.join(['(?,?)'] * len(part))})""",
+            [prod_id] + [v for key in part for v in key]
+        ).fetchall()]
+    return sorted(rows, key=lambda r: r['id'])
+
+
+def _sync_guard_location(conn, prod_id):
+    """Apply the guard sync on an open connection. Returns (created, deleted) rows."""
+    missing = conn.execute(
+        f"""SELECT {_LOC_ACTIVE_NAME} AS location_name, ls.date, ls.status, ls.location_id,
+                  gp.id AS gp_id, gp.guards_prep, gp.guards_film, gp.guards_wrap,
+                  site.location_type AS site_type
+           FROM location_schedules ls
+           LEFT JOIN locations l ON ls.location_id = l.id
+           LEFT JOIN guard_location_schedules g
+             ON g.production_id = ls.production_id
+            AND g.location_name = {_LOC_ACTIVE_NAME} AND g.date = ls.date
+           LEFT JOIN guard_posts gp ON gp.id = (
+               SELECT MAX(id) FROM guard_posts
+               WHERE production_id = ls.production_id AND name = {_LOC_ACTIVE_NAME}
+                 AND deleted_at IS NULL)
+           LEFT JOIN locations site ON site.id = (
+               SELECT MAX(id) FROM locations
+               WHERE production_id = ls.production_id AND name = {_LOC_ACTIVE_NAME}
+                 AND deleted_at IS NULL)
+           WHERE ls.production_id=? AND g.id IS NULL
+           ORDER BY location_name, ls.date""",
+        (prod_id,)
+    ).fetchall()
+    stale = conn.execute(
+        f"""SELECT g.* FROM guard_location_schedules g
+           WHERE g.production_id=? AND NOT EXISTS (
+               SELECT 1 FROM location_schedules ls
+               LEFT JOIN locations l ON ls.location_id = l.id
+               WHERE ls.production_id = g.production_id
+                 AND ls.date = g.date AND {_LOC_ACTIVE_NAME} = g.location_name)
+           ORDER BY g.location_name, g.date""",
+        (prod_id,)
+    ).fetchall()
+
+    created, seen = [], set()
+    for r in missing:
+        key = (r['location_name'], r['date'])
+        if key in seen:
+            continue
+        seen.add(key)
+        status = r['status'] or 'P'
+        if r['gp_id']:
+            default_guards = r[_GUARD_PHASE_COLUMNS.get(status, 'guards_film')] or 2
+        else:
+            default_guards = 4 if r['site_type'] == 'tribal_camp' else 2
+        created.append((prod_id, r['location_name'], r['date'], status,
+                        default_guards, r['location_id']))
+    if created:
+        conn.executemany(
+            """INSERT OR IGNORE INTO guard_location_schedules
+               (production_id, location_name, date, status, nb_guards, locked, location_id)
+               VALUES (?,?,?,?,?,0,?)""",
+            created
+        )
+        created = _guard_cells_by_key(conn, prod_id, [(c[1], c[2]) for c in created])
+    deleted = [dict(r) for r in stale]
+    if deleted:
+        conn.executemany(
+            "DELETE FROM guard_location_schedules WHERE id=?",
+            [(d['id'],) for d in deleted]
+        )
+    _hint_alerts(conn, prod_id, 'guard_location_schedules',
+                 [r['date'] for r in created + deleted])
+
+    return created, deleted
 
 
 def update_guard_location_nb_guards(prod_id, location_name, date, nb_guards, location_id=None):
     """Update the nb_guards value for a specific guard_location_schedule entry."""
     with get_db() as conn:
+        _hint_alerts(conn, prod_id, 'guard_location_schedules', [date])
         if location_id:
             conn.execute(
                 """UPDATE guard_location_schedules SET nb_guards=?
@@ -3720,20 +4744,25 @@ def delete_fnb_tracking(entry_id):
 
 def get_fnb_summary(prod_id):
     """Return comparison of estimated vs actual FNB costs."""
-    tracking = get_fnb_tracking(prod_id)
-
-    # Actual totals by category
-    actual_by_cat = {}
-    for t in tracking:
-        cat = t['category']
-        if cat not in actual_by_cat:
-            actual_by_cat[cat] = {'pax_total': 0, 'cost_total': 0}
-        actual_by_cat[cat]['pax_total'] += t.get('pax_actual', 0) or 0
-        actual_by_cat[cat]['cost_total'] += t.get('cost_actual', 0) or 0
+    with get_db() as conn:
+        tracking = conn.execute(
+            "SELECT * FROM fnb_daily_tracking WHERE production_id=? ORDER BY date, category",
+            (prod_id,)
+        ).fetchall()
+        # Actual totals by category
+        totals = conn.execute(
+            """SELECT category, SUM(COALESCE(pax_actual, 0)) AS pax_total,
+                      SUM(COALESCE(cost_actual, 0)) AS cost_total
+               FROM fnb_daily_tracking WHERE production_id=?
+               GROUP BY category""",
+            (prod_id,)
+        ).fetchall()
 
     return {
-        'tracking': tracking,
-        'actual_by_category': actual_by_cat,
+        'tracking': [dict(r) for r in tracking],
+        'actual_by_category': {r['category']: {'pax_total': r['pax_total'],
+                                               'cost_total': r['cost_total']}
+                               for r in totals},
     }
 
 
@@ -3836,16 +4865,15 @@ def delete_fnb_item(item_id):
         conn.execute("UPDATE fnb_items SET deleted_at = datetime('now') WHERE id=?", (item_id,))
 
 
-def get_fnb_entries(prod_id, entry_type=None):
+def get_fnb_entries(prod_id, entry_type=None, query=None):
     with get_db() as conn:
-        sql = "SELECT * FROM fnb_entries WHERE production_id=?"
+        where = "WHERE fn.production_id=?"
         params = [prod_id]
         if entry_type:
-            sql += " AND entry_type=?"
+            where += " AND fn.entry_type=?"
             params.append(entry_type)
-        sql += " ORDER BY date, item_id"
-        rows = conn.execute(sql, params).fetchall()
-        return [dict(r) for r in rows]
+        rows, next_cursor = _query_collection(conn, "fnb_entries", where, params, query)
+        return _finish_collection(rows, next_cursor, query)
 
 
 def upsert_fnb_entry(data):
@@ -3869,49 +4897,92 @@ def delete_fnb_entry(entry_id):
         conn.execute("DELETE FROM fnb_entries WHERE id=?", (entry_id,))
 
 
-def get_fnb_budget_data(prod_id):
-    """Compute FNB budget from dynamic categories/items/entries."""
-    categories = get_fnb_categories(prod_id)
-    items = get_fnb_items(prod_id)
-    entries = get_fnb_entries(prod_id)
+FNB_BUDGET_TABLES = ("fnb_entries", "fnb_items", "fnb_categories")
+
+
+def get_fnb_budget_data(prod_id, date_from=None, date_to=None, by_date=False):
+    """Compute FNB budget from dynamic categories/items/entries.
+
+    Quantities are summed per item with one GROUP BY join, so the cost does
+    not grow with the number of daily entries. Entries can be restricted to
+    [date_from, date_to]. by_date=True adds 'by_date': {date: {purchase,
+    consumption}} costs for the tracking grid.
+    """
+    entry_filter, entry_params = "", []
+    if date_from:
+        entry_filter += " AND fn.date >= ?"
+        entry_params.append(date_from)
+    if date_to:
+        entry_filter += " AND fn.date <= ?"
+        entry_params.append(date_to)
 
-    # Build lookup: item_id -> { purchase_qty, consumption_qty }
-    item_totals = {}
-    for e in entries:
-        iid = e['item_id']
-        if iid not in item_totals:
-            item_totals[iid] = {'purchase': 0, 'consumption': 0}
-        item_totals[iid][e['entry_type']] += e.get('quantity', 0) or 0
+    with get_db() as conn:
+        rows = conn.execute(
+            f"""SELECT fc.id AS category_id, fc.name, fc.color, fi.unit_price,
+                       SUM(CASE WHEN fn.entry_type='purchase'
+                                THEN COALESCE(fn.quantity, 0) ELSE 0 END) AS purchase_qty,
+                       SUM(CASE WHEN fn.entry_type='consumption'
+                                THEN COALESCE(fn.quantity, 0) ELSE 0 END) AS consumption_qty
+                FROM fnb_categories fc
+                LEFT JOIN fnb_items fi ON fi.category_id = fc.id
+                     AND fi.production_id = fc.production_id AND fi.deleted_at IS NULL
+                LEFT JOIN fnb_entries fn ON fn.item_id = fi.id
+                     AND fn.production_id = fc.production_id{entry_filter}
+                WHERE fc.production_id=? AND fc.deleted_at IS NULL
+                GROUP BY fc.id, fi.id
+                ORDER BY fc.sort_order, fc.name, fi.sort_order, fi.name""",
+            entry_params + [prod_id]
+        ).fetchall()
+        series = []
+        if by_date:
+            series = conn.execute(
+                f"""SELECT fn.date, fn.entry_type,
+                           SUM(COALESCE(fn.quantity, 0) * COALESCE(fi.unit_price, 0)) AS cost
+                    FROM fnb_entries fn
+                    JOIN fnb_items fi ON fi.id = fn.item_id AND fi.deleted_at IS NULL
+                    JOIN fnb_categories fc ON fc.id = fi.category_id AND fc.deleted_at IS NULL
+                    WHERE fn.production_id=? AND fi.production_id=? AND fc.production_id=?
+                          {entry_filter}
+                    GROUP BY fn.date, fn.entry_type
+                    ORDER BY fn.date""",
+                [prod_id, prod_id, prod_id] + entry_params
+            ).fetchall()
 
     # Build per-category summary
     cat_summary = {}
-    for cat in categories:
-        cat_summary[cat['id']] = {
-            'name': cat['name'],
-            'color': cat['color'],
-            'purchase_total': 0,
-            'consumption_total': 0,
-        }
-
     grand_purchase = 0
     grand_consumption = 0
-    for it in items:
-        cid = it['category_id']
-        totals = item_totals.get(it['id'], {'purchase': 0, 'consumption': 0})
-        p_cost = totals['purchase'] * (it['unit_price'] or 0)
-        c_cost = totals['consumption'] * (it['unit_price'] or 0)
-        if cid in cat_summary:
-            cat_summary[cid]['purchase_total'] += p_cost
-            cat_summary[cid]['consumption_total'] += c_cost
+    for r in rows:
+        cat = cat_summary.get(r['category_id'])
+        if cat is None:
+            cat = cat_summary[r['category_id']] = {
+                'name': r['name'],
+                'color': r['color'],
+                'purchase_total': 0,
+                'consumption_total': 0,
+            }
+        price = r['unit_price'] or 0
+        p_cost = (r['purchase_qty'] or 0) * price
+        c_cost = (r['consumption_qty'] or 0) * price
+        cat['purchase_total'] += p_cost
+        cat['consumption_total'] += c_cost
         grand_purchase += p_cost
         grand_consumption += c_cost
 
-    return {
+    result = {
         'categories': list(cat_summary.values()),
         'grand_purchase': round(grand_purchase, 2),
         'grand_consumption': round(grand_consumption, 2),
         'balance': round(grand_purchase - grand_consumption, 2),
     }
+    if by_date:
+        by_date_costs = {}
+        for r in series:
+            day = by_date_costs.setdefault(r['date'], {'purchase': 0, 'consumption': 0})
+            if r['entry_type'] in day:
+                day[r['entry_type']] = round(r['cost'], 2)
+        result['by_date'] = by_date_costs
+    return result
 
 
 # ─── Budget ───────────────────────────────────────────────────────────────────
@@ -4075,29 +5146,32 @@ def get_budget(prod_id, ref_currency='USD'):
                 "source": "auto",
             })
 
-    # FUEL (static budget data)
-    fuel_data = [
-        {"name": "BOAT FUEL & OIL", "amount_estimate": 145000},
-        {"name": "VEHICLE FUEL & OIL", "amount_estimate": 10300},
-        {"name": "GENERATOR FUEL", "amount_estimate": 21000},
-        {"name": "HEAVY MACHINERY FUEL", "amount_estimate": 3000},
-    ]
-    for f in fuel_data:
-        f_ref = _convert(f["amount_estimate"], 'USD', ref_currency)
+    # FUEL (entries priced at locked or current prices)
+    fuel_lines = {}
+    for r in get_fuel_costs(prod_id)["rows"]:
+        line = fuel_lines.setdefault(_FUEL_BUDGET_LINES.get(r["source_type"], "OTHER FUEL"), [])
+        line.append(r)
+    for name in sorted(fuel_lines):
+        totals = summarize_fuel_costs(fuel_lines[name])
+        f_est = round(totals["cost"], 2)
+        f_act = round(totals["cost_up_to_date"], 2)
+        f_ref = _convert(f_est, 'USD', ref_currency)
         grand_total_est += f_ref
+        if f_act > 0:
+            grand_total_act += _convert(f_act, 'USD', ref_currency)
         rows.append({
             "department": "FUEL",
-            "name": f["name"],
+            "name": name,
             "boat": "",
             "vendor": "",
             "start_date": None,
             "end_date": None,
             "working_days": 1,
-            "unit_price_estimate": f["amount_estimate"],
-            "amount_estimate": f["amount_estimate"],
+            "unit_price_estimate": f_est,
+            "amount_estimate": f_est,
             "amount_estimate_ref": f_ref,
-            "amount_actual": None,
-            "amount_actual_ref": None,
+            "amount_actual": f_act if f_act > 0 else None,
+            "amount_actual_ref": _convert(f_act, 'USD', ref_currency) if f_act > 0 else None,
             "currency": "USD",
             "rate_to_ref": get_latest_rate('USD', ref_currency) if ref_currency != 'USD' else None,
             "source": "auto",
@@ -4276,8 +5350,182 @@ def _is_assignment_active_on(date_str, assignment):
     return True
 
 
-def get_daily_budget(prod_id):
-    """Compute cost breakdown per shooting day across all departments."""
+# ─── Daily cost series (persisted per-day budget) ────────────────────────────
+# get_daily_budget() reads a per-(production, department, date) series stored in
+# daily_cost_series. Each department is recomputed only when one of its source
+# tables has been written for that production since it was last refreshed.
+
+_DAILY_DEPARTMENTS = ("boats", "picture_boats", "security_boats", "transport",
+                      "labour", "guards", "locations", "fnb", "fuel")
+
+# Tables whose writes invalidate a department's series (on top of the PDT days)
+_DAILY_SERIES_SOURCES = {
+    "boats": ("boat_assignments", "boats", "boat_functions", "assignment_day_overrides"),
+    "picture_boats": ("picture_boat_assignments", "picture_boats", "boat_functions",
+                      "assignment_day_overrides"),
+    "security_boats": ("security_boat_assignments", "security_boats", "boat_functions",
+                       "assignment_day_overrides"),
+    "transport": ("transport_assignments", "transport_vehicles", "boat_functions",
+                  "assignment_day_overrides"),
+    "labour": ("helper_assignments", "helpers", "boat_functions", "assignment_day_overrides"),
+    "guards": ("guard_camp_assignments", "guard_camp_workers", "boat_functions",
+               "assignment_day_overrides", "guard_location_schedules"),
+    "locations": ("location_schedules", "locations"),
+    "fnb": ("fnb_entries", "fnb_items", "fnb_categories"),
+    "fuel": FUEL_COST_TABLES,
+}
+_DAILY_SERIES_DAY_TABLES = ("shooting_days",)
+
+# Every table get_daily_budget() depends on
+DAILY_BUDGET_TABLES = tuple(sorted(set(_DAILY_SERIES_DAY_TABLES).union(*_DAILY_SERIES_SOURCES.values())))
+
+# (prod_id, department) -> data version the stored series was computed from
+_daily_series_state = {}
+
+
+def _daily_department_costs(prod_id, dept, all_dates, assignments=None):
+    """Compute {date: amount} for one department over the PDT dates."""
+    costs = dict.fromkeys(all_dates, 0)
+    num_days = len(all_dates)
+
+    def _daily_rate(assignment, rate_key):
+        return assignment.get("price_override") or assignment.get(rate_key) or 0
+
+    loaders = {
+        "boats": (lambda: get_boat_assignments(prod_id, context='boats'), "boat_daily_rate_estimate"),
+        "picture_boats": (lambda: get_picture_boat_assignments(prod_id), "boat_daily_rate_estimate"),
+        "security_boats": (lambda: get_security_boat_assignments(prod_id), "boat_daily_rate_estimate"),
+        "transport": (lambda: get_transport_assignments(prod_id), "vehicle_daily_rate_estimate"),
+        "labour": (lambda: get_helper_assignments(prod_id), "helper_daily_rate_estimate"),
+        "guards": (lambda: get_guard_camp_assignments(prod_id), "helper_daily_rate_estimate"),
+    }
+    if dept in loaders:
+        loader, rate_key = loaders[dept]
+        rows = assignments[dept] if assignments and dept in assignments else loader()
+        for a in rows:
+            rate = _daily_rate(a, rate_key)
+            for date in all_dates:
+                if _is_assignment_active_on(date, a):
+                    costs[date] += rate
+
+    if dept == "guards":
+        # Location guards on top of base camp
+        for gls in get_guard_location_schedules(prod_id):
+            date = (gls.get("date") or "")[:10]
+            if date in costs:
+                costs[date] += gls.get("nb_guards", 2) * 45
+
+    elif dept == "locations":
+        site_pricing = {}
+        for s in get_location_sites(prod_id):
+            site_pricing[s["name"]] = {
+                "price_p": s.get("price_p") or 0,
+                "price_f": s.get("price_f") or 0,
+                "price_w": s.get("price_w") or 0,
+                "global_deal": s.get("global_deal"),
+            }
+        # For global_deal locations, distribute evenly across their scheduled days
+        loc_global_days = {}
+        for ls in get_location_schedules(prod_id):
+            loc_name = ls["location_name"]
+            pricing = site_pricing.get(loc_name, {})
+            if pricing.get("global_deal") and pricing["global_deal"] > 0:
+                loc_global_days.setdefault(loc_name, [])
+                if ls["status"] in ("P", "F", "W"):
+                    loc_global_days[loc_name].append(ls)
+            else:
+                date = (ls.get("date") or "")[:10]
+                if date in costs and ls["status"] in ("P", "F", "W"):
+                    costs[date] += pricing.get(f"price_{ls['status'].lower()}", 0)
+        for loc_name, entries in loc_global_days.items():
+            if entries:
+                per_day = site_pricing[loc_name]["global_deal"] / len(entries)
+                for ls in entries:
+                    date = (ls.get("date") or "")[:10]
+                    if date in costs:
+                        costs[date] += per_day
+
+    elif dept == "fnb":
+        # Distribute evenly across all days
+        fnb_budget = get_fnb_budget_data(prod_id)
+        fnb_total = sum(c.get("purchase_total", 0) or 0 for c in fnb_budget.get("categories", []))
+        if fnb_total > 0 and num_days > 0:
+            for date in all_dates:
+                costs[date] = fnb_total / num_days
+
+    elif dept == "fuel":
+        for date, amount in get_fuel_costs(prod_id)["by_date"].items():
+            if date in costs:
+                costs[date] += amount
+
+    return {date: round(amount, 2) for date, amount in costs.items()}
+
+
+def refresh_daily_cost_series(prod_id, all_dates=None, assignments=None, force=False):
+    """Recompute the stored daily cost series for departments whose sources
+    changed for this production (get_production_version, so writes in other
+    productions leave it alone). Only cells whose amount changed are upserted
+    and dates no longer in the PDT are removed.
+
+    Returns the list of refreshed departments.
+    """
+    if all_dates is None:
+        all_dates = sorted({(sd.get("date") or "")[:10]
+                            for sd in get_shooting_days(prod_id) if sd.get("date")})
+    day_version = get_production_version(prod_id, _DAILY_SERIES_DAY_TABLES)
+
+    # Capture versions before computing, so writes made meanwhile re-trigger a refresh
+    versions = {}
+    for dept in _DAILY_DEPARTMENTS:
+        version = (day_version, get_production_version(prod_id, _DAILY_SERIES_SOURCES[dept]))
+        if force or _daily_series_state.get((prod_id, dept)) != version:
+            versions[dept] = version
+    if not versions:
+        return []
+
+    computed = {}
+    for dept in versions:
+        for date, amount in _daily_department_costs(prod_id, dept, all_dates, assignments).items():
+            computed[(dept, date)] = amount
+
+    with get_db() as conn:
+        placeholders = ", ".join("?" * len(versions))
+        stored = {
+            (r["department"], r["date"]): r["amount"]
+            for r in conn.execute(
+                f"SELECT department, date, amount FROM daily_cost_series "
+                f"WHERE production_id=? AND department IN ({placeholders})",
+                (prod_id, *versions)
+            ).fetchall()
+        }
+        stale = [(prod_id, dept, date) for (dept, date) in stored if (dept, date) not in computed]
+        changed = [(prod_id, dept, date, amount) for (dept, date), amount in computed.items()
+                   if stored.get((dept, date)) != amount]
+        if stale:
+            conn.executemany(
+                "DELETE FROM daily_cost_series WHERE production_id=? AND department=? AND date=?",
+                stale
+            )
+        if changed:
+            conn.executemany(
+                """INSERT INTO daily_cost_series (production_id, department, date, amount)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(production_id, department, date) DO UPDATE SET amount = excluded.amount""",
+                changed
+            )
+    if not in_shared_transaction():  # the writes above may still be rolled back
+        for dept, version in versions.items():
+            _daily_series_state[(prod_id, dept)] = version
+    return list(versions)
+
+
+def get_daily_budget(prod_id, assignments=None):
+    """Compute cost breakdown per shooting day across all departments.
+
+    Reads the persisted daily cost series, refreshing stale departments first.
+    assignments: optional {department: rows} already loaded by the caller
+    (boats, picture_boats, security_boats, transport, labour, guards).
+    """
     prod = get_production(prod_id)
     if not prod:
         return {"days": [], "averages": {}}
@@ -4320,128 +5568,22 @@ def get_daily_budget(prod_id):
     all_dates = sorted(day_map.keys())
     if not all_dates:
         return {"days": [], "averages": {}}
-    num_days = len(all_dates)
-
-    def _daily_rate(assignment, rate_key):
-        return assignment.get("price_override") or assignment.get(rate_key) or 0
-
-    # --- BOATS ---
-    boat_asgns = get_boat_assignments(prod_id, context='boats')
-    for a in boat_asgns:
-        rate = _daily_rate(a, "boat_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["boats"] += rate
-
-    # --- PICTURE BOATS ---
-    pb_asgns = get_picture_boat_assignments(prod_id)
-    for a in pb_asgns:
-        rate = _daily_rate(a, "boat_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["picture_boats"] += rate
-
-    # --- SECURITY BOATS ---
-    sb_asgns = get_security_boat_assignments(prod_id)
-    for a in sb_asgns:
-        rate = _daily_rate(a, "boat_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["security_boats"] += rate
-
-    # --- TRANSPORT ---
-    tr_asgns = get_transport_assignments(prod_id)
-    for a in tr_asgns:
-        rate = _daily_rate(a, "vehicle_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["transport"] += rate
-
-    # --- LABOUR ---
-    lb_asgns = get_helper_assignments(prod_id)
-    for a in lb_asgns:
-        rate = _daily_rate(a, "helper_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["labour"] += rate
-
-    # --- GUARDS (Base Camp) ---
-    gc_asgns = get_guard_camp_assignments(prod_id)
-    for a in gc_asgns:
-        rate = _daily_rate(a, "helper_daily_rate_estimate")
-        for date in all_dates:
-            if _is_assignment_active_on(date, a):
-                day_map[date]["guards"] += rate
-
-    # --- GUARDS (Location) ---
-    guard_loc_schedules = get_guard_location_schedules(prod_id)
-    for gls in guard_loc_schedules:
-        date = (gls.get("date") or "")[:10]
-        if date in day_map:
-            nb = gls.get("nb_guards", 2)
-            day_map[date]["guards"] += nb * 45
-
-    # --- LOCATIONS ---
-    loc_schedules = get_location_schedules(prod_id)
-    loc_sites = get_location_sites(prod_id)
-    site_pricing = {}
-    for s in loc_sites:
-        site_pricing[s["name"]] = {
-            "price_p": s.get("price_p") or 0,
-            "price_f": s.get("price_f") or 0,
-            "price_w": s.get("price_w") or 0,
-            "global_deal": s.get("global_deal"),
-        }
-    # For global_deal locations, distribute evenly across their scheduled days
-    loc_global_days = {}
-    for ls in loc_schedules:
-        loc_name = ls["location_name"]
-        pricing = site_pricing.get(loc_name, {})
-        if pricing.get("global_deal") and pricing["global_deal"] > 0:
-            loc_global_days.setdefault(loc_name, [])
-            if ls["status"] in ("P", "F", "W"):
-                loc_global_days[loc_name].append(ls)
-        else:
-            date = (ls.get("date") or "")[:10]
-            if date in day_map and ls["status"] in ("P", "F", "W"):
-                price_key = f"price_{ls['status'].lower()}"
-                day_map[date]["locations"] += pricing.get(price_key, 0)
-
-    # Distribute global deals evenly
-    for loc_name, entries in loc_global_days.items():
-        if entries:
-            deal = site_pricing[loc_name]["global_deal"]
-            per_day = deal / len(entries)
-            for ls in entries:
-                date = (ls.get("date") or "")[:10]
-                if date in day_map:
-                    day_map[date]["locations"] += per_day
 
-    # --- FNB (distribute evenly across all days) ---
-    fnb_budget = get_fnb_budget_data(prod_id)
-    fnb_total = sum(c.get("purchase_total", 0) or 0 for c in fnb_budget.get("categories", []))
-    if fnb_total > 0 and num_days > 0:
-        fnb_per_day = fnb_total / num_days
-        for date in all_dates:
-            day_map[date]["fnb"] = round(fnb_per_day, 2)
-
-    # --- FUEL (distribute evenly across all days) ---
-    fuel_total = 145000 + 10300 + 21000 + 3000  # hardcoded totals
-    fuel_per_day = fuel_total / num_days if num_days > 0 else 0
-    for date in all_dates:
-        day_map[date]["fuel"] = round(fuel_per_day, 2)
+    refresh_daily_cost_series(prod_id, all_dates, assignments=assignments)
+    with get_db() as conn:
+        series = conn.execute(
+            "SELECT department, date, amount FROM daily_cost_series WHERE production_id=?",
+            (prod_id,)
+        ).fetchall()
+    for r in series:
+        if r["date"] in day_map:
+            day_map[r["date"]][r["department"]] = r["amount"]
 
-    # Compute totals per day and round
+    # Compute totals per day
     days_list = []
     for date in all_dates:
         d = day_map[date]
-        for key in ("boats", "picture_boats", "security_boats", "transport",
-                     "labour", "guards", "locations"):
-            d[key] = round(d[key], 2)
-        d["total"] = round(sum(d[k] for k in (
-            "boats", "picture_boats", "security_boats", "transport",
-            "labour", "guards", "locations", "fnb", "fuel"
-        )), 2)
+        d["total"] = round(sum(d[k] for k in _DAILY_DEPARTMENTS), 2)
         days_list.append(d)
 
     # Compute averages by day type
@@ -4466,10 +5608,10 @@ def get_daily_budget(prod_id):
 # ─── History / Undo ───────────────────────────────────────────────────────────
 
 def get_history(prod_id, limit=50, entity_type=None, entity_id=None,
-                user_id=None, action_type=None, date_from=None, date_to=None):
-    """Return recent history entries with filtering by production, module, user, dates, action."""
+                user_id=None, action_type=None, date_from=None, date_to=None, query=None):
+    """Return recent history entries with filtering by production, module, user, dates, action.
+    With `query` (parse_collection_query) its fields, sort and page replace `limit`."""
     with get_db() as conn:
-        query = "SELECT * FROM history"
         params = []
         conditions = []
         # Filter by production (if column populated)
@@ -4494,12 +5636,10 @@ def get_history(prod_id, limit=50, entity_type=None, entity_id=None,
         if date_to:
             conditions.append("created_at <= ?")
             params.append(date_to + " 23:59:59" if len(date_to) == 10 else date_to)
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        query += " ORDER BY id DESC LIMIT ?"
-        params.append(limit)
-        rows = conn.execute(query, params).fetchall()
-        return [dict(r) for r in rows]
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        rows, next_cursor = _query_collection(
+            conn, "history", where, params, query or {"limit": limit})
+        return _finish_collection(rows, next_cursor, query)
 
 
 def get_activity_feed(prod_id, limit=100, module=None, user_id=None,
@@ -4651,6 +5791,14 @@ def undo_history_entry(history_id):
         if action == "create":
             # Undo create = delete
             conn.execute(f"DELETE FROM {table} WHERE id=?", (record_id,))
+        elif action in ("import", "duplicate") and entry["new_data"]:
+            # Undo import / bulk duplicate = delete every created row
+            ids = json.loads(entry["new_data"]).get("ids", [])
+            atype = _TABLE_TO_ATYPE.get(table)
+            if atype:
+                for i in ids:
+                    delete_day_overrides(conn, atype, i)
+            conn.executemany(f"DELETE FROM {table} WHERE id=?", [(i,) for i in ids])
         elif action == "update" and old_data:
             # Undo update = restore old values
             cols = [k for k in old_data.keys() if k != 'id']
@@ -4724,22 +5872,183 @@ def undo_last_boat_assignment(prod_id):
 
 
 # ─── Budget Snapshots (AXE 6.3) ───────────────────────────────────────────────
+# Storage formats (budget_snapshots.storage_format):
+#   'json' — legacy: full get_budget() JSON in snapshot_data
+#   'zlib' — normalized line set, zlib-compressed + base64 in snapshot_data.
+#            Lines are stored once, sorted by line key; by_department only keeps
+#            totals and is rebuilt by reference on read. When base_snapshot_id is
+#            set, snapshot_data is a delta (set/drop lines) against that snapshot.
+# line_index holds the compressed [department, name, occurrence, estimate, actual]
+# array used by compare_budget_snapshots(), so comparing never expands full data.
+
+_SNAPSHOT_KEYFRAME_INTERVAL = 10  # max delta chain length before a full snapshot
+
+_SNAPSHOT_META_KEYS = ("grand_total_estimate", "grand_total_actual",
+                       "fnb_purchase_total", "fnb_consumption_total", "ref_currency")
+
+
+def _pack_json(obj):
+    """Serialize obj to compact JSON, zlib-compress it and return base64 text."""
+    raw = json.dumps(obj, separators=(",", ":"), default=str).encode()
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+
+def _unpack_json(text):
+    """Inverse of _pack_json()."""
+    return json.loads(zlib.decompress(base64.b64decode(text)))
+
+
+def _snapshot_line_key(line, seen):
+    """Stable key for a budget line: (department, name, occurrence)."""
+    dept = line.get("department") or ""
+    name = line.get("name") or ""
+    occ = seen.get((dept, name), 0)
+    seen[(dept, name)] = occ + 1
+    return [dept, name, occ]
+
+
+def _normalize_budget(budget):
+    """Split a get_budget() result into meta, dept totals and key-sorted lines."""
+    seen = {}
+    keyed = [(_snapshot_line_key(r, seen), r) for r in budget.get("rows", [])]
+    # Original row order, expressed as positions in the sorted line array
+    ordered = sorted(range(len(keyed)), key=lambda i: keyed[i][0])
+    position = {row_idx: pos for pos, row_idx in enumerate(ordered)}
+    return {
+        "meta": {k: budget.get(k) for k in _SNAPSHOT_META_KEYS},
+        "departments": {
+            dept: {"total_estimate": d.get("total_estimate", 0), "total_actual": d.get("total_actual", 0)}
+            for dept, d in budget.get("by_department", {}).items()
+        },
+        "lines": [[keyed[i][0], keyed[i][1]] for i in ordered],
+        "order": [position[i] for i in range(len(keyed))],
+    }
+
+
+def _line_index(normalized):
+    """Compact sorted [department, name, occurrence, estimate, actual] array."""
+    return [
+        key + [line.get("amount_estimate") or 0, line.get("amount_actual") or 0]
+        for key, line in normalized["lines"]
+    ]
+
+
+def _snapshot_delta(base, current):
+    """Delta of current against base: lines to set and line keys to drop."""
+    base_lines = {tuple(k): line for k, line in base["lines"]}
+    cur_keys = set()
+    set_lines = []
+    for key, line in current["lines"]:
+        cur_keys.add(tuple(key))
+        if base_lines.get(tuple(key)) != line:
+            set_lines.append([key, line])
+    drop = [list(k) for k in base_lines if k not in cur_keys]
+    return {
+        "meta": current["meta"],
+        "departments": current["departments"],
+        "set": set_lines,
+        "drop": drop,
+        "order": current["order"],
+    }
+
+
+def _apply_snapshot_delta(base, delta):
+    """Rebuild a normalized snapshot from its base and a delta."""
+    lines = {tuple(k): line for k, line in base["lines"]}
+    for key in delta["drop"]:
+        lines.pop(tuple(key), None)
+    for key, line in delta["set"]:
+        lines[tuple(key)] = line
+    return {
+        "meta": delta["meta"],
+        "departments": delta["departments"],
+        "lines": [[list(k), lines[k]] for k in sorted(lines)],
+        "order": delta["order"],
+    }
+
+
+def _load_normalized_snapshot(conn, snapshot_id):
+    """Load a 'zlib' snapshot, resolving its delta chain back to the keyframe."""
+    chain = []
+    next_id = snapshot_id
+    while next_id is not None:
+        row = conn.execute(
+            "SELECT id, base_snapshot_id, snapshot_data FROM budget_snapshots WHERE id=?",
+            (next_id,)
+        ).fetchone()
+        if not row:
+            return None
+        chain.append(row)
+        next_id = row["base_snapshot_id"]
+    normalized = _unpack_json(chain[-1]["snapshot_data"])
+    for row in reversed(chain[:-1]):
+        normalized = _apply_snapshot_delta(normalized, _unpack_json(row["snapshot_data"]))
+    return normalized
+
+
+def _expand_budget(normalized):
+    """Rebuild the get_budget() shape; by_department lines reference the same row dicts."""
+    lines = [line for _key, line in normalized["lines"]]
+    rows = [lines[pos] for pos in normalized["order"]]
+    by_dept = {}
+    for dept, totals in normalized["departments"].items():
+        by_dept[dept] = {"total_estimate": totals["total_estimate"],
+                         "total_actual": totals["total_actual"], "lines": []}
+    for r in rows:
+        dept = r.get("dept_name") or r.get("department", "BOATS")
+        by_dept.setdefault(dept, {"total_estimate": 0, "total_actual": 0, "lines": []})
+        by_dept[dept]["lines"].append(r)
+    result = {"rows": rows, "by_department": by_dept}
+    result.update(normalized["meta"])
+    return result
+
 
 def create_budget_snapshot(prod_id, trigger_type='manual', trigger_detail=None,
-                           user_id=None, user_nickname=None):
-    """Take a full budget snapshot and store it."""
+                           user_id=None, user_nickname=None, delta=True):
+    """Take a budget snapshot and store it compressed.
+
+    With delta=True the snapshot is stored as a delta against the previous
+    snapshot of the production, unless that would exceed the keyframe interval.
+    """
     budget = get_budget(prod_id)
-    snapshot_data = json.dumps(budget, default=str)
-    with get_db() as conn:
+    normalized = _normalize_budget(budget)
+    with get_db() as conn:
+        base_id = None
+        payload = normalized
+        if delta:
+            prev = conn.execute(
+                """SELECT id, storage_format FROM budget_snapshots
+                   WHERE production_id=? ORDER BY id DESC LIMIT 1""",
+                (prod_id,)
+            ).fetchone()
+            if prev and prev["storage_format"] == 'zlib':
+                depth = 1
+                walk = prev["id"]
+                while depth <= _SNAPSHOT_KEYFRAME_INTERVAL:
+                    r = conn.execute("SELECT base_snapshot_id FROM budget_snapshots WHERE id=?",
+                                     (walk,)).fetchone()
+                    if not r or r["base_snapshot_id"] is None:
+                        break
+                    walk = r["base_snapshot_id"]
+                    depth += 1
+                if depth < _SNAPSHOT_KEYFRAME_INTERVAL:
+                    base = _load_normalized_snapshot(conn, prev["id"])
+                    if base is not None:
+                        base_id = prev["id"]
+                        payload = _snapshot_delta(base, normalized)
         cur = conn.execute(
             """INSERT INTO budget_snapshots
                (production_id, trigger_type, trigger_detail, user_id, user_nickname,
-                snapshot_data, grand_total_estimate, grand_total_actual)
-               VALUES (?,?,?,?,?,?,?,?)""",
+                snapshot_data, grand_total_estimate, grand_total_actual,
+                storage_format, base_snapshot_id, line_index)
+               VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
             (prod_id, trigger_type, trigger_detail, user_id, user_nickname,
-             snapshot_data,
+             _pack_json(payload),
              budget.get('grand_total_estimate', 0),
-             budget.get('grand_total_actual', 0))
+             budget.get('grand_total_actual', 0),
+             'zlib', base_id,
+             _pack_json({"departments": normalized["departments"],
+                         "lines": _line_index(normalized)}))
         )
         return cur.lastrowid
 
@@ -4759,33 +6068,64 @@ def get_budget_snapshots(prod_id, limit=50):
         return [dict(r) for r in rows]
 
 
-def get_budget_snapshot(snapshot_id):
-    """Get a single budget snapshot with full data."""
+def get_budget_snapshot(snapshot_id, with_data=True):
+    """Get a single budget snapshot, with its full budget data unless with_data=False."""
     with get_db() as conn:
         row = conn.execute(
-            "SELECT * FROM budget_snapshots WHERE id = ?", (snapshot_id,)
+            """SELECT id, production_id, trigger_type, trigger_detail, user_id, user_nickname,
+                      grand_total_estimate, grand_total_actual, created_at, storage_format
+               FROM budget_snapshots WHERE id = ?""", (snapshot_id,)
         ).fetchone()
         if not row:
             return None
         d = dict(row)
-        d['snapshot_data'] = json.loads(d['snapshot_data'])
+        storage_format = d.pop('storage_format')
+        if not with_data:
+            return d
+        if storage_format == 'zlib':
+            d['snapshot_data'] = _expand_budget(_load_normalized_snapshot(conn, snapshot_id))
+        else:
+            raw = conn.execute("SELECT snapshot_data FROM budget_snapshots WHERE id = ?",
+                               (snapshot_id,)).fetchone()
+            d['snapshot_data'] = json.loads(raw['snapshot_data'])
         return d
 
 
+def _get_snapshot_index(conn, snapshot_id):
+    """Return (header, {departments, lines}) for a snapshot, without expanding it."""
+    row = conn.execute(
+        """SELECT id, created_at, trigger_type, trigger_detail, grand_total_estimate,
+                  storage_format, line_index
+           FROM budget_snapshots WHERE id = ?""", (snapshot_id,)
+    ).fetchone()
+    if not row:
+        return None, None
+    header = {k: row[k] for k in ('id', 'created_at', 'trigger_type', 'trigger_detail',
+                                  'grand_total_estimate')}
+    if row['line_index']:
+        return header, _unpack_json(row['line_index'])
+    # Legacy JSON snapshot: build the index from the full data
+    raw = conn.execute("SELECT snapshot_data FROM budget_snapshots WHERE id = ?",
+                       (snapshot_id,)).fetchone()
+    normalized = _normalize_budget(json.loads(raw['snapshot_data']))
+    return header, {"departments": normalized["departments"], "lines": _line_index(normalized)}
+
+
 def compare_budget_snapshots(snap_id_a, snap_id_b):
-    """Compare two budget snapshots and return differences."""
-    a = get_budget_snapshot(snap_id_a)
-    b = get_budget_snapshot(snap_id_b)
+    """Compare two budget snapshots and return differences.
+
+    Merge-joins the two key-sorted line indexes; full snapshot data is never loaded.
+    """
+    with get_db() as conn:
+        a, a_idx = _get_snapshot_index(conn, snap_id_a)
+        b, b_idx = _get_snapshot_index(conn, snap_id_b)
     if not a or not b:
         return None
 
-    a_data = a['snapshot_data']
-    b_data = b['snapshot_data']
-
     # Build department-level comparison
-    a_depts = a_data.get('by_department', {})
-    b_depts = b_data.get('by_department', {})
-    all_depts = sorted(set(list(a_depts.keys()) + list(b_depts.keys())))
+    a_depts = a_idx['departments']
+    b_depts = b_idx['departments']
+    all_depts = sorted(set(a_depts) | set(b_depts))
 
     dept_comparison = []
     for dept in all_depts:
@@ -4801,17 +6141,23 @@ def compare_budget_snapshots(snap_id_a, snap_id_b):
             'change_pct': pct,
         })
 
-    # Build line-level comparison
-    a_rows = {(r.get('department', ''), r.get('name', '')): r for r in a_data.get('rows', [])}
-    b_rows = {(r.get('department', ''), r.get('name', '')): r for r in b_data.get('rows', [])}
-    all_keys = sorted(set(list(a_rows.keys()) + list(b_rows.keys())))
-
+    # Build line-level comparison: walk both sorted arrays in step
     line_changes = []
-    for key in all_keys:
-        ar = a_rows.get(key)
-        br = b_rows.get(key)
-        a_amt = (ar or {}).get('amount_estimate', 0) or 0
-        b_amt = (br or {}).get('amount_estimate', 0) or 0
+    a_lines, b_lines = a_idx['lines'], b_idx['lines']
+    i = j = 0
+    while i < len(a_lines) or j < len(b_lines):
+        a_key = a_lines[i][:3] if i < len(a_lines) else None
+        b_key = b_lines[j][:3] if j < len(b_lines) else None
+        if b_key is None or (a_key is not None and a_key < b_key):
+            key, a_amt, b_amt = a_key, a_lines[i][3], 0
+            i += 1
+        elif a_key is None or b_key < a_key:
+            key, a_amt, b_amt = b_key, 0, b_lines[j][3]
+            j += 1
+        else:
+            key, a_amt, b_amt = a_key, a_lines[i][3], b_lines[j][3]
+            i += 1
+            j += 1
         if abs(b_amt - a_amt) > 0.01:
             line_changes.append({
                 'department': key[0],
@@ -4822,16 +6168,8 @@ def compare_budget_snapshots(snap_id_a, snap_id_b):
             })
 
     return {
-        'snapshot_a': {
-            'id': a['id'], 'created_at': a['created_at'],
-            'trigger_type': a['trigger_type'], 'trigger_detail': a['trigger_detail'],
-            'grand_total_estimate': a['grand_total_estimate'],
-        },
-        'snapshot_b': {
-            'id': b['id'], 'created_at': b['created_at'],
-            'trigger_type': b['trigger_type'], 'trigger_detail': b['trigger_detail'],
-            'grand_total_estimate': b['grand_total_estimate'],
-        },
+        'snapshot_a': a,
+        'snapshot_b': b,
         'total_diff': round(b['grand_total_estimate'] - a['grand_total_estimate'], 2),
         'departments': dept_comparison,
         'line_changes': line_changes,
@@ -4839,8 +6177,20 @@ def compare_budget_snapshots(snap_id_a, snap_id_b):
 
 
 def delete_budget_snapshot(snapshot_id):
-    """Delete a budget snapshot."""
+    """Delete a budget snapshot.
+
+    Snapshots stored as deltas against it are rewritten as full snapshots first.
+    """
     with get_db() as conn:
+        dependents = conn.execute(
+            "SELECT id FROM budget_snapshots WHERE base_snapshot_id = ?", (snapshot_id,)
+        ).fetchall()
+        for dep in dependents:
+            normalized = _load_normalized_snapshot(conn, dep["id"])
+            conn.execute(
+                "UPDATE budget_snapshots SET snapshot_data=?, base_snapshot_id=NULL WHERE id=?",
+                (_pack_json(normalized), dep["id"])
+            )
         conn.execute("DELETE FROM budget_snapshots WHERE id = ?", (snapshot_id,))
 
 
@@ -5229,21 +6579,29 @@ def get_notifications(user_id, production_id=None, unread_only=False, limit=50):
 
 
 def get_unread_notification_count(user_id, production_id=None):
-    """Get count of unread notifications."""
-    if production_id:
-        with get_db() as conn:
+    """Get count of unread notifications (read from notification_counters)."""
+    with get_db() as conn:
+        if production_id:
             row = conn.execute(
-                "SELECT COUNT(*) as cnt FROM notifications WHERE user_id=? AND production_id=? AND is_read=0",
+                "SELECT unread AS cnt FROM notification_counters WHERE user_id=? AND production_id=?",
                 (user_id, production_id)
             ).fetchone()
-            return row['cnt'] if row else 0
-    else:
-        with get_db() as conn:
+        else:
             row = conn.execute(
-                "SELECT COUNT(*) as cnt FROM notifications WHERE user_id=? AND is_read=0",
+                "SELECT COALESCE(SUM(unread), 0) AS cnt FROM notification_counters WHERE user_id=?",
                 (user_id,)
             ).fetchone()
-            return row['cnt'] if row else 0
+        return row['cnt'] if row else 0
+
+
+# Notifications older than this are deleted (checked at most once an hour)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", "90"))
+_NOTIFICATION_PRUNE_INTERVAL = 3600
+_last_notification_prune = 0.0
+
+_BUMP_UNREAD_SQL = """
+    ON CONFLICT(user_id, production_id)
+    DO UPDATE SET unread = notification_counters.unread + excluded.unread"""
 
 
 def create_notification(production_id, user_id, notif_type, title, body=None,
@@ -5256,41 +6614,82 @@ def create_notification(production_id, user_id, notif_type, title, body=None,
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
             (production_id, user_id, notif_type, title, body, entity_type, entity_id)
         )
+        conn.execute(
+            "INSERT INTO notification_counters (user_id, production_id, unread) VALUES (?, ?, 1)"
+            + _BUMP_UNREAD_SQL,
+            (user_id, production_id)
+        )
+        _publish_notification(conn, production_id, user_id, cur.lastrowid, notif_type, title)
         return cur.lastrowid
 
 
 def create_notifications_for_production(production_id, notif_type, title, body=None,
                                          entity_type=None, entity_id=None,
                                          exclude_user_id=None):
-    """Create a notification for ALL members of a production (except exclude_user_id)."""
+    """Create a notification for ALL members of a production (except exclude_user_id).
+    Rows and unread counters are written with one INSERT ... SELECT each."""
+    members = "FROM project_memberships WHERE production_id=?"
+    member_params = [production_id]
+    if exclude_user_id:
+        members += " AND user_id != ?"
+        member_params.append(exclude_user_id)
     with get_db() as conn:
-        # Get all users who are members of this production
-        rows = conn.execute(
-            "SELECT user_id FROM project_memberships WHERE production_id=?",
-            (production_id,)
-        ).fetchall()
-        count = 0
-        for r in rows:
-            uid = r['user_id']
-            if exclude_user_id and uid == exclude_user_id:
-                continue
+        cur = conn.execute(
+            f"""INSERT INTO notifications
+                (production_id, user_id, type, title, body, entity_type, entity_id)
+                SELECT DISTINCT production_id, user_id, ?, ?, ?, ?, ? {members}""",
+            [notif_type, title, body, entity_type, entity_id] + member_params
+        )
+        count = cur.rowcount
+        if count:
             conn.execute(
-                """INSERT INTO notifications
-                   (production_id, user_id, type, title, body, entity_type, entity_id)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (production_id, uid, notif_type, title, body, entity_type, entity_id)
+                f"""INSERT INTO notification_counters (user_id, production_id, unread)
+                    SELECT DISTINCT user_id, production_id, 1 {members}""" + _BUMP_UNREAD_SQL,
+                member_params
             )
-            count += 1
-        return count
+            # Live push only to members with an open stream
+            listening = events.subscribed_users(production_id)
+            if listening:
+                for r in conn.execute(
+                    f"SELECT DISTINCT user_id {members} AND user_id IN "
+                    f"({','.join('?' * len(listening))})",
+                    member_params + sorted(listening)
+                ).fetchall():
+                    _publish_notification(conn, production_id, r['user_id'], None,
+                                          notif_type, title)
+    prune_notifications()
+    return count
+
+
+def _publish_notification(conn, production_id, user_id, notif_id, notif_type, title):
+    """After commit, push the new notification and the unread count to the
+    user's open SSE streams (skipped when the user has none)."""
+    def _push():
+        if events.is_subscribed(production_id, user_id):
+            events.publish(production_id, "notification", {
+                "id": notif_id, "type": notif_type, "title": title,
+                "unread": get_unread_notification_count(user_id, production_id),
+            }, user_id=user_id)
+    on_commit(conn, _push)
 
 
 def mark_notification_read(notification_id, user_id):
-    """Mark a single notification as read."""
+    """Mark a single notification as read. The counter is only decremented by
+    the call whose UPDATE flipped is_read, so concurrent calls count once."""
     with get_db() as conn:
-        conn.execute(
-            "UPDATE notifications SET is_read=1 WHERE id=? AND user_id=?",
+        cur = conn.execute(
+            "UPDATE notifications SET is_read=1 WHERE id=? AND user_id=? AND is_read=0",
             (notification_id, user_id)
         )
+        if cur.rowcount != 1:
+            return
+        row = conn.execute("SELECT production_id FROM notifications WHERE id=?",
+                           (notification_id,)).fetchone()
+        conn.execute(
+            """UPDATE notification_counters SET unread = CASE WHEN unread > 0 THEN unread - 1 ELSE 0 END
+               WHERE user_id=? AND production_id=?""",
+            (user_id, row['production_id'])
+        )
 
 
 def mark_all_notifications_read(user_id, production_id=None):
@@ -5301,12 +6700,444 @@ def mark_all_notifications_read(user_id, production_id=None):
                 "UPDATE notifications SET is_read=1 WHERE user_id=? AND production_id=? AND is_read=0",
                 (user_id, production_id)
             )
+            conn.execute(
+                "UPDATE notification_counters SET unread=0 WHERE user_id=? AND production_id=?",
+                (user_id, production_id)
+            )
     else:
         with get_db() as conn:
             conn.execute(
                 "UPDATE notifications SET is_read=1 WHERE user_id=? AND is_read=0",
                 (user_id,)
             )
+            conn.execute("UPDATE notification_counters SET unread=0 WHERE user_id=?", (user_id,))
+
+
+def _rebuild_notification_counters(conn, pairs=None):
+    """Recount unread notifications into notification_counters, for the given
+    (user_id, production_id) pairs or for everyone."""
+    if pairs is None:
+        conn.execute("DELETE FROM notification_counters")
+        conn.execute(
+            """INSERT INTO notification_counters (user_id, production_id, unread)
+               SELECT user_id, production_id, COUNT(*) FROM notifications
+               WHERE is_read=0 GROUP BY user_id, production_id"""
+        )
+        return
+    conn.executemany(
+        """UPDATE notification_counters SET unread = (
+               SELECT COUNT(*) FROM notifications n
+               WHERE n.user_id=? AND n.production_id=? AND n.is_read=0)
+           WHERE user_id=? AND production_id=?""",
+        [(u, p, u, p) for u, p in pairs]
+    )
+
+
+def prune_notifications(retention_days=None, force=False):
+    """Delete notifications older than the retention window and fix the unread
+    counters they were part of. Runs at most once per hour unless forced.
+    Returns the number of deleted notifications."""
+    global _last_notification_prune
+    now = time.time()
+    if not force and now - _last_notification_prune < _NOTIFICATION_PRUNE_INTERVAL:
+        return 0
+    _last_notification_prune = now
+    days = NOTIFICATION_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    with get_db() as conn:
+        pairs = [(r['user_id'], r['production_id']) for r in conn.execute(
+            """SELECT DISTINCT user_id, production_id FROM notifications
+               WHERE created_at < ? AND is_read=0""",
+            (cutoff,)
+        ).fetchall()]
+        deleted = conn.execute("DELETE FROM notifications WHERE created_at < ?", (cutoff,)).rowcount
+        if pairs:
+            _rebuild_notification_counters(conn, pairs)
+    return deleted
+
+
+# ─── Conflict alerts engine (AXE 7.3) ────────────────────────────────────────
+# The alerts table holds each production's current scheduling conflicts.
+# Writes to the source tables call _hint_alerts() with the production and the
+# dates they touched; after the commit only those dates are re-evaluated, and
+# alerts that appear are pushed as notifications. A commit that writes a
+# source table without a hint marks the production for a full rebuild, done
+# at the next read (first read after a restart rebuilds too).
+
+ALERT_SOURCE_TABLES = frozenset({
+    "shooting_days", "shooting_day_events", "boat_functions", "assignment_day_overrides",
+    "boats", "boat_assignments", "picture_boats", "picture_boat_assignments",
+    "security_boats", "security_boat_assignments",
+    "locations", "location_schedules", "guard_location_schedules",
+})
+
+# Modules checked for boats on Off days:
+# (label, assignment table, override type, entity table, entity column, function context)
+_ALERT_BOAT_MODULES = (
+    ("Boats", "boat_assignments", "boats", "boats", "boat_id", "boats"),
+    ("Picture Boats", "picture_boat_assignments", "picture_boats",
+     "picture_boats", "picture_boat_id", None),
+    ("Security Boats", "security_boat_assignments", "security_boats",
+     "security_boats", "security_boat_id", None),
+)
+_ALERT_ASSIGNMENT_TABLES = {m[1]: m[2] for m in _ALERT_BOAT_MODULES}
+
+_ALERT_SEVERITY_ORDER = {"danger": 0, "warning": 1, "info": 2}
+# Severities pushed as notifications when they appear
+_ALERT_NOTIFY_SEVERITIES = ("danger", "warning")
+# Hints spanning more days than this re-evaluate the whole production
+_ALERT_MAX_SPAN_DAYS = 800
+
+_ALERT_COLUMNS = ("type", "alert_key", "date", "severity", "module", "msg", "entity", "function")
+
+_alert_hints = {}       # commit_key -> {"tables": set, "dates": {prod_id: set | None}}
+_alerts_dirty = {}      # prod_id -> set of dates to re-evaluate, or None for all
+_alerts_built = set()   # productions fully evaluated by this process
+_alerts_epoch = 0       # bumped when every production needs a full rebuild
+_alerts_lock = threading.Lock()  # guards the three above (never held while querying)
+_production_alert_locks = {}     # prod_id -> RLock serializing that production's refresh
+
+
+def _date_span(start, end):
+    """ISO dates from start to end inclusive; [] when either is missing,
+    None when the span is too long to be worth listing."""
+    try:
+        day = datetime.strptime((start or "")[:10], "%Y-%m-%d")
+        last = datetime.strptime((end or "")[:10], "%Y-%m-%d")
+    except ValueError:
+        return []
+    if (last - day).days > _ALERT_MAX_SPAN_DAYS:
+        return None
+    dates = []
+    while day <= last:
+        dates.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return dates
+
+
+def _hint_alerts(conn, prod_id, tables, dates=()):
+    """Record that this transaction wrote `tables` (a name or a tuple) for
+    `prod_id`, changing alerts on `dates` at most (None: any date).
+    A hint without production only covers writes that touch no date."""
+    hint = _alert_hints.setdefault(commit_key(conn), {"tables": set(), "dates": {}})
+    if prod_id is None and (dates is None or any(dates)):
+        return
+    hint["tables"].update((tables,) if isinstance(tables, str) else tables)
+    if prod_id is None or (dates is not None and not any(dates)):
+        return
+    current = hint["dates"].get(prod_id, set())
+    if dates is None or current is None:
+        hint["dates"][prod_id] = None
+    else:
+        current.update(d[:10] for d in dates if d)
+        hint["dates"][prod_id] = current
+
+
+def _assignment_alert_production(conn, table, row):
+    if not row or not row.get("boat_function_id"):
+        return None
+    r = conn.execute("SELECT production_id FROM boat_functions WHERE id=?",
+                     (row["boat_function_id"],)).fetchone()
+    return r["production_id"] if r else None
+
+
+def _hint_history_alerts(conn, table_name, old_data, new_data, production_id):
+    """_log_history hook: hint the dates a logged assignment or PDT day write
+    can change alerts on (its old and new date ranges and overrides)."""
+    rows = [dict(r) for r in (old_data, new_data) if r]
+    if not rows:
+        return
+    if table_name == "shooting_days":
+        _hint_alerts(conn, production_id, ("shooting_days", "shooting_day_events"),
+                     [r.get("date") for r in rows])
+        return
+    if table_name not in _ALERT_ASSIGNMENT_TABLES:
+        # Other assignment modules only share the overrides table
+        _hint_alerts(conn, None, "assignment_day_overrides")
+        return
+    dates = set()
+    for r in rows:
+        span = _date_span(r.get("start_date"), r.get("end_date"))
+        if span is None:
+            dates = None
+            break
+        dates.update(span)
+        try:
+            dates.update(json.loads(r.get("day_overrides") or "{}"))
+        except (ValueError, TypeError):
+            pass
+    prod_id = _assignment_alert_production(conn, table_name, rows[-1])
+    _hint_alerts(conn, prod_id, (table_name, "assignment_day_overrides"), dates)
+
+
+def _hint_override_alerts(conn, assignment_type, assignment_id, dates):
+    """save/delete_day_overrides hook: overrides changed on `dates`."""
+    table = next((t for t, a in _ALERT_ASSIGNMENT_TABLES.items() if a == assignment_type), None)
+    if table is None:
+        _hint_alerts(conn, None, "assignment_day_overrides")
+        return
+    row = conn.execute(f"SELECT boat_function_id FROM {table} WHERE id=?",
+                       (assignment_id,)).fetchone()
+    prod_id = _assignment_alert_production(conn, table, dict(row) if row else None)
+    _hint_alerts(conn, prod_id, "assignment_day_overrides", dates)
+
+
+def _hint_day_event_alerts(conn, shooting_day_id=None, event_id=None):
+    """Event CRUD hook: events only change alerts on their day's date."""
+    if event_id is not None:
+        r = conn.execute(
+            """SELECT sd.production_id, sd.date FROM shooting_day_events e
+               JOIN shooting_days sd ON e.shooting_day_id = sd.id WHERE e.id=?""",
+            (event_id,)
+        ).fetchone()
+    else:
+        r = conn.execute("SELECT production_id, date FROM shooting_days WHERE id=?",
+                         (shooting_day_id,)).fetchone()
+    if r:
+        _hint_alerts(conn, r["production_id"], "shooting_day_events", [r["date"]])
+
+
+def _alerts_commit_listener(key, written):
+    """After each transaction: queue hinted dates (evaluated right away) and
+    mark productions with unhinted source writes for a full rebuild."""
+    global _alerts_epoch
+    hint = _alert_hints.pop(key, None)
+    touched = (written or set()) & ALERT_SOURCE_TABLES
+    if not touched:
+        return
+    hint = hint or {"tables": set(), "dates": {}}
+    with _alerts_lock:
+        if touched - hint["tables"]:
+            scope = get_write_scope()
+            if scope is None:
+                _alerts_built.clear()
+                _alerts_epoch += 1
+            else:
+                _alerts_dirty[scope] = None
+        for prod_id, dates in hint["dates"].items():
+            if prod_id in _alerts_dirty:
+                pending = _alerts_dirty[prod_id]
+                _alerts_dirty[prod_id] = None if pending is None or dates is None else pending | dates
+            else:
+                _alerts_dirty[prod_id] = None if dates is None else set(dates)
+    for prod_id in hint["dates"]:
+        refresh_alerts(prod_id, notify=True)
+
+
+add_commit_listener(_alerts_commit_listener)
+
+
+def _in_dates(column, dates, params):
+    """SQL filter `column IN (...)` for `dates` (no filter when None)."""
+    if dates is None:
+        return ""
+    params.extend(sorted(dates))
+    return f" AND {column} IN ({','.join('?' * len(dates))})"
+
+
+def _evaluate_alerts(conn, prod_id, dates=None):
+    """Compute the alerts of `prod_id` on `dates` (None: all dates).
+    Returns {(type, alert_key, date): alert dict}."""
+    found = {}
+
+    def add(alert):
+        found[(alert["type"], alert["alert_key"], alert["date"])] = alert
+
+    params = [prod_id]
+    day_rows = conn.execute(
+        f"""SELECT sd.date, MAX(CASE WHEN LOWER(e.event_type)='off' THEN 1 ELSE 0 END) AS is_off
+            FROM shooting_days sd
+            LEFT JOIN shooting_day_events e ON e.shooting_day_id = sd.id
+            WHERE sd.production_id=? AND sd.date IS NOT NULL AND sd.date != ''
+            {_in_dates('sd.date', dates, params)}
+            GROUP BY sd.date""",
+        params
+    ).fetchall()
+    off_dates = {r["date"] for r in day_rows if r["is_off"]}
+    work_dates = {r["date"] for r in day_rows if not r["is_off"]}
+
+    def active_assignments(table, atype, entity_table, entity_col, context, on_dates, extra=""):
+        """Assignments (with start and end) possibly active on `on_dates`,
+        and their overrides on those dates."""
+        if not on_dates:
+            return [], {}
+        lo, hi = min(on_dates), max(on_dates)
+        q_params = [prod_id]
+        ctx = ""
+        if context:
+            ctx = " AND bf.context=?"
+            q_params.append(context)
+        q_params += [hi, lo, atype]
+        rows = [dict(r) for r in conn.execute(
+            f"""SELECT a.id, a.start_date, a.end_date, a.boat_name_override,
+                       ent.name AS boat_name, bf.name AS function_name{extra}
+                FROM {table} a
+                JOIN boat_functions bf ON a.boat_function_id = bf.id
+                LEFT JOIN {entity_table} ent ON a.{entity_col} = ent.id
+                WHERE bf.production_id=?{ctx}
+                  AND COALESCE(a.start_date, '') != '' AND COALESCE(a.end_date, '') != ''
+                  AND ((substr(a.start_date, 1, 10) <= ? AND substr(a.end_date, 1, 10) >= ?)
+                       OR a.id IN (SELECT assignment_id FROM assignment_day_overrides
+                                   WHERE assignment_type=?
+                                     AND date IN ({','.join('?' * len(on_dates))})))
+                ORDER BY bf.sort_order, bf.id, a.id""",
+            q_params + sorted(on_dates)
+        ).fetchall()]
+        overrides = get_day_overrides_map(conn, atype, [r["id"] for r in rows])
+        return rows, overrides
+
+    # ── 1. Boats assigned on Off days ──
+    for label, table, atype, entity_table, entity_col, context in _ALERT_BOAT_MODULES:
+        rows, overrides = active_assignments(table, atype, entity_table, entity_col,
+                                             context, off_dates)
+        module = label.lower().replace(" ", "_")
+        for a in rows:
+            start, end = a["start_date"][:10], a["end_date"][:10]
+            ov_map = overrides.get(a["id"], {})
+            boat_name = a["boat_name"] or a["boat_name_override"] or "Unknown"
+            func_name = a["function_name"] or ""
+            for off_d in off_dates:
+                ov = ov_map.get(off_d, "")
+                if ov == "empty" or (not ov and not start <= off_d <= end):
+                    continue
+                add({"type": "boat_on_off", "alert_key": f"{module}:{a['id']}", "date": off_d,
+                     "severity": "warning", "module": module,
+                     "msg": f"{label}: '{boat_name}' ({func_name}) assigned on Off day {off_d}",
+                     "entity": boat_name, "function": func_name})
+
+    # ── 2. Locations in Film without guards ──
+    params = [prod_id]
+    film = conn.execute(
+        f"""SELECT DISTINCT {_LOC_ACTIVE_NAME} AS location_name, ls.date
+            FROM location_schedules ls LEFT JOIN locations l ON ls.location_id = l.id
+            WHERE ls.production_id=? AND ls.status='F'{_in_dates('ls.date', dates, params)}""",
+        params
+    ).fetchall()
+    params = [prod_id]
+    guards = {}
+    for g in conn.execute(
+        f"""SELECT COALESCE(l.name, gls.location_name) AS location_name, gls.date, gls.nb_guards
+            FROM guard_location_schedules gls LEFT JOIN locations l ON gls.location_id = l.id
+            WHERE gls.production_id=?{_in_dates('gls.date', dates, params)}
+            ORDER BY gls.id""",
+        params
+    ).fetchall():
+        guards[(g["location_name"], g["date"])] = g["nb_guards"] or 0
+    for r in film:
+        loc_name, date = r["location_name"], r["date"]
+        if guards.get((loc_name, date), 0) == 0:
+            add({"type": "film_no_guards", "alert_key": loc_name, "date": date,
+                 "severity": "danger", "module": "guards",
+                 "msg": f"Location '{loc_name}' in Film on {date} with no guards assigned",
+                 "entity": loc_name, "function": None})
+
+    # ── 3. Function groups whose boats all have unknown capacity ──
+    rows, overrides = active_assignments(
+        "boat_assignments", "boats", "boats", "boat_id", "boats", work_dates,
+        extra=", bf.function_group, ent.capacity")
+    groups = {}   # (function_group, date) -> [known capacity total, unknown count]
+    for a in rows:
+        start, end = a["start_date"][:10], a["end_date"][:10]
+        ov_map = overrides.get(a["id"], {})
+        try:
+            cap = int(a["capacity"])
+        except (ValueError, TypeError):
+            cap = None
+        fg = a["function_group"] or "Other"
+        for d in work_dates:
+            if d in ov_map:
+                if ov_map[d] == "empty":
+                    continue
+            elif not start <= d <= end:
+                continue
+            info = groups.setdefault((fg, d), [0, 0])
+            if cap is None:
+                info[1] += 1
+            else:
+                info[0] += cap
+    for (fg, d), (total_cap, unknown) in groups.items():
+        if unknown and not total_cap:
+            add({"type": "capacity_unknown", "alert_key": fg, "date": d,
+                 "severity": "info", "module": "boats",
+                 "msg": f"Boats ({fg}): all boats have unknown capacity - verify manually",
+                 "entity": fg, "function": None})
+    return found
+
+
+def refresh_alerts(prod_id, notify=False):
+    """Bring the stored alerts of `prod_id` up to date: re-evaluate pending
+    dates (everything on the first call or after an unhinted write).
+    With notify=True, alerts that appear are sent to the production's members.
+    Returns the number of new alerts.
+    Refreshes of different productions run concurrently; the notification
+    fan-out happens after the production's lock is released."""
+    with _alerts_lock:
+        prod_lock = _production_alert_locks.setdefault(prod_id, threading.RLock())
+    with prod_lock:
+        with _alerts_lock:
+            full = prod_id not in _alerts_built
+            dates = None if full else _alerts_dirty.get(prod_id, set())
+            _alerts_dirty.pop(prod_id, None)
+            epoch = _alerts_epoch
+        if dates is not None and not dates:
+            return 0
+        with get_db() as conn:
+            params = [prod_id]
+            existing = {
+                (r["type"], r["alert_key"], r["date"])
+                for r in conn.execute(
+                    f"SELECT type, alert_key, date FROM alerts WHERE production_id=?"
+                    f"{_in_dates('date', dates, params)}", params
+                ).fetchall()
+            }
+            found = _evaluate_alerts(conn, prod_id, dates)
+            gone = existing - set(found)
+            new = [found[k] for k in found if k not in existing]
+            if gone:
+                conn.executemany(
+                    "DELETE FROM alerts WHERE production_id=? AND type=? AND alert_key=? AND date=?",
+                    [(prod_id,) + k for k in gone]
+                )
+            if new:
+                conn.executemany(
+                    f"""INSERT INTO alerts (production_id, {', '.join(_ALERT_COLUMNS)})
+                        VALUES (?, {', '.join('?' * len(_ALERT_COLUMNS))})""",
+                    [(prod_id,) + tuple(a[c] for c in _ALERT_COLUMNS) for a in new]
+                )
+        with _alerts_lock:
+            if epoch == _alerts_epoch:  # else a full rebuild was requested meanwhile
+                _alerts_built.add(prod_id)
+
+    pushed = [a for a in new if a["severity"] in _ALERT_NOTIFY_SEVERITIES]
+    if notify and not full and pushed:
+        title = pushed[0]["msg"] if len(pushed) == 1 else f"{len(pushed)} new scheduling conflicts"
+        create_notifications_for_production(
+            prod_id, "conflict_alert", title,
+            "\n".join(a["msg"] for a in pushed[:10]), entity_type="alerts")
+    return len(new)
+
+
+def get_alerts(prod_id):
+    """Current conflict alerts, danger first. Unknown-capacity alerts are
+    reported once per function group, on its first date."""
+    refresh_alerts(prod_id)
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM alerts WHERE production_id=? ORDER BY date, id", (prod_id,)
+        ).fetchall()
+    alerts, seen_groups = [], set()
+    for r in rows:
+        if r["type"] == "capacity_unknown":
+            if r["entity"] in seen_groups:
+                continue
+            seen_groups.add(r["entity"])
+        alert = {"type": r["type"], "severity": r["severity"], "module": r["module"],
+                 "date": r["date"], "msg": r["msg"], "entity": r["entity"]}
+        if r["type"] == "boat_on_off":
+            alert["function"] = r["function"]
+        alerts.append(alert)
+    alerts.sort(key=lambda a: (_ALERT_SEVERITY_ORDER.get(a["severity"], 3), a["date"]))
+    return alerts
 
 
 # ─── Production Templates (AXE 10.1) ──────────────────────────────────────────
@@ -5332,46 +7163,51 @@ def get_production_template(template_id):
 def save_production_as_template(production_id, name, description=None,
                                  creator_id=None, creator_nickname=None):
     """Snapshot a production's config (boat_functions, groups, FNB categories/items,
-    guard_posts, location_sites) into a reusable template."""
+    guard_posts, locations) into a reusable template."""
     config = {}
     with get_db() as conn:
         # Boat functions (roles/groups)
         funcs = conn.execute(
             "SELECT name, specs, context, function_group, color, default_start, default_end, sort_order "
-            "FROM boat_functions WHERE production_id=?", (production_id,)
+            "FROM boat_functions WHERE production_id=? AND deleted_at IS NULL ORDER BY id",
+            (production_id,)
         ).fetchall()
         config["boat_functions"] = [dict(r) for r in funcs]
 
-        # FNB categories and items
+        # FNB categories and items (items grouped by category id)
         cats = conn.execute(
-            "SELECT name, color, sort_order FROM fnb_categories WHERE production_id=?",
+            "SELECT id, name, color, sort_order FROM fnb_categories "
+            "WHERE production_id=? AND deleted_at IS NULL ORDER BY id",
             (production_id,)
         ).fetchall()
-        fnb = []
-        for cat in cats:
-            items = conn.execute(
-                """SELECT fi.name, fi.unit, fi.unit_price, fi.notes, fi.sort_order
-                   FROM fnb_items fi
-                   JOIN fnb_categories fc ON fi.category_id = fc.id
-                   WHERE fc.production_id=? AND fc.name=?""",
-                (production_id, cat["name"])
-            ).fetchall()
-            fnb.append({"category": dict(cat), "items": [dict(i) for i in items]})
-        config["fnb"] = fnb
+        items_by_cat = {}
+        for item in conn.execute(
+                """SELECT category_id, name, unit, unit_price, notes, sort_order
+                   FROM fnb_items WHERE production_id=? AND deleted_at IS NULL ORDER BY id""",
+                (production_id,)).fetchall():
+            item = dict(item)
+            items_by_cat.setdefault(item.pop("category_id"), []).append(item)
+        config["fnb"] = [
+            {"category": {"name": c["name"], "color": c["color"], "sort_order": c["sort_order"]},
+             "items": items_by_cat.get(c["id"], [])}
+            for c in cats
+        ]
 
         # Guard posts
         posts = conn.execute(
-            "SELECT name, guards_prep, guards_film, guards_wrap FROM guard_posts WHERE production_id=?",
+            "SELECT name, guards_prep, guards_film, guards_wrap FROM guard_posts "
+            "WHERE production_id=? AND deleted_at IS NULL ORDER BY id",
             (production_id,)
         ).fetchall()
         config["guard_posts"] = [dict(r) for r in posts]
 
-        # Location sites
+        # Locations (sites and their P/F/W pricing)
         sites = conn.execute(
-            "SELECT name, site_type, color FROM location_sites WHERE production_id=?",
+            f"SELECT {', '.join(_TEMPLATE_LOCATION_FIELDS)} FROM locations "
+            "WHERE production_id=? AND deleted_at IS NULL ORDER BY id",
             (production_id,)
         ).fetchall()
-        config["location_sites"] = [dict(r) for r in sites]
+        config["locations"] = [dict(r) for r in sites]
 
         # Production settings (start_date, end_date, site)
         prod = conn.execute("SELECT start_date, end_date, site FROM productions WHERE id=?",
@@ -5391,64 +7227,71 @@ def save_production_as_template(production_id, name, description=None,
         return cur.lastrowid
 
 
+_TEMPLATE_LOCATION_FIELDS = ("name", "type", "location_type", "lat", "lng", "access_note",
+                             "price_p", "price_f", "price_w", "global_deal")
+
+
 def create_production_from_template(template_id, name, creator_id=None, creator_nickname=None):
-    """Create a new production pre-populated from a template."""
+    """Create a new production pre-populated from a template, in one
+    transaction with one bulk insert per table (FNB categories go one by one
+    so their items follow their own new id)."""
     tpl = get_production_template(template_id)
     if not tpl:
         return None
     config = json.loads(tpl["config_json"])
 
-    # Create the production
     prod_data = {"name": name, "status": "active"}
     defaults = config.get("production_defaults", {})
     prod_data["site"] = defaults.get("site")
-    prod_id = create_production(prod_data)
-    from database import seed_departments
-    seed_departments(prod_id)
 
-    with get_db() as conn:
+    with shared_transaction() as conn:
+        prod_id = create_production(prod_data)
+        seed_departments(prod_id)
+
         # Boat functions
-        for f in config.get("boat_functions", []):
-            conn.execute(
-                """INSERT INTO boat_functions
-                   (production_id, name, specs, context, function_group, color, default_start, default_end, sort_order)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (prod_id, f.get("name"), f.get("specs"), f.get("context", "boats"),
-                 f.get("function_group"), f.get("color"), f.get("default_start"),
-                 f.get("default_end"), f.get("sort_order", 0))
-            )
+        conn.executemany(
+            """INSERT INTO boat_functions
+               (production_id, name, specs, context, function_group, color, default_start, default_end, sort_order)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(prod_id, f.get("name"), f.get("specs"), f.get("context", "boats"),
+              f.get("function_group"), f.get("color"), f.get("default_start"),
+              f.get("default_end"), f.get("sort_order", 0))
+             for f in config.get("boat_functions", [])]
+        )
 
-        # FNB categories + items
-        for entry in config.get("fnb", []):
-            cat = entry["category"]
-            cur = conn.execute(
-                "INSERT INTO fnb_categories (production_id, name, color, sort_order) VALUES (?, ?, ?, ?)",
-                (prod_id, cat["name"], cat.get("color", "#F97316"), cat.get("sort_order", 0))
-            )
-            cat_id = cur.lastrowid
-            for item in entry.get("items", []):
-                conn.execute(
-                    """INSERT INTO fnb_items (category_id, production_id, name, unit, unit_price, notes, sort_order)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (cat_id, prod_id, item["name"], item.get("unit", "unit"),
-                     item.get("unit_price", 0), item.get("notes"), item.get("sort_order", 0))
-                )
+        # FNB categories, then their items through each category's own new id
+        # (names need not be unique)
+        fnb = config.get("fnb", [])
+        cat_ids = insert_returning_ids(
+            conn,
+            "INSERT INTO fnb_categories (production_id, name, color, sort_order) VALUES (?, ?, ?, ?)",
+            [(prod_id, e["category"]["name"], e["category"].get("color", "#F97316"),
+              e["category"].get("sort_order", 0)) for e in fnb]
+        )
+        conn.executemany(
+            """INSERT INTO fnb_items (category_id, production_id, name, unit, unit_price, notes, sort_order)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(cat_id, prod_id, item["name"], item.get("unit", "unit"),
+              item.get("unit_price", 0), item.get("notes"), item.get("sort_order", 0))
+             for e, cat_id in zip(fnb, cat_ids) for item in e.get("items", [])]
+        )
 
         # Guard posts
-        for gp in config.get("guard_posts", []):
-            conn.execute(
-                """INSERT INTO guard_posts (production_id, name, guards_prep, guards_film, guards_wrap)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (prod_id, gp["name"], gp.get("guards_prep", 2),
-                 gp.get("guards_film", 2), gp.get("guards_wrap", 2))
-            )
+        conn.executemany(
+            """INSERT INTO guard_posts (production_id, name, guards_prep, guards_film, guards_wrap)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(prod_id, gp["name"], gp.get("guards_prep", 2),
+              gp.get("guards_film", 2), gp.get("guards_wrap", 2))
+             for gp in config.get("guard_posts", [])]
+        )
 
-        # Location sites
-        for s in config.get("location_sites", []):
-            conn.execute(
-                "INSERT INTO location_sites (production_id, name, site_type, color) VALUES (?, ?, ?, ?)",
-                (prod_id, s["name"], s.get("site_type"), s.get("color"))
-            )
+        # Locations
+        sites = config.get("locations", [])
+        conn.executemany(
+            f"""INSERT INTO locations (production_id, {', '.join(_TEMPLATE_LOCATION_FIELDS)})
+                VALUES (?, {', '.join('?' * len(_TEMPLATE_LOCATION_FIELDS))})""",
+            [(prod_id,) + tuple(site.get(f) for f in _TEMPLATE_LOCATION_FIELDS) for site in sites]
+        )
 
         _log_history(conn, "productions", prod_id, "create",
                      new_data={"name": name, "from_template": tpl["name"]},
@@ -5491,6 +7334,16 @@ def duplicate_assignment(table_name, assignment_id, date_offset_days=7):
         if "day_overrides" in data:
             data["day_overrides"] = "{}"
 
+        # The copy must not double-book its entity
+        bf = conn.execute("SELECT production_id FROM boat_functions WHERE id=?",
+                          (data["boat_function_id"],)).fetchone()
+        if bf:
+            validate_assignment_overlaps(bf["production_id"], [{
+                "table": table_name, "entity_id": data.get(ASSIGNMENT_ENTITIES[table_name][0]),
+                "start_date": data.get("start_date"), "end_date": data.get("end_date"),
+                "assignment_status": data.get("assignment_status"),
+            }], conn)
+
         # Build INSERT
         cols = list(data.keys())
         placeholders = ",".join(["?"] * len(cols))
@@ -5508,6 +7361,95 @@ def duplicate_assignment(table_name, assignment_id, date_offset_days=7):
         return dict(new_row)
 
 
+def duplicate_assignments(table_name, prod_id, ids=None, boat_function_id=None,
+                          function_group=None, date_offset_days=7):
+    """Duplicate many assignments of a production with dates shifted by offset_days.
+
+    The selection is the production's assignments matching every filter given:
+    `ids`, `boat_function_id` and/or `function_group` (at least one is
+    required). All copies are overlap-checked in one batch (raises
+    ValidationError), then inserted keeping each copy's own id; their
+    assignment_day_overrides are copied, shifted, with one INSERT ... SELECT
+    through the old -> new id map. Logs a single 'duplicate' history entry.
+    Returns the new rows, in source id order.
+    """
+    filters, params = ["bf.production_id = ?", "bf.deleted_at IS NULL"], [prod_id]
+    if ids is not None:
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        filters.append(f"s.id IN ({','.join('?' * len(ids))})")
+        params += ids
+    if boat_function_id is not None:
+        filters.append("s.boat_function_id = ?")
+        params.append(boat_function_id)
+    if function_group is not None:
+        filters.append("bf.function_group = ?")
+        params.append(function_group)
+    if len(filters) == 2:
+        raise ValueError("duplicate_assignments needs ids, boat_function_id or function_group")
+    entity_col = ASSIGNMENT_ENTITIES[table_name][0]
+    atype = _TABLE_TO_ATYPE[table_name]
+    source = (f"FROM {table_name} s JOIN boat_functions bf ON bf.id = s.boat_function_id "
+              f"WHERE {' AND '.join(filters)}")
+
+    with get_db() as conn:
+        rows = [dict(r) for r in conn.execute(
+            f"SELECT s.* {source} ORDER BY s.id", params).fetchall()]
+        if not rows:
+            return []
+        # The copies must not double-book their entities
+        validate_assignment_overlaps(prod_id, [{
+            "table": table_name, "entity_id": r.get(entity_col),
+            "start_date": _shift_iso_date(r.get("start_date"), date_offset_days),
+            "end_date": _shift_iso_date(r.get("end_date"), date_offset_days),
+            "assignment_status": r.get("assignment_status"),
+        } for r in rows], conn)
+
+        cols = [c for c in get_table_columns(conn, table_name) if c not in _CLONE_SKIP_COLUMNS]
+        copies = [tuple(_shift_iso_date(r[c], date_offset_days) if c in ("start_date", "end_date")
+                        else "{}" if c == "day_overrides" else r[c] for c in cols)
+                  for r in rows]
+        new_ids = insert_returning_ids(
+            conn, f"INSERT INTO {table_name} ({', '.join(cols)}) "
+                  f"VALUES ({', '.join('?' * len(cols))})", copies)
+        new_rows = _rows_by_ids(conn, table_name, new_ids)
+
+        _reset_clone_id_map(conn)
+        conn.executemany("INSERT INTO clone_id_map (tbl, old_id, new_id) VALUES (?, ?, ?)",
+                         [(table_name, old["id"], new_id) for old, new_id in zip(rows, new_ids)])
+        conn.execute(
+            f"""INSERT INTO assignment_day_overrides (assignment_type, assignment_id, date, status)
+                SELECT o.assignment_type, m.new_id, {_shift_date_sql('o.date', date_offset_days)}, o.status
+                FROM assignment_day_overrides o
+                JOIN clone_id_map m ON m.tbl = ? AND m.old_id = o.assignment_id
+                WHERE o.assignment_type = ?""",
+            (table_name, atype))
+        conn.execute("DELETE FROM clone_id_map")
+        overrides = get_day_overrides_map(conn, atype, [r["id"] for r in new_rows])
+
+        dates = set()
+        for r in new_rows:
+            r["day_overrides"] = json.dumps(overrides.get(r["id"], {}))
+            span = _date_span(r.get("start_date"), r.get("end_date"))
+            if span is None or dates is None:
+                dates = None
+            else:
+                dates.update(span)
+                dates.update(overrides.get(r["id"], {}))
+        if table_name in _ALERT_ASSIGNMENT_TABLES:
+            _hint_alerts(conn, prod_id, (table_name, "assignment_day_overrides"), dates)
+        else:
+            # Other assignment modules only share the overrides table
+            _hint_alerts(conn, None, "assignment_day_overrides")
+        _log_history(conn, table_name, None, "duplicate",
+                     new_data={"ids": new_ids, "source_ids": [r["id"] for r in rows],
+                               "date_offset_days": date_offset_days},
+                     human_description=f"Duplicated {len(new_ids)} assignments (+{date_offset_days}d)",
+                     production_id=prod_id)
+        return new_rows
+
+
 def duplicate_fnb_category(category_id):
     """Duplicate an FNB category with all its items."""
     with get_db() as conn:
@@ -5628,6 +7570,414 @@ def check_vessel_cross_module_conflict(physical_vessel_id, start_date, end_date,
     return warnings
 
 
+# ─── Assignment interval index ────────────────────────────────────────────────
+# Every dated assignment of a production, grouped by booked entity and by
+# physical vessel, for checks over many assignments at once (batch
+# validation, conflict report). Single-assignment checks stay on SQL.
+
+# Assignment table -> (entity column, entity table)
+ASSIGNMENT_ENTITIES = {
+    "boat_assignments": ("boat_id", "boats"),
+    "picture_boat_assignments": ("picture_boat_id", "picture_boats"),
+    "security_boat_assignments": ("security_boat_id", "security_boats"),
+    "transport_assignments": ("vehicle_id", "transport_vehicles"),
+    "helper_assignments": ("helper_id", "helpers"),
+    "guard_camp_assignments": ("helper_id", "guard_camp_workers"),
+}
+# Tables whose entities can point to a physical vessel
+_VESSEL_ASSIGNMENT_TABLES = ("boat_assignments", "picture_boat_assignments",
+                             "security_boat_assignments")
+ASSIGNMENT_INDEX_TABLES = tuple(ASSIGNMENT_ENTITIES) + tuple(
+    dict.fromkeys(t for _, t in ASSIGNMENT_ENTITIES.values())) + ("boat_functions",)
+
+
+class IntervalIndex:
+    """Closed intervals [start, end] grouped by key. Each group is sorted by
+    start with a running maximum of ends, so a query bisects to the last
+    interval starting before its end and walks back only while an earlier
+    interval can still reach its start. Bounds are ISO date strings."""
+
+    def __init__(self, intervals=()):
+        groups = {}
+        for key, start, end, item in intervals:
+            groups.setdefault(key, []).append((start, end, item))
+        self._groups = {}
+        for key, group in groups.items():
+            group.sort(key=lambda iv: (iv[0], iv[1]))
+            max_ends, reach = [], ""
+            for _, end, _ in group:
+                reach = max(reach, end)
+                max_ends.append(reach)
+            self._groups[key] = ([iv[0] for iv in group], max_ends, group)
+
+    def overlapping(self, key, start, end):
+        """Items of `key` whose interval overlaps [start, end], by start."""
+        if key not in self._groups:
+            return []
+        starts, max_ends, group = self._groups[key]
+        found = []
+        i = bisect.bisect_right(starts, end)
+        while i > 0 and max_ends[i - 1] >= start:
+            i -= 1
+            if group[i][1] >= start:
+                found.append(group[i][2])
+        found.reverse()
+        return found
+
+    def overlapping_pairs(self):
+        """Yield (key, a, b) for every pair of overlapping intervals in a group."""
+        for key, (_, _, group) in self._groups.items():
+            active = []
+            for start, end, item in group:
+                active = [iv for iv in active if iv[1] >= start]
+                for iv in active:
+                    yield key, iv[2], item
+                active.append((start, end, item))
+
+
+class AssignmentIndex:
+    """Booked (not cancelled) assignments of a production, indexed by
+    (table, entity_id) and by physical vessel."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_entity = IntervalIndex(
+            ((r["table"], r["entity_id"]), r["start_date"], r["end_date"], r) for r in rows)
+        self.by_vessel = IntervalIndex(
+            (r["physical_vessel_id"], r["start_date"], r["end_date"], r)
+            for r in rows if r["physical_vessel_id"])
+
+    def double_bookings(self):
+        """Pairs of assignments booking the same entity on overlapping dates."""
+        return [(a, b) for _, a, b in self.by_entity.overlapping_pairs()]
+
+    def vessel_conflicts(self):
+        """Pairs of assignments of different entities (usually in different
+        modules) sharing a physical vessel on overlapping dates."""
+        return [(a, b) for _, a, b in self.by_vessel.overlapping_pairs()
+                if (a["table"], a["entity_id"]) != (b["table"], b["entity_id"])]
+
+
+def _is_booking(status):
+    # Same rule as validate_assignment_overlap: NULL and 'cancelled' don't book
+    return status is not None and status != "cancelled"
+
+
+def _load_assignment_index_rows(conn, prod_id):
+    rows = []
+    for table, (entity_col, entity_table) in ASSIGNMENT_ENTITIES.items():
+        vessel = "e.physical_vessel_id" if table in _VESSEL_ASSIGNMENT_TABLES else "NULL"
+        for r in conn.execute(
+            f"""SELECT a.id, a.{entity_col} AS entity_id, e.name AS entity_name,
+                       {vessel} AS physical_vessel_id, a.boat_function_id,
+                       bf.name AS function_name, substr(a.start_date, 1, 10) AS start_date,
+                       substr(a.end_date, 1, 10) AS end_date, a.assignment_status
+                FROM {table} a
+                JOIN boat_functions bf ON a.boat_function_id = bf.id
+                JOIN {entity_table} e ON a.{entity_col} = e.id
+                WHERE bf.production_id=? AND a.start_date IS NOT NULL AND a.end_date IS NOT NULL
+                  AND a.start_date != '' AND a.end_date != ''""",
+            (prod_id,)
+        ).fetchall():
+            if _is_booking(r["assignment_status"]):
+                rows.append(dict(r, table=table))
+    return rows
+
+
+_assignment_indexes = {}  # { prod_id: (assignment tables data version, AssignmentIndex) }
+
+
+def get_assignment_index(prod_id, conn=None):
+    """Return the cached AssignmentIndex for a production (rebuilt after any
+    write to the assignment or entity tables). With `conn` the index is built
+    from that connection and not cached: it may be mid-transaction, with
+    writes the data version does not show yet."""
+    if conn is not None:
+        return AssignmentIndex(_load_assignment_index_rows(conn, prod_id))
+    version = None if in_shared_transaction() else get_data_version(ASSIGNMENT_INDEX_TABLES)
+    cached = _assignment_indexes.get(prod_id)
+    if cached and version is not None and cached[0] == version:
+        return cached[1]
+    with get_db() as c:
+        rows = _load_assignment_index_rows(c, prod_id)
+    index = AssignmentIndex(rows)
+    if version is not None:
+        _assignment_indexes[prod_id] = (version, index)
+    return index
+
+
+def find_assignment_overlaps(prod_id, proposals, conn=None):
+    """Check many proposed assignments against the production and each other.
+    proposals: list of {'table', 'entity_id', 'start_date', 'end_date',
+    'exclude_id'?, 'assignment_status'?} (exclude_id: the assignment a
+    proposal replaces; a given status that does not book, NULL or
+    'cancelled', skips the proposal as it does existing rows).
+    Returns {proposal index: [conflicting assignment ids / 'row N']} for the
+    proposals that would double-book their entity."""
+    index = get_assignment_index(prod_id, conn)
+    replaced = {(p["table"], p["exclude_id"]) for p in proposals if p.get("exclude_id")}
+    conflicts = {}
+    accepted = []
+    for i, p in enumerate(proposals):
+        if not p.get("entity_id") or not p.get("start_date") or not p.get("end_date"):
+            continue
+        if "assignment_status" in p and not _is_booking(p["assignment_status"]):
+            continue
+        key = (p["table"], p["entity_id"])
+        start, end = p["start_date"][:10], p["end_date"][:10]
+        found = [r["id"] for r in index.by_entity.overlapping(key, start, end)
+                 if (r["table"], r["id"]) not in replaced]
+        found += [f"row {j}" for j, (k, s, e) in accepted
+                  if k == key and s <= end and e >= start]
+        if found:
+            conflicts[i] = found
+        accepted.append((i, (key, start, end)))
+    return conflicts
+
+
+def validate_assignment_overlaps(prod_id, proposals, conn=None):
+    """Raising form of find_assignment_overlaps, like validation's
+    validate_assignment_overlap for a single assignment. Errors are keyed
+    "<proposal index>.date_overlap"."""
+    conflicts = find_assignment_overlaps(prod_id, proposals, conn)
+    if conflicts:
+        raise ValidationError({
+            f"{i}.date_overlap": f"This entity is already assigned during {proposals[i]['start_date']} - {proposals[i]['end_date']} (conflicts with assignment(s): {', '.join(str(c) for c in found)})"
+            for i, found in conflicts.items()
+        })
+
+
+def _conflict_side(r):
+    return {"module": r["table"], "id": r["id"], "function": r["function_name"],
+            "start_date": r["start_date"], "end_date": r["end_date"]}
+
+
+def get_assignment_conflicts(prod_id):
+    """Every double-booking and cross-module vessel conflict of a production."""
+    index = get_assignment_index(prod_id)
+    double_bookings = [{
+        "module": a["table"], "entity_id": a["entity_id"], "entity": a["entity_name"],
+        "from": max(a["start_date"], b["start_date"]), "to": min(a["end_date"], b["end_date"]),
+        "assignments": [_conflict_side(a), _conflict_side(b)],
+    } for a, b in index.double_bookings()]
+    vessel_conflicts = [{
+        "physical_vessel_id": a["physical_vessel_id"],
+        "from": max(a["start_date"], b["start_date"]), "to": min(a["end_date"], b["end_date"]),
+        "assignments": [dict(_conflict_side(r), entity=r["entity_name"]) for r in (a, b)],
+    } for a, b in index.vessel_conflicts()]
+    key = lambda c: (c["from"], c["assignments"][0]["module"], c["assignments"][0]["id"])
+    return {
+        "double_bookings": sorted(double_bookings, key=key),
+        "vessel_conflicts": sorted(vessel_conflicts, key=key),
+        "count": len(double_bookings) + len(vessel_conflicts),
+    }
+
+
+# ─── Production cloning ──────────────────────────────────────────────────────
+
+# Tables copied by clone_production, parents first:
+# (table, {column: (table of the referenced clone ids, required)}, shifted date columns).
+# Rows whose required parent was not copied are skipped; optional references
+# to rows that were not copied become NULL.
+_CLONE_CONFIG_TABLES = [
+    ("boat_functions", {}, ("default_start", "default_end")),
+    ("fnb_categories", {}, ()),
+    ("fnb_items", {"category_id": ("fnb_categories", True)}, ()),
+    ("guard_posts", {}, ()),
+    ("locations", {}, ()),
+]
+_CLONE_SCHEDULE_TABLES = [
+    ("physical_vessels", {}, ()),
+    ("boats", {"physical_vessel_id": ("physical_vessels", False)}, ()),
+    ("picture_boats", {"physical_vessel_id": ("physical_vessels", False)}, ()),
+    ("security_boats", {"physical_vessel_id": ("physical_vessels", False)}, ()),
+    ("transport_vehicles", {}, ()),
+    ("helpers", {}, ()),
+    ("guard_camp_workers", {}, ()),
+    ("fuel_machinery", {}, ("start_date", "end_date")),
+    ("shooting_days", {}, ("date",)),
+    ("shooting_day_events", {"shooting_day_id": ("shooting_days", True)}, ()),
+    ("shooting_day_locations", {"shooting_day_id": ("shooting_days", True),
+                                "location_id": ("locations", True)}, ()),
+    ("location_schedules", {"location_id": ("locations", False)}, ("date",)),
+    ("guard_location_schedules", {"location_id": ("locations", False)}, ("date",)),
+] + [
+    (table, {"boat_function_id": ("boat_functions", True), entity_col: (entity_table, False)},
+     ("start_date", "end_date"))
+    for table, (entity_col, entity_table) in ASSIGNMENT_ENTITIES.items()
+]
+# Columns left to their defaults on the copies
+_CLONE_SKIP_COLUMNS = {"id", "created_at", "updated_at"}
+
+
+def _shift_date_sql(expr, days):
+    """SQL for the ISO date `expr` moved by `days` days (NULL and '' give NULL)."""
+    if not days:
+        return expr
+    if is_postgres():
+        return f"to_char(NULLIF({expr}, '')::date + {int(days)}, 'YYYY-MM-DD')"
+    return f"date(NULLIF({expr}, ''), '{int(days):+d} days')"
+
+
+def _reset_clone_id_map(conn):
+    """Create (or empty) the connection's TEMP old id -> new id map."""
+    conn.execute("""CREATE TEMP TABLE IF NOT EXISTS clone_id_map (
+                        tbl TEXT NOT NULL, old_id INTEGER NOT NULL, new_id INTEGER NOT NULL,
+                        PRIMARY KEY (tbl, old_id))""")
+    conn.execute("DELETE FROM clone_id_map")
+
+
+def _clone_rows(conn, table, refs, dates, src_id, dst_id, offset, where="", params=()):
+    """Copy one table's rows: the source rows are read with `refs` remapped
+    through clone_id_map and `dates` shifted in SQL, then inserted one by one
+    so each copy's id is recorded against its source id in clone_id_map."""
+    cols = get_table_columns(conn, table)
+    scoped = "production_id" in cols
+    joins, join_params, exprs = [], [], []
+    for i, (col, (ref_table, required)) in enumerate(refs.items()):
+        joins.append(f"{'JOIN' if required else 'LEFT JOIN'} clone_id_map m{i} "
+                     f"ON m{i}.tbl = ? AND m{i}.old_id = s.{col}")
+        join_params.append(ref_table)
+    copied = [c for c in cols if c not in _CLONE_SKIP_COLUMNS]
+    for col in copied:
+        if col == "production_id":
+            exprs.append("?")
+        elif col in refs:
+            exprs.append(f"m{list(refs).index(col)}.new_id")
+        elif col in dates:
+            exprs.append(_shift_date_sql(f"s.{col}", offset))
+        elif col == "day_overrides":
+            exprs.append("'{}'")  # the assignment_day_overrides rows are cloned instead
+        else:
+            exprs.append(f"s.{col}")
+    filters = [where] if where else []
+    src_params = list(join_params) + list(params)
+    if scoped:
+        filters.append("s.production_id = ?")
+        src_params.append(src_id)
+    if "deleted_at" in cols:
+        filters.append("s.deleted_at IS NULL")
+    has_id = "id" in cols
+    selected = [f'{e} AS "{c}"' for e, c in zip(exprs, copied)]
+    rows = conn.execute(
+        f"SELECT {'s.id AS clone_src_id, ' if has_id else ''}{', '.join(selected)} "
+        f"FROM {table} s {' '.join(joins)}"
+        + (f" WHERE {' AND '.join(filters)}" if filters else "")
+        + (" ORDER BY s.id" if has_id else ""),
+        ([dst_id] if scoped else []) + src_params
+    ).fetchall()
+    if not rows:
+        return
+    sql = f"INSERT INTO {table} ({', '.join(copied)}) VALUES ({', '.join('?' * len(copied))})"
+    values = [tuple(r[c] for c in copied) for r in rows]
+    if not has_id:
+        conn.executemany(sql, values)
+        return
+    new_ids = insert_returning_ids(conn, sql, values)
+    conn.executemany("INSERT INTO clone_id_map (tbl, old_id, new_id) VALUES (?, ?, ?)",
+                     [(table, r["clone_src_id"], new_id) for r, new_id in zip(rows, new_ids)])
+
+
+def clone_production(source_id, name, date_offset_days=0, include_schedule=True,
+                     creator_id=None, creator_nickname=None):
+    """Duplicate a production in one transaction.
+
+    Always copies the configuration (functions, FNB categories/items, guard
+    posts, locations). With include_schedule, also copies the entities, PDT
+    days, location/guard schedules and every assignment with its day
+    overrides, with all dates moved by date_offset_days. Soft-deleted rows
+    and logged data (fuel/FNB entries, history, alerts) are not copied.
+    Returns the new production id, or None if the source does not exist.
+    """
+    source = get_production(source_id)
+    if not source:
+        return None
+    tables = _CLONE_CONFIG_TABLES + (_CLONE_SCHEDULE_TABLES if include_schedule else [])
+
+    with shared_transaction() as conn:
+        prod_id = create_production({
+            "name": name,
+            "start_date": _shift_iso_date(source.get("start_date"), date_offset_days),
+            "end_date": _shift_iso_date(source.get("end_date"), date_offset_days),
+            "site": source.get("site"),
+            "status": "active",
+        })
+        seed_departments(prod_id)
+        _reset_clone_id_map(conn)
+
+        for table, refs, dates in tables:
+            _clone_rows(conn, table, refs, dates, source_id, prod_id, date_offset_days)
+        if include_schedule:
+            for table, atype in _TABLE_TO_ATYPE.items():
+                _clone_rows(conn, "assignment_day_overrides",
+                            {"assignment_id": (table, True)}, ("date",),
+                            source_id, prod_id, date_offset_days,
+                            where="s.assignment_type = ?", params=(atype,))
+        conn.execute("DELETE FROM clone_id_map")
+
+        _log_history(conn, "productions", prod_id, "create",
+                     new_data={"name": name, "from_production": source["name"],
+                               "date_offset_days": date_offset_days},
+                     user_id=creator_id, user_nickname=creator_nickname,
+                     production_id=prod_id)
+
+    return prod_id
+
+
+def _shift_iso_date(value, days):
+    if not value or not days:
+        return value
+    try:
+        return (datetime.strptime(value[:10], "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+    except ValueError:
+        return value
+
+
+# ─── Bulk CSV import ─────────────────────────────────────────────────────────
+
+IMPORT_TABLES = ("boats", "picture_boats", "security_boats", "transport_vehicles",
+                 "locations", "helpers", "guard_camp_workers")
+
+
+class ImportRowError(Exception):
+    """A row import_rows() could not insert; nothing of the import was written.
+    `index` is the row's position among all rows given (0-based)."""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+
+def import_rows(table, prod_id, columns, batches, description=None):
+    """Insert imported rows for a production in one transaction.
+
+    batches: iterable of lists of dicts keyed by `columns` (production_id is
+    added here); it may be a generator that parses and validates the upload
+    lazily. Each batch is one insert_rows_returning_ids() call (a multi-row
+    INSERT on PostgreSQL, executemany on SQLite), which returns exactly the
+    ids it wrote; a single grouped 'import' history entry lists them. Returns
+    the ids in row order. A database error on a row raises ImportRowError
+    and the whole import is rolled back.
+    """
+    if table not in IMPORT_TABLES:
+        raise ValueError(f"Import not supported for table: {table}")
+    cols = ("production_id",) + tuple(c for c in columns if c != "production_id")
+    with get_db() as conn:
+        ids = []
+        for batch in batches:
+            rows = [(prod_id,) + tuple(r.get(c) for c in cols[1:]) for r in batch]
+            try:
+                ids += insert_rows_returning_ids(conn, table, cols, rows)
+            except BatchInsertError as e:
+                raise ImportRowError(len(ids) + e.index, str(e)) from e
+        if not ids:
+            return []
+        _log_history(conn, table, None, "import", new_data={"ids": ids},
+                     human_description=description or f"Imported {len(ids)} {table.replace('_', ' ')} from CSV",
+                     production_id=prod_id)
+        return ids
+
+
 # ─── Soft Delete: generic restore ────────────────────────────────────────────
 
 def restore_entity(table, entity_id):
@@ -5645,162 +7995,186 @@ def restore_fnb_category(cat_id):
 
 # ─── Daily Checklists ─────────────────────────────────────────────────────────
 
-def generate_daily_checklist(prod_id, date):
-    """Auto-generate a checklist from the day's assignments (boats, vehicles, labour, guards)."""
+# Assignment modules on the daily checklist: (kind, assignment table, entity
+# table, entity column, name override column, function context, override type,
+# extra column)
+_CHECKLIST_ASSIGNMENTS = (
+    ("boat", "boat_assignments", "boats", "boat_id", "boat_name_override",
+     "boats", "boats", "NULL"),
+    ("picture_boat", "picture_boat_assignments", "picture_boats", "picture_boat_id",
+     "boat_name_override", "picture", "picture_boats", "NULL"),
+    ("security_boat", "security_boat_assignments", "security_boats", "security_boat_id",
+     "boat_name_override", "security", "security_boats", "NULL"),
+    ("vehicle", "transport_assignments", "transport_vehicles", "vehicle_id",
+     "vehicle_name_override", "transport", "transport", "e.driver"),
+    ("helper", "helper_assignments", "helpers", "helper_id",
+     "helper_name_override", "labour", "labour", "NULL"),
+)
+_CHECKLIST_KINDS = [k[0] for k in _CHECKLIST_ASSIGNMENTS] + ["fuel", "guard", "location"]
+
+
+def _checklist_sources(conn, prod_id, dates):
+    """Everything the checklists of `dates` are built from, in one UNION ALL
+    query: active assignments (day overrides read from
+    assignment_day_overrides), boat fuel entries, guard posts and filming
+    locations. Rows: (date, kind, name, function_name, extra)."""
+    days = " UNION ALL ".join(["SELECT ? AS date"] * len(dates))
+    params = list(dates)
+    # extra is TEXT in every branch: PostgreSQL will not UNION text and integer
+    branches = []
+    for kind, table, entity_table, entity_col, name_col, context, atype, extra in _CHECKLIST_ASSIGNMENTS:
+        branches.append(f"""
+            SELECT d.date, {_CHECKLIST_KINDS.index(kind)} AS kind, a.id AS ord,
+                   COALESCE(e.name, a.{name_col}) AS name, bf.name AS function_name,
+                   CAST({extra} AS TEXT) AS extra
+            FROM days d
+            JOIN {table} a ON a.start_date <= d.date AND a.end_date >= d.date
+            JOIN boat_functions bf ON a.boat_function_id = bf.id
+            LEFT JOIN {entity_table} e ON a.{entity_col} = e.id
+            LEFT JOIN assignment_day_overrides o
+              ON o.assignment_type = ? AND o.assignment_id = a.id AND o.date = d.date
+            WHERE bf.production_id = ? AND bf.context = ?
+              AND COALESCE(o.status, a.assignment_status, '') != 'off'""")
+        params += [atype, prod_id, context]
+    branches.append(f"""
+            SELECT d.date, {_CHECKLIST_KINDS.index('fuel')}, fe.id,
+                   COALESCE(b.name, ba.boat_name_override), bf.name, CAST(NULL AS TEXT)
+            FROM days d
+            JOIN fuel_entries fe ON fe.date = d.date AND fe.source_type = 'boats'
+            JOIN boat_assignments ba ON fe.assignment_id = ba.id
+            JOIN boat_functions bf ON ba.boat_function_id = bf.id
+            LEFT JOIN boats b ON ba.boat_id = b.id
+            WHERE bf.production_id = ?""")
+    branches.append(f"""
+            SELECT d.date, {_CHECKLIST_KINDS.index('guard')}, g.id, g.location_name, NULL,
+                   CAST(g.nb_guards AS TEXT)
+            FROM days d
+            JOIN guard_location_schedules g ON g.date = d.date
+            WHERE g.production_id = ?""")
+    branches.append(f"""
+            SELECT d.date, {_CHECKLIST_KINDS.index('location')}, ls.id, ls.location_name, NULL,
+                   CAST(NULL AS TEXT)
+            FROM days d
+            JOIN location_schedules ls ON ls.date = d.date
+            WHERE ls.production_id = ? AND ls.status = 'F'""")
+    params += [prod_id] * 3
+    return conn.execute(
+        f"WITH days AS ({days}) "
+        + " UNION ALL ".join(branches)
+        + " ORDER BY 1, 2, 3",
+        params
+    ).fetchall()
+
+
+def _checklist_item(kind, name, fn, extra):
+    """(category, text) items for one source row."""
+    fn = fn or ""
+    if kind == "boat":
+        return [("boats", f"Boat {name or 'Unnamed boat'} confirmed for {fn}")]
+    if kind == "picture_boat":
+        return [("boats", f"Picture boat {name or 'Unnamed picture boat'} confirmed for {fn}")]
+    if kind == "security_boat":
+        return [("security", f"Security boat {name or 'Unnamed security boat'} on station")]
+    if kind == "vehicle":
+        name = name or "Unnamed vehicle"
+        items = [("transport", f"Vehicle {name} ready for {fn}")]
+        if extra:
+            items.append(("transport", f"Driver {extra} briefed for {name}"))
+        return items
+    if kind == "helper":
+        return [("labour", f"{name or 'Unnamed helper'} present for {fn}")]
+    if kind == "fuel":
+        return [("fuel", f"Fuel topped up for {name or 'assignment'}")]
+    if kind == "guard":
+        return [("guards", f"Guard posted at {name} ({extra or 1})")]
+    return [("locations", f"Location {name} prepped for filming")]
+
+
+def generate_daily_checklists(prod_id, dates):
+    """Generate (or refresh) the checklists of several dates at once, e.g. the
+    coming week. Items are diffed against the stored ones: items still
+    relevant keep their id and checked state, stale ones are deleted and new
+    ones inserted with executemany. Returns {date: checklist}."""
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+    marks = ",".join("?" * len(dates))
     with get_db() as conn:
-        conn.execute(
+        conn.executemany(
             "INSERT OR IGNORE INTO daily_checklists (production_id, date) VALUES (?,?)",
-            (prod_id, date)
+            [(prod_id, d) for d in dates]
         )
-        cl = conn.execute(
-            "SELECT id FROM daily_checklists WHERE production_id=? AND date=?",
-            (prod_id, date)
-        ).fetchone()
-        checklist_id = cl["id"]
-
-        conn.execute("DELETE FROM checklist_items WHERE checklist_id=?", (checklist_id,))
-
-        items = []
+        checklist_ids = {r["date"]: r["id"] for r in conn.execute(
+            f"SELECT id, date FROM daily_checklists WHERE production_id=? AND date IN ({marks})",
+            [prod_id] + dates
+        ).fetchall()}
+
+        wanted = {d: [] for d in dates}
+        for r in _checklist_sources(conn, prod_id, dates):
+            wanted[r["date"]].extend(_checklist_item(
+                _CHECKLIST_KINDS[r["kind"]], r["name"], r["function_name"], r["extra"]))
+
+        existing = {}
+        for r in conn.execute(
+            f"""SELECT id, checklist_id, category, item_text FROM checklist_items
+                WHERE checklist_id IN ({','.join('?' * len(checklist_ids))}) ORDER BY id""",
+            list(checklist_ids.values())
+        ).fetchall():
+            existing.setdefault((r["checklist_id"], r["category"], r["item_text"]), []).append(r["id"])
+
+        inserts = []
+        for d, items in wanted.items():
+            cid = checklist_ids[d]
+            for cat, text in items:
+                kept = existing.get((cid, cat, text))
+                if kept:
+                    kept.pop(0)
+                else:
+                    inserts.append((cid, text, cat))
+        stale = [(item_id,) for ids in existing.values() for item_id in ids]
+        if stale:
+            conn.executemany("DELETE FROM checklist_items WHERE id=?", stale)
+        if inserts:
+            conn.executemany(
+                "INSERT INTO checklist_items (checklist_id, item_text, category) VALUES (?,?,?)",
+                inserts
+            )
 
-        boats = conn.execute("""
-            SELECT ba.*, b.name AS boat_name, bf.name AS function_name
-            FROM boat_assignments ba
-            LEFT JOIN boats b ON ba.boat_id = b.id
-            LEFT JOIN boat_functions bf ON ba.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND bf.context = 'boats'
-              AND ba.start_date <= ? AND ba.end_date >= ?
-        """, (prod_id, date, date)).fetchall()
-        for r in boats:
-            overrides = json.loads(r["day_overrides"] or "{}")
-            status = overrides.get(date, r["assignment_status"])
-            if status == "off":
-                continue
-            name = r["boat_name"] or r["boat_name_override"] or "Unnamed boat"
-            fn = r["function_name"] or ""
-            items.append(("boats", f"Boat {name} confirmed for {fn}"))
+    return get_daily_checklists(prod_id, dates)
 
-        pboats = conn.execute("""
-            SELECT pba.*, pb.name AS boat_name, bf.name AS function_name
-            FROM picture_boat_assignments pba
-            LEFT JOIN picture_boats pb ON pba.picture_boat_id = pb.id
-            LEFT JOIN boat_functions bf ON pba.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND bf.context = 'picture'
-              AND pba.start_date <= ? AND pba.end_date >= ?
-        """, (prod_id, date, date)).fetchall()
-        for r in pboats:
-            overrides = json.loads(r["day_overrides"] or "{}")
-            status = overrides.get(date, r["assignment_status"])
-            if status == "off":
-                continue
-            name = r["boat_name"] or r["boat_name_override"] or "Unnamed picture boat"
-            fn = r["function_name"] or ""
-            items.append(("boats", f"Picture boat {name} confirmed for {fn}"))
 
-        sboats = conn.execute("""
-            SELECT sba.*, sb.name AS boat_name, bf.name AS function_name
-            FROM security_boat_assignments sba
-            LEFT JOIN security_boats sb ON sba.security_boat_id = sb.id
-            LEFT JOIN boat_functions bf ON sba.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND bf.context = 'security'
-              AND sba.start_date <= ? AND sba.end_date >= ?
-        """, (prod_id, date, date)).fetchall()
-        for r in sboats:
-            overrides = json.loads(r["day_overrides"] or "{}")
-            status = overrides.get(date, r["assignment_status"])
-            if status == "off":
-                continue
-            name = r["boat_name"] or r["boat_name_override"] or "Unnamed security boat"
-            items.append(("security", f"Security boat {name} on station"))
+def generate_daily_checklist(prod_id, date):
+    """Auto-generate a checklist from the day's assignments (boats, vehicles,
+    labour, guards). Checked items that still apply stay checked."""
+    return generate_daily_checklists(prod_id, [date])[date]
 
-        vehicles = conn.execute("""
-            SELECT ta.*, tv.name AS vehicle_name, tv.driver, bf.name AS function_name
-            FROM transport_assignments ta
-            LEFT JOIN transport_vehicles tv ON ta.vehicle_id = tv.id
-            LEFT JOIN boat_functions bf ON ta.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND bf.context = 'transport'
-              AND ta.start_date <= ? AND ta.end_date >= ?
-        """, (prod_id, date, date)).fetchall()
-        for r in vehicles:
-            overrides = json.loads(r["day_overrides"] or "{}")
-            status = overrides.get(date, r["assignment_status"])
-            if status == "off":
-                continue
-            name = r["vehicle_name"] or r["vehicle_name_override"] or "Unnamed vehicle"
-            fn = r["function_name"] or ""
-            items.append(("transport", f"Vehicle {name} ready for {fn}"))
-            if r["driver"]:
-                items.append(("transport", f"Driver {r['driver']} briefed for {name}"))
-
-        fuel_boats = conn.execute("""
-            SELECT fe.*, ba.boat_name_override, b.name AS boat_name, bf.name AS function_name
-            FROM fuel_entries fe
-            JOIN boat_assignments ba ON fe.assignment_id = ba.id
-            LEFT JOIN boats b ON ba.boat_id = b.id
-            LEFT JOIN boat_functions bf ON ba.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND fe.date = ?
-        """, (prod_id, date)).fetchall()
-        for r in fuel_boats:
-            name = r["boat_name"] or r["boat_name_override"] or "assignment"
-            items.append(("fuel", f"Fuel topped up for {name}"))
-
-        helpers = conn.execute("""
-            SELECT ha.*, h.name AS helper_name, h.role AS helper_role, bf.name AS function_name
-            FROM helper_assignments ha
-            LEFT JOIN helpers h ON ha.helper_id = h.id
-            LEFT JOIN boat_functions bf ON ha.boat_function_id = bf.id
-            WHERE bf.production_id = ? AND bf.context = 'labour'
-              AND ha.start_date <= ? AND ha.end_date >= ?
-        """, (prod_id, date, date)).fetchall()
-        for r in helpers:
-            overrides = json.loads(r["day_overrides"] or "{}")
-            status = overrides.get(date, r["assignment_status"])
-            if status == "off":
-                continue
-            name = r["helper_name"] or r["helper_name_override"] or "Unnamed helper"
-            fn = r["function_name"] or ""
-            items.append(("labour", f"{name} present for {fn}"))
-
-        guards = conn.execute("""
-            SELECT * FROM guard_location_schedules
-            WHERE production_id = ? AND date = ?
-        """, (prod_id, date)).fetchall()
-        for r in guards:
-            loc = r["location_name"]
-            nb = r["nb_guards"] or 1
-            items.append(("guards", f"Guard posted at {loc} ({nb})"))
-
-        locations = conn.execute("""
-            SELECT * FROM location_schedules
-            WHERE production_id = ? AND date = ? AND status = 'F'
-        """, (prod_id, date)).fetchall()
-        for r in locations:
-            items.append(("locations", f"Location {r['location_name']} prepped for filming"))
-
-        for cat, text in items:
-            conn.execute(
-                "INSERT INTO checklist_items (checklist_id, item_text, category) VALUES (?,?,?)",
-                (checklist_id, text, cat)
-            )
 
-        return get_daily_checklist(prod_id, date)
+def get_daily_checklists(prod_id, dates):
+    """Checklists of several dates with their items: {date: checklist}
+    (dates without a checklist are absent)."""
+    dates = list(dates)
+    if not dates:
+        return {}
+    with get_db() as conn:
+        checklists = {r["id"]: dict(r, items=[]) for r in conn.execute(
+            f"""SELECT * FROM daily_checklists WHERE production_id=?
+                AND date IN ({','.join('?' * len(dates))})""",
+            [prod_id] + dates
+        ).fetchall()}
+        if checklists:
+            for i in conn.execute(
+                f"""SELECT * FROM checklist_items
+                    WHERE checklist_id IN ({','.join('?' * len(checklists))})
+                    ORDER BY category, id""",
+                list(checklists)
+            ).fetchall():
+                checklists[i["checklist_id"]]["items"].append(dict(i))
+    return {cl["date"]: cl for cl in checklists.values()}
 
 
 def get_daily_checklist(prod_id, date):
     """Return the checklist for a given date with all items."""
-    with get_db() as conn:
-        cl = conn.execute(
-            "SELECT * FROM daily_checklists WHERE production_id=? AND date=?",
-            (prod_id, date)
-        ).fetchone()
-        if not cl:
-            return None
-        checklist = dict(cl)
-        items = conn.execute(
-            "SELECT * FROM checklist_items WHERE checklist_id=? ORDER BY category, id",
-            (cl["id"],)
-        ).fetchall()
-        checklist["items"] = [dict(i) for i in items]
-        return checklist
+    return get_daily_checklists(prod_id, [date]).get(date)
 
 
 def check_checklist_item(item_id, checked, user_id=None):
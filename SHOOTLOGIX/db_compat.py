@@ -8,7 +8,9 @@ import os
 import re
 import sqlite3
 import json
+import threading
 from contextlib import contextmanager
+from contextvars import ContextVar
 
 # ---------------------------------------------------------------------------
 # Backend detection
@@ -139,6 +141,28 @@ def _get_conflict_cols(table, extra=None):
     return _TABLE_CONFLICTS.get(table, ['id'])
 
 
+# Tables with composite or non-id primary keys: INSERTs into them must not
+# get RETURNING id (a failing statement aborts the whole PG transaction, so
+# the retry below cannot rescue it)
+_NO_ID_TABLES = frozenset({
+    'shooting_day_locations', 'settings', 'fuel_locked_prices',
+    'notification_counters', 'daily_cost_series', 'clone_id_map',
+})
+
+_INSERT_TARGET_RE = re.compile(
+    r'^\s*INSERT(?:\s+OR\s+\w+)?\s+INTO\s+(\w+)', re.IGNORECASE
+)
+
+
+def _returning_id_sql(sql):
+    """Return `sql` with RETURNING id appended when it is an INSERT into a
+    table with an id column, else None."""
+    m = _INSERT_TARGET_RE.match(sql)
+    if not m or m.group(1).lower() in _NO_ID_TABLES or 'RETURNING' in sql.upper():
+        return None
+    return sql.rstrip().rstrip(';') + ' RETURNING id'
+
+
 def _rewrite_sql(sql):
     """Apply all necessary SQL rewrites for the current backend."""
     if not _use_postgres:
@@ -192,18 +216,10 @@ class PgCursorWrapper:
         sql = _rewrite_sql(sql)
 
         # For INSERT statements, add RETURNING id to capture lastrowid
-        needs_returning = False
-        stripped_rewritten = sql.strip().upper()
-        if (stripped_rewritten.startswith('INSERT') and
-                'RETURNING' not in stripped_rewritten):
-            # Only add RETURNING if the table likely has an id column
-            # Skip for tables with composite PKs or non-id PKs
-            skip_returning = any(t in sql.lower() for t in [
-                'shooting_day_locations', 'settings', 'fuel_locked_prices'
-            ])
-            if not skip_returning:
-                sql = sql.rstrip().rstrip(';') + ' RETURNING id'
-                needs_returning = True
+        returning_sql = _returning_id_sql(sql)
+        needs_returning = returning_sql is not None
+        if needs_returning:
+            sql = returning_sql
 
         try:
             self._cursor.execute(sql, params)
@@ -252,16 +268,34 @@ class PgConnectionWrapper:
     def __init__(self, conn):
         self._conn = conn
         self._cursor = None
+        self.written_tables = set()
 
     def execute(self, sql, params=None):
         cur = self._get_cursor()
         wrapper = PgCursorWrapper(cur)
+        m = _WRITE_STMT_RE.match(sql)
+        if m:
+            self.written_tables.add(m.group(1).lower())
         return wrapper.execute(sql, params)
 
+    def executemany(self, sql, seq_of_params):
+        """Execute one statement for each parameter tuple (sqlite3-compatible)."""
+        m = _WRITE_STMT_RE.match(sql)
+        if m:
+            self.written_tables.add(m.group(1).lower())
+        sql = _rewrite_sql(_rewrite_upsert(sql))
+        cur = self._get_cursor()
+        cur.executemany(sql, seq_of_params)
+        wrapper = PgCursorWrapper(cur)
+        wrapper.rowcount = cur.rowcount
+        return wrapper
+
     def executescript(self, sql_script):
         """Execute a multi-statement SQL script.
         Converts SQLite DDL to PostgreSQL DDL on the fly.
         """
+        self.written_tables.update(
+            t.lower() for t in _WRITE_STMT_RE.findall(sql_script))
         cur = self._get_cursor()
         pg_script = _convert_ddl_to_pg(sql_script)
         cur.execute(pg_script)
@@ -311,24 +345,311 @@ def _convert_ddl_to_pg(sql_script):
     return result
 
 
+# ---------------------------------------------------------------------------
+# Data versions (in-process write tracking)
+# ---------------------------------------------------------------------------
+# Every committed get_db() block that wrote to a table bumps that table's
+# version. Read-side caches key on these counters instead of re-hashing data.
+# The app runs a single gunicorn worker, so in-process counters are exact.
+
+_WRITE_STMT_RE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Bookkeeping tables whose writes never change what the app displays as data
+UNVERSIONED_TABLES = frozenset({
+    'access_logs', 'history', 'notifications', 'refresh_tokens',
+    'daily_cost_series', 'alerts', 'notification_counters', 'clone_id_map',
+})
+
+_table_versions = {}
+_data_version = 0
+_version_lock = threading.Lock()
+
+# Per-production counters. Writes are attributed to the production set with
+# set_write_scope() (the /api/productions/<id>/... being served); writes with
+# no known production bump the "unscoped" counters, which every production sees.
+_write_scope = ContextVar("shootlogix_write_scope", default=None)
+_scoped_versions = {}      # (production_id, table) -> int
+_unscoped_versions = {}    # table -> int
+_production_totals = {}    # production_id -> int
+_unscoped_total = 0
+
+# Changes on every process start so versions from a previous run never match
+DATA_BOOT_ID = os.urandom(4).hex()
+
+
+def set_write_scope(production_id):
+    """Attribute data writes made in the current context to one production
+    (None when unknown: the writes then count for every production)."""
+    _write_scope.set(production_id)
+
+
+def get_write_scope():
+    """Production the current context's writes are attributed to (or None)."""
+    return _write_scope.get()
+
+
+def _record_writes(tables):
+    """Bump the version of each written table and the global data version."""
+    global _data_version, _unscoped_total
+    tables = {t for t in tables if t not in UNVERSIONED_TABLES}
+    if not tables:
+        return
+    scope = _write_scope.get()
+    with _version_lock:
+        for t in tables:
+            _table_versions[t] = _table_versions.get(t, 0) + 1
+            if scope is None:
+                _unscoped_versions[t] = _unscoped_versions.get(t, 0) + 1
+            else:
+                _scoped_versions[(scope, t)] = _scoped_versions.get((scope, t), 0) + 1
+        if scope is None:
+            _unscoped_total += 1
+        else:
+            _production_totals[scope] = _production_totals.get(scope, 0) + 1
+        _data_version += 1
+
+
+def get_data_version(tables=None):
+    """Return the current data version.
+
+    Without arguments, returns a counter bumped by any committed data write.
+    With an iterable of table names, returns a tuple of those tables' versions.
+    """
+    if tables is None:
+        return _data_version
+    return tuple(_table_versions.get(t, 0) for t in tables)
+
+
+def get_production_version(production_id, tables=None):
+    """Return a counter bumped by every write that may affect `production_id`,
+    restricted to `tables` when given (None = any table)."""
+    if tables is None:
+        return _production_totals.get(production_id, 0) + _unscoped_total
+    return sum(_scoped_versions.get((production_id, t), 0) + _unscoped_versions.get(t, 0)
+               for t in tables)
+
+
+def _sqlite_write_tracker(written):
+    """Build a sqlite3 authorizer callback that records tables being written."""
+    def _authorizer(action, arg1, arg2, dbname, source):
+        if action in (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE,
+                      sqlite3.SQLITE_DELETE) and arg1 and not arg1.startswith('sqlite_'):
+            written.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+    return _authorizer
+
+
+# ---------------------------------------------------------------------------
+# After-commit callbacks
+# ---------------------------------------------------------------------------
+# Side effects that must only be seen once data is committed (e.g. live
+# events) are queued on the connection and run after its get_db() commits.
+
+_after_commit = {}   # id(connection yielded by get_db) -> [callable]
+_commit_listeners = []
+
+
+def commit_key(conn):
+    """Identify the get_db() transaction `conn` belongs to (shared or not)."""
+    return id(conn._conn if isinstance(conn, _SharedConnection) else conn)
+
+
+def on_commit(conn, callback):
+    """Run `callback()` after `conn`'s transaction commits; dropped on rollback.
+    Runs immediately for connections not opened by get_db()."""
+    pending = _after_commit.get(commit_key(conn))
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+
+def add_commit_listener(listener):
+    """Call `listener(key, written_tables)` after every get_db() transaction:
+    key is its commit_key(), written_tables the set of tables written (None
+    when it was rolled back)."""
+    _commit_listeners.append(listener)
+
+
+def _run_after_commit(key, written):
+    for listener in _commit_listeners:
+        try:
+            listener(key, written)
+        except Exception as exc:
+            print(f"[db] commit listener failed: {exc}")
+    for callback in _after_commit.pop(key, ()):
+        try:
+            callback()
+        except Exception as exc:
+            print(f"[db] after-commit callback failed: {exc}")
+
+
+def _discard_after_commit(key):
+    _after_commit.pop(key, None)
+    for listener in _commit_listeners:
+        try:
+            listener(key, None)
+        except Exception as exc:
+            print(f"[db] commit listener failed: {exc}")
+
+
 # ---------------------------------------------------------------------------
 # Unified connection context managers
 # ---------------------------------------------------------------------------
 
+# Connection shared by every get_db() call inside shared_transaction()
+_shared_conn = ContextVar("shootlogix_shared_conn", default=None)
+
+
+class _SharedConnection:
+    """Proxy handed out by get_db() inside shared_transaction().
+
+    commit()/rollback()/close() from nested code are ignored: the outer
+    shared_transaction() owns the transaction, savepoint() isolates units.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@contextmanager
+def shared_transaction():
+    """Run every get_db() call made in this block on one connection and one
+    transaction, committed once on exit (rolled back on exception)."""
+    shared = _shared_conn.get()
+    if shared is not None:
+        yield shared
+        return
+    with get_db() as conn:
+        if not _use_postgres:
+            conn.execute("BEGIN")
+        shared = _SharedConnection(conn)
+        token = _shared_conn.set(shared)
+        try:
+            yield shared
+        finally:
+            _shared_conn.reset(token)
+
+
+def in_shared_transaction():
+    """True inside shared_transaction(). Data versions only move when it
+    commits, so version-keyed caches must neither be read nor filled there:
+    earlier work in the block is invisible to the versions, and a savepoint
+    may still roll it back."""
+    return _shared_conn.get() is not None
+
+
+@contextmanager
+def savepoint(conn, name="sp"):
+    """Isolate a unit of work inside a transaction: rolled back to the
+    savepoint on exception (the exception is re-raised)."""
+    conn.execute(f"SAVEPOINT {name}")
+    pending = _after_commit.get(commit_key(conn), [])
+    mark = len(pending)
+    try:
+        yield conn
+    except Exception:
+        conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        conn.execute(f"RELEASE SAVEPOINT {name}")
+        del pending[mark:]
+        raise
+    conn.execute(f"RELEASE SAVEPOINT {name}")
+
+
+def insert_returning_ids(conn, sql, seq_of_params):
+    """Run an INSERT once per parameter tuple and return the new row ids, in
+    order (None where INSERT OR IGNORE skipped the row). Unlike executemany
+    followed by a MAX(id) query, the ids are exactly the rows this call wrote,
+    whatever other connections insert meanwhile."""
+    ids = []
+    for params in seq_of_params:
+        cur = conn.execute(sql, params)
+        ids.append(cur.lastrowid if cur.rowcount == 1 else None)
+    return ids
+
+
+class BatchInsertError(Exception):
+    """A row insert_rows_returning_ids() could not insert; `index` is its
+    position in the batch (0-based). The batch was rolled back."""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+
+
+def insert_rows_returning_ids(conn, table, columns, rows):
+    """Insert `rows` (value tuples ordered like `columns`) as one batch and
+    return the new ids in row order. PostgreSQL runs one multi-row
+    INSERT ... RETURNING id; SQLite runs executemany inside the connection's
+    write transaction (opened here if needed), whose lock keeps other writers
+    out, so the ids are the contiguous range ending at last_insert_rowid().
+    When the database rejects a row, the batch is rolled back and replayed
+    row by row to raise BatchInsertError for the first bad one."""
+    if not rows:
+        return []
+    cols = ", ".join(columns)
+    marks = f"({', '.join('?' * len(columns))})"
+    sql = f"INSERT INTO {table} ({cols}) VALUES {marks}"
+    if not _use_postgres and not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        with savepoint(conn, "insert_batch"):
+            if _use_postgres:
+                cur = conn.execute(
+                    f"INSERT INTO {table} ({cols}) VALUES {', '.join([marks] * len(rows))} RETURNING id",
+                    [v for r in rows for v in r])
+                return [r[0] for r in cur.fetchall()]
+            conn.executemany(sql, rows)
+            last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return list(range(last - len(rows) + 1, last + 1))
+    except Exception:
+        with savepoint(conn, "insert_batch"):
+            for i, r in enumerate(rows):
+                try:
+                    conn.execute(sql, r)
+                except Exception as e:
+                    raise BatchInsertError(i, str(e)) from e
+        raise
+
+
 @contextmanager
 def get_db():
     """Get a database connection — PostgreSQL if DATABASE_URL is set, else SQLite."""
+    shared = _shared_conn.get()
+    if shared is not None:
+        yield shared
+        return
     if _use_postgres:
         pool = _get_pg_pool()
         raw_conn = pool.getconn()
         conn = PgConnectionWrapper(raw_conn)
+        _after_commit[id(conn)] = []
         try:
             yield conn
             conn.commit()
+            _record_writes(conn.written_tables)
+            _run_after_commit(id(conn), set(conn.written_tables))
         except Exception:
             conn.rollback()
             raise
         finally:
+            if id(conn) in _after_commit:
+                _discard_after_commit(id(conn))
             conn.close()
             pool.putconn(raw_conn)
     else:
@@ -336,13 +657,21 @@ def get_db():
         raw_conn.row_factory = sqlite3.Row
         raw_conn.execute("PRAGMA journal_mode=DELETE")
         raw_conn.execute("PRAGMA foreign_keys=ON")
+        written = set()
+        raw_conn.set_authorizer(_sqlite_write_tracker(written))
+        _after_commit[id(raw_conn)] = []
         try:
             yield raw_conn
             raw_conn.commit()
+            if raw_conn.total_changes:
+                _record_writes(written)
+            _run_after_commit(id(raw_conn), written if raw_conn.total_changes else set())
         except Exception:
             raw_conn.rollback()
             raise
         finally:
+            if id(raw_conn) in _after_commit:
+                _discard_after_commit(id(raw_conn))
             raw_conn.close()
 
 
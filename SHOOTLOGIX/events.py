@@ -0,0 +1,141 @@
+"""
+events.py — ShootLogix
+In-process publish/subscribe behind the Server-Sent Events stream
+(/api/productions/<id>/events). History-logged writes and notifications are
+published per production once their transaction commits; each open stream
+holds one Subscription. The app runs a single gunicorn worker, so every
+publisher and subscriber share this process.
+"""
+import itertools
+import os
+import queue
+import threading
+from collections import deque
+
+from json_codec import dumps as json_dumps
+
+# Events buffered per subscriber before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "256"))
+# Recent events kept per production for Last-Event-ID replay
+REPLAY_SIZE = int(os.environ.get("SSE_REPLAY_SIZE", "200"))
+# Open streams allowed at once (0: no limit); gunicorn.conf.py sizes it to
+# the worker so streams cannot take every slot from regular requests
+MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", "0"))
+
+_lock = threading.Lock()
+_event_ids = itertools.count(1)
+_subscribers = {}   # production_id -> set of Subscription
+_open_streams = 0
+_recent = {}        # production_id -> deque of (event_id, event, data, user_id)
+
+
+class Subscription:
+    """One client stream. get() blocks for the next (id, event, data) tuple;
+    an overflowed subscription yields a single "resync" event instead."""
+
+    def __init__(self, production_id, user_id):
+        self.production_id = production_id
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._overflowed = False
+
+    def _offer(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._overflowed = True
+
+    def get(self, timeout):
+        """Next event, or None after `timeout` seconds without one."""
+        if self._overflowed:
+            self._overflowed = False
+            _drain(self._queue)
+            return (None, "resync", {})
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def _drain(q):
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
+
+
+def subscribe(production_id, user_id, last_event_id=None):
+    """Open a subscription. With `last_event_id`, buffered events after it are
+    queued first (or a "resync" when it is older than the buffer).
+    Returns None when MAX_STREAMS subscriptions are already open."""
+    global _open_streams
+    sub = Subscription(production_id, user_id)
+    with _lock:
+        if MAX_STREAMS and _open_streams >= MAX_STREAMS:
+            return None
+        _open_streams += 1
+        _subscribers.setdefault(production_id, set()).add(sub)
+        if last_event_id is not None:
+            recent = _recent.get(production_id, ())
+            if recent and recent[0][0] > last_event_id + 1:
+                sub._overflowed = True
+            else:
+                for event_id, event, data, target in recent:
+                    if event_id > last_event_id and target in (None, user_id):
+                        sub._offer((event_id, event, data))
+    return sub
+
+
+def unsubscribe(sub):
+    global _open_streams
+    with _lock:
+        subs = _subscribers.get(sub.production_id)
+        if subs is not None and sub in subs:
+            _open_streams -= 1
+            subs.discard(sub)
+            if not subs:
+                del _subscribers[sub.production_id]
+
+
+def is_subscribed(production_id, user_id=None):
+    """True when a stream is open for the production (and user, if given)."""
+    with _lock:
+        subs = _subscribers.get(production_id, ())
+        return any(user_id is None or s.user_id == user_id for s in subs)
+
+
+def subscribed_users(production_id):
+    """Ids of the users with an open stream for the production."""
+    with _lock:
+        return {s.user_id for s in _subscribers.get(production_id, ())}
+
+
+def publish(production_id, event, data, user_id=None):
+    """Send `event` to the production's streams (only `user_id`'s when given).
+    production_id None reaches every open stream. Returns the event id."""
+    with _lock:
+        event_id = next(_event_ids)
+        if production_id is None:
+            targets = [s for subs in _subscribers.values() for s in subs]
+            for recent in _recent.values():
+                recent.append((event_id, event, data, user_id))
+        else:
+            targets = list(_subscribers.get(production_id, ()))
+            _recent.setdefault(production_id, deque(maxlen=REPLAY_SIZE)).append(
+                (event_id, event, data, user_id))
+    for sub in targets:
+        if user_id is None or sub.user_id == user_id:
+            sub._offer((event_id, event, data))
+    return event_id
+
+
+def format_sse(event_id, event, data):
+    """Encode one event in text/event-stream format."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json_dumps(data)}\n\n"
+
+
+def subscriber_count():
+    with _lock:
+        return sum(len(subs) for subs in _subscribers.values())
@@ -2,5 +2,27 @@ import os
 
 port = os.environ.get("PORT", "8080")
 bind = f"0.0.0.0:{port}"
+# One worker: data versions and live events (events.py) are kept in process
 workers = 1
 timeout = 120
+
+# SSE streams (/api/productions/<id>/events) stay open per client: with gevent
+# an idle stream costs a greenlet; without it, fall back to a thread pool.
+# Streams beyond SSE_MAX_STREAMS get a 503 and the client polls the count.
+try:
+    import gevent  # noqa: F401
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", "1000"))
+    os.environ.setdefault("SSE_MAX_STREAMS", str(worker_connections // 2))
+except ImportError:
+    worker_class = "gthread"
+    threads = int(os.environ.get("WORKER_THREADS", "32"))
+    os.environ.setdefault("SSE_MAX_STREAMS", str(threads // 4))
+
+
+def post_fork(server, worker):
+    # psycopg2 blocks in C: make it yield to the gevent hub while waiting on
+    # PostgreSQL, or one query would stall every greenlet (open streams too)
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
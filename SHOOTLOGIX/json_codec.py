@@ -0,0 +1,115 @@
+"""
+json_codec.py — ShootLogix
+JSON encoding for API responses: orjson when installed, stdlib json otherwise.
+Also provides the Flask JSON provider, response compression and the
+columnar encoding used by the big grid endpoints.
+"""
+import gzip
+import json
+import os
+import zlib
+
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/html", "text/csv", "text/plain")
+
+if orjson is not None:
+    # Dates go through Flask's _default so output matches the stdlib path
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def get_backend():
+    """Return the name of the JSON backend in use ('orjson' or 'json')."""
+    return "orjson" if orjson is not None else "json"
+
+
+def dumps_bytes(obj, sort_keys=False):
+    """Serialize `obj` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        opts = _ORJSON_OPTS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=opts)
+        except (orjson.JSONEncodeError, TypeError):
+            pass  # e.g. ints beyond 64 bits: let the stdlib handle it
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys,
+                      default=_default, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj, sort_keys=False):
+    """Serialize `obj` to a compact JSON string."""
+    return dumps_bytes(obj, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps_bytes(). Keys keep their insertion
+    order (no sorting); debug/indent output still uses the stdlib."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get("indent") is not None:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=kwargs.get("sort_keys", self.sort_keys))
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        return self._app.response_class(dumps_bytes(obj, sort_keys=self.sort_keys),
+                                        mimetype=self.mimetype)
+
+
+def to_columnar(rows):
+    """Encode a list of dicts as {"fields": [...], "columns": [[...], ...], "count": n}.
+    Fields are the union of row keys in first-seen order; missing values are None."""
+    fields = {}
+    for row in rows:
+        for key in row:
+            fields.setdefault(key, None)
+    fields = list(fields)
+    return {
+        "fields": fields,
+        "columns": [[row.get(f) for row in rows] for f in fields],
+        "count": len(rows),
+    }
+
+
+def compress_response(response, accept_encodings):
+    """gzip/deflate-encode `response` in place when the client accepts it and
+    the body is large enough. `accept_encodings` is request.accept_encodings."""
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    encoding = accept_encodings.best_match(("gzip", "deflate"))
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    if encoding == "gzip":
+        data = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+    else:
+        data = zlib.compress(data, COMPRESS_LEVEL)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
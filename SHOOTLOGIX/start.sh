@@ -1,2 +1,2 @@
 #!/bin/sh
-exec gunicorn wsgi:app --bind 0.0.0.0:${PORT:-8080} --workers 1 --timeout 120
+exec gunicorn wsgi:app -c gunicorn.conf.py
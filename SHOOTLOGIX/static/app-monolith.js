@@ -678,7 +678,10 @@ const App = (() => {
     _updateTopbarUser();
     _applyUIRestrictions();
     try {
-      await Promise.all([loadShootingDays(), loadBoatsData(), loadPictureBoatsData(), _loadFuelGlobals()]);
+      const mods = await _loadProjectBootstrap(['fuel_prices', 'fuel_locked_prices']);
+      if (mods.fuel_prices && mods.fuel_locked_prices) {
+        _applyFuelGlobals(mods.fuel_prices.data, mods.fuel_locked_prices.data);
+      }
       renderPDT();
       // Load scheduling alerts in background (AXE 7.3)
       loadAlerts();
@@ -769,13 +772,17 @@ const App = (() => {
     _saveOfflineQueue();
     _updateOfflineCounter();
     let succeeded = 0;
-    for (const item of queue) {
-      try {
-        await api(item.method, item.path, item.body);
-        succeeded++;
-      } catch (e) {
-        console.warn('Offline queue replay failed:', e);
+    try {
+      // P6.1: replay the whole queue in one round-trip
+      const res = await api('POST', '/api/batch', {
+        mutations: queue.map((item, i) => ({ id: i, url: item.path, method: item.method, body: item.body }))
+      });
+      for (const r of res.results || []) {
+        if (r.status < 400) succeeded++;
+        else console.warn('Offline queue replay failed:', r.status, queue[r.id].path, r.body);
       }
+    } catch (e) {
+      console.warn('Offline queue replay failed:', e);
     }
     if (succeeded > 0) {
       toast(t('common.offline_synced', { count: succeeded }), 'success');
@@ -883,6 +890,24 @@ const App = (() => {
     return prods[0];
   }
 
+  // First-load bundle: one /bootstrap request instead of one call per module
+  const _BOOTSTRAP_STATE = {
+    shooting_days: 'shootingDays',
+    boats: 'boats', boat_functions: 'functions', boat_assignments: 'assignments',
+    picture_boats: 'pictureBoats', picture_functions: 'pictureFunctions',
+    picture_boat_assignments: 'pictureAssignments',
+  };
+
+  async function _loadProjectBootstrap(extraModules = []) {
+    const modules = [...Object.keys(_BOOTSTRAP_STATE), ...extraModules];
+    const res = await api('GET', `/api/productions/${state.prodId}/bootstrap?modules=${modules.join(',')}`);
+    const mods = res.modules || {};
+    for (const [name, key] of Object.entries(_BOOTSTRAP_STATE)) {
+      state[key] = mods[name] ? mods[name].data : [];
+    }
+    return mods;
+  }
+
   async function loadShootingDays() {
     state.shootingDays = await api('GET', `/api/productions/${state.prodId}/shooting-days`);
   }
@@ -1386,6 +1411,18 @@ const App = (() => {
     }
   }
 
+  // Poll a background PDT parse job until it finishes; returns merge stats
+  async function _pollPdtJob(jobId) {
+    const labels = { queued: 'Queued…', parsing: 'Parsing PDF…', merging: 'Merging days…' };
+    for (;;) {
+      await new Promise(r => setTimeout(r, 700));
+      const job = await api('GET', `/api/productions/${state.prodId}/upload-pdt/jobs/${jobId}`);
+      if (job.status === 'done') return job;
+      if (job.status === 'error') throw new Error(job.error || 'PDF parsing failed');
+      $('pdt-status').textContent = `${labels[job.stage] || 'Processing…'} ${job.progress || 0}%`;
+    }
+  }
+
   async function _doUploadPDT(file) {
     if (_pdtImporting) return;
     _pdtImporting = true;
@@ -1402,7 +1439,8 @@ const App = (() => {
         const _te = typeof translateError === 'function' ? translateError : (s) => s;
         throw new Error(_te(err.error || `HTTP ${res.status}`));
       }
-      const result = await res.json();
+      let result = await res.json();
+      if (res.status === 202) result = await _pollPdtJob(result.job_id);
       await loadShootingDays();
       renderPDT();
       const parts = [];
@@ -5909,20 +5947,24 @@ const App = (() => {
         api('GET', '/api/fuel-prices'),
         api('GET', '/api/fuel-locked-prices'),
       ]);
-      state.fuelPricePerL = { DIESEL: prices.diesel || 0, PETROL: prices.petrol || 0 };
-      state.fuelLockedPrices = locked || {};
-      // Rebuild fuelLockedDays from DB locked prices
-      state.fuelLockedDays = {};
-      for (const d of Object.keys(state.fuelLockedPrices)) {
-        state.fuelLockedDays[d] = true;
-      }
-      // Sync localStorage for offline fallback
-      try { localStorage.setItem('fuel_locked_days', JSON.stringify(state.fuelLockedDays)); } catch(e) {}
-      try { localStorage.setItem('fuel_price_per_l', JSON.stringify(state.fuelPricePerL)); } catch(e) {}
-      _renderFuelPriceBar();
+      _applyFuelGlobals(prices, locked);
     } catch(e) { console.warn('Could not load fuel globals from DB:', e); }
   }
 
+  function _applyFuelGlobals(prices, locked) {
+    state.fuelPricePerL = { DIESEL: prices.diesel || 0, PETROL: prices.petrol || 0 };
+    state.fuelLockedPrices = locked || {};
+    // Rebuild fuelLockedDays from DB locked prices
+    state.fuelLockedDays = {};
+    for (const d of Object.keys(state.fuelLockedPrices)) {
+      state.fuelLockedDays[d] = true;
+    }
+    // Sync localStorage for offline fallback
+    try { localStorage.setItem('fuel_locked_days', JSON.stringify(state.fuelLockedDays)); } catch(e) {}
+    try { localStorage.setItem('fuel_price_per_l', JSON.stringify(state.fuelPricePerL)); } catch(e) {}
+    _renderFuelPriceBar();
+  }
+
   // Render fuel price inputs inside the FUEL tab (not in global topbar)
   function _renderFuelPriceBar() {
     const bar = $('fuel-price-bar');
@@ -9146,13 +9188,16 @@ const App = (() => {
     if (endDate < startDate) { toast('End date must be after start date', 'error'); return; }
     const cur = new Date(startDate + 'T00:00:00');
     const end = new Date(endDate + 'T00:00:00');
+    const changes = [];
     while (cur <= end) {
       const d = cur.toISOString().slice(0, 10);
-      await api('POST', `/api/productions/${state.prodId}/location-schedules`, {
-        location_id: site.id, location_name: site.name, location_type: site.location_type, date: d, status
-      });
+      changes.push({ location_id: site.id, location_name: site.name, location_type: site.location_type, date: d, status });
       cur.setDate(cur.getDate() + 1);
     }
+    // One round-trip for the whole range (guard cells are synced server-side)
+    const result = await api('POST', `/api/productions/${state.prodId}/location-schedules/bulk`, { changes });
+    if (result.skipped && result.skipped.length) toast(`${result.skipped.length} locked day(s) skipped`, 'info');
+    state.guardLocSchedules = null;
     state.locationSchedules = await api('GET', `/api/productions/${state.prodId}/location-schedules`);
     _renderLocationScheduleInModal(site);
     renderLocations();
@@ -9579,11 +9624,17 @@ const App = (() => {
     try {
       const payload = { location_name: locName, date: date, nb_guards: nb };
       if (locId) payload.location_id = locId;
-      await api('POST', `/api/productions/${state.prodId}/guard-schedules/update-guards`, payload);
-      // Update local state
-      const key = `${locName}|${date}`;
-      const existing = state.guardLocSchedules.find(g => g.location_name === locName && g.date === date);
-      if (existing) existing.nb_guards = nb;
+      const result = await api('POST', `/api/productions/${state.prodId}/guard-schedules/bulk`, { changes: [payload] });
+      if (result.skipped && result.skipped.length) {
+        toast(result.skipped[0].reason === 'locked' ? 'This date is locked' : 'No location activity on this date', 'info');
+        return;
+      }
+      // Update local state from the returned diff
+      for (const row of result.upserted || []) {
+        const i = state.guardLocSchedules.findIndex(g => g.location_name === row.location_name && g.date === row.date);
+        if (i >= 0) Object.assign(state.guardLocSchedules[i], row);
+        else state.guardLocSchedules.push(row);
+      }
       renderGuardLocation();
     } catch(e) { toast('Error: ' + e.message, 'error'); }
   }
@@ -911,7 +911,7 @@ const App = (() => {
     _updateTopbarUser();
     _applyUIRestrictions();
     try {
-      await Promise.all([loadShootingDays(), loadBoatsData(), loadPictureBoatsData(), _loadFuelGlobals(), _loadHolidays()]);
+      await Promise.all([_loadProjectBootstrap(), _loadFuelGlobals(), _loadHolidays()]);
       await _preloadModules();
       App.renderPDT?.();
       // Load scheduling alerts in background (AXE 7.3)
@@ -1090,6 +1090,24 @@ const App = (() => {
     return prods[0];
   }
 
+  // First-load bundle: one /bootstrap request instead of one call per module
+  const _BOOTSTRAP_STATE = {
+    shooting_days: 'shootingDays',
+    boats: 'boats', boat_functions: 'functions', boat_assignments: 'assignments',
+    picture_boats: 'pictureBoats', picture_functions: 'pictureFunctions',
+    picture_boat_assignments: 'pictureAssignments',
+  };
+
+  async function _loadProjectBootstrap(extraModules = []) {
+    const modules = [...Object.keys(_BOOTSTRAP_STATE), ...extraModules];
+    const res = await api('GET', `/api/productions/${state.prodId}/bootstrap?modules=${modules.join(',')}`);
+    const mods = res.modules || {};
+    for (const [name, key] of Object.entries(_BOOTSTRAP_STATE)) {
+      state[key] = mods[name] ? mods[name].data : [];
+    }
+    return mods;
+  }
+
   async function loadShootingDays() {
     state.shootingDays = await api('GET', `/api/productions/${state.prodId}/shooting-days`);
   }
@@ -2143,6 +2161,19 @@ const App = (() => {
     } catch(e) { toast('Refresh failed: ' + e.message, 'error'); }
   }
 
+  // Live updates (SSE stream, see modules/notifications.js): refetch the open
+  // tab after changes by other users, unless the user is typing or in a modal.
+  let _liveReloadTimer = null;
+  window.addEventListener('shootlogix:change', () => {
+    clearTimeout(_liveReloadTimer);
+    _liveReloadTimer = setTimeout(() => {
+      const el = document.activeElement;
+      if (el && /^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName)) return;
+      if (document.querySelector('.modal-overlay:not(.hidden)')) return;
+      _reloadCurrentTab();
+    }, 1500);
+  });
+
 
   // ═══════════════════════════════════════════════════════════
   //  TAB SWITCHING WITH LAZY MODULE LOADING — AXE 8.2
@@ -10,6 +10,7 @@
   const DB_VERSION = 1;
   const STORE_PENDING = 'pending_mutations';
   const STORE_CONFLICTS = 'conflicts';
+  const BATCH_SIZE = 500;  // server-side BATCH_MAX_ITEMS
 
   let _db = null;
   let _syncing = false;
@@ -120,17 +121,50 @@
   }
 
   // ── Sync (replay) ───────────────────────────────────────────
-  async function flush() {
-    if (_syncing) return;
-    const pending = await getAllPending();
-    if (pending.length === 0) return;
+  // Replay everything through POST /api/batch: one round-trip per
+  // BATCH_SIZE items. Returns null if the server has no batch endpoint.
+  async function _flushBatched(pending) {
+    const fetchFn = (typeof App !== 'undefined' && App.authFetch) ? App.authFetch : fetch;
+    let succeeded = 0;
+    let conflicts = 0;
 
-    _syncing = true;
-    _updateBanner();
+    for (let i = 0; i < pending.length; i += BATCH_SIZE) {
+      const chunk = pending.slice(i, i + BATCH_SIZE);
+      const res = await fetchFn('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          mutations: chunk.map(item => ({ id: item.id, url: item.url, method: item.method, body: item.body }))
+        })
+      });
+      if (res.status === 404 || res.status === 405) return i === 0 ? null : { succeeded, conflicts };
+      if (!res.ok) {
+        console.warn('[OfflineQueue] Batch replay failed:', res.status);
+        break;
+      }
+      const data = await res.json();
+      const byId = new Map(chunk.map(item => [item.id, item]));
 
-    // Sort by timestamp ascending
-    pending.sort((a, b) => a.timestamp - b.timestamp);
+      for (const r of data.results || []) {
+        const item = byId.get(r.id);
+        if (!item) continue;
+        if (r.status === 409) {
+          // Conflict - store for manual resolution
+          await addConflict(item, r.body);
+          conflicts++;
+        } else if (r.status >= 400) {
+          console.warn('[OfflineQueue] Replay failed:', r.status, item.url);
+        } else {
+          succeeded++;
+        }
+        await removePending(item.id);
+      }
+    }
+    return { succeeded, conflicts };
+  }
 
+  // Fallback: replay one HTTP request per mutation
+  async function _flushOneByOne(pending) {
     let succeeded = 0;
     let conflicts = 0;
 
@@ -171,6 +205,30 @@
       }
     }
 
+    return { succeeded, conflicts };
+  }
+
+  async function flush() {
+    if (_syncing) return;
+    const pending = await getAllPending();
+    if (pending.length === 0) return;
+
+    _syncing = true;
+    _updateBanner();
+
+    // Sort by timestamp ascending
+    pending.sort((a, b) => a.timestamp - b.timestamp);
+
+    let counts = null;
+    try {
+      counts = await _flushBatched(pending);
+    } catch (e) {
+      console.warn('[OfflineQueue] Network error during batch replay:', e);
+      counts = { succeeded: 0, conflicts: 0 };
+    }
+    if (counts === null) counts = await _flushOneByOne(pending);
+    const { succeeded, conflicts } = counts;
+
     _syncing = false;
     _updateBanner();
 
@@ -33,20 +33,24 @@ const { state, authState, $, esc, api, toast, fmtMoney, fmtDate, fmtDateLong,
         api('GET', '/api/fuel-prices'),
         api('GET', '/api/fuel-locked-prices'),
       ]);
-      state.fuelPricePerL = { DIESEL: prices.diesel || 0, PETROL: prices.petrol || 0 };
-      state.fuelLockedPrices = locked || {};
-      // Rebuild fuelLockedDays from DB locked prices
-      state.fuelLockedDays = {};
-      for (const d of Object.keys(state.fuelLockedPrices)) {
-        state.fuelLockedDays[d] = true;
-      }
-      // Sync localStorage for offline fallback
-      try { localStorage.setItem('fuel_locked_days', JSON.stringify(state.fuelLockedDays)); } catch(e) {}
-      try { localStorage.setItem('fuel_price_per_l', JSON.stringify(state.fuelPricePerL)); } catch(e) {}
-      _renderFuelPriceBar();
+      _applyFuelGlobals(prices, locked);
     } catch(e) { console.warn('Could not load fuel globals from DB:', e); }
   }
 
+  function _applyFuelGlobals(prices, locked) {
+    state.fuelPricePerL = { DIESEL: prices.diesel || 0, PETROL: prices.petrol || 0 };
+    state.fuelLockedPrices = locked || {};
+    // Rebuild fuelLockedDays from DB locked prices
+    state.fuelLockedDays = {};
+    for (const d of Object.keys(state.fuelLockedPrices)) {
+      state.fuelLockedDays[d] = true;
+    }
+    // Sync localStorage for offline fallback
+    try { localStorage.setItem('fuel_locked_days', JSON.stringify(state.fuelLockedDays)); } catch(e) {}
+    try { localStorage.setItem('fuel_price_per_l', JSON.stringify(state.fuelPricePerL)); } catch(e) {}
+    _renderFuelPriceBar();
+  }
+
   // Render fuel price inputs inside the FUEL tab (not in global topbar)
   function _fuelLockedPriceSummary() {
     const locked = state.fuelLockedPrices || {};
@@ -429,11 +429,17 @@ const { state, authState, $, esc, api, toast, fmtMoney, fmtDate, fmtDateLong,
     try {
       const payload = { location_name: locName, date: date, nb_guards: nb };
       if (locId) payload.location_id = locId;
-      await api('POST', `/api/productions/${state.prodId}/guard-schedules/update-guards`, payload);
-      // Update local state
-      const key = `${locName}|${date}`;
-      const existing = state.guardLocSchedules.find(g => g.location_name === locName && g.date === date);
-      if (existing) existing.nb_guards = nb;
+      const result = await api('POST', `/api/productions/${state.prodId}/guard-schedules/bulk`, { changes: [payload] });
+      if (result.skipped && result.skipped.length) {
+        toast(result.skipped[0].reason === 'locked' ? 'This date is locked' : 'No location activity on this date', 'info');
+        return;
+      }
+      // Update local state from the returned diff
+      for (const row of result.upserted || []) {
+        const i = state.guardLocSchedules.findIndex(g => g.location_name === row.location_name && g.date === row.date);
+        if (i >= 0) Object.assign(state.guardLocSchedules[i], row);
+        else state.guardLocSchedules.push(row);
+      }
       renderGuardLocation();
     } catch(e) { toast('Error: ' + e.message, 'error'); }
   }
@@ -694,13 +694,16 @@ const { state, authState, $, esc, api, toast, fmtMoney, fmtDate, fmtDateLong,
     if (endDate < startDate) { toast('End date must be after start date', 'error'); return; }
     const cur = new Date(startDate + 'T00:00:00');
     const end = new Date(endDate + 'T00:00:00');
+    const changes = [];
     while (cur <= end) {
       const d = cur.toISOString().slice(0, 10);
-      await api('POST', `/api/productions/${state.prodId}/location-schedules`, {
-        location_id: site.id, location_name: site.name, location_type: site.location_type, date: d, status
-      });
+      changes.push({ location_id: site.id, location_name: site.name, location_type: site.location_type, date: d, status });
       cur.setDate(cur.getDate() + 1);
     }
+    // One round-trip for the whole range (guard cells are synced server-side)
+    const result = await api('POST', `/api/productions/${state.prodId}/location-schedules/bulk`, { changes });
+    if (result.skipped && result.skipped.length) toast(`${result.skipped.length} locked day(s) skipped`, 'info');
+    state.guardLocSchedules = null;
     state.locationSchedules = await api('GET', `/api/productions/${state.prodId}/location-schedules`);
     _renderLocationScheduleInModal(site);
     renderLocations();
@@ -24,13 +24,78 @@ async function pollNotificationCount() {
 }
 
 function startNotifPolling() {
-  if (_pollTimer) clearInterval(_pollTimer);
-  pollNotificationCount();
-  _pollTimer = setInterval(pollNotificationCount, 30000); // every 30s
+  stopNotifPolling();
+  _openEventStream(state.prodId);
 }
 
 function stopNotifPolling() {
   if (_pollTimer) { clearInterval(_pollTimer); _pollTimer = null; }
+  if (_stream) { _stream.abort(); _stream = null; }
+}
+
+function _startCountPolling() {
+  if (_pollTimer) return;
+  pollNotificationCount();
+  _pollTimer = setInterval(pollNotificationCount, 30000); // every 30s
+}
+
+// ── Live events (SSE) ───────────────────────────────────
+// Read with fetch() rather than EventSource so the Authorization header is
+// sent. Falls back to count polling when the stream is unavailable.
+
+let _stream = null;
+let _lastEventId = null;
+
+async function _openEventStream(prodId) {
+  if (!prodId || !window.ReadableStream) { _startCountPolling(); return; }
+  const ctrl = new AbortController();
+  _stream = ctrl;
+  try {
+    const headers = _lastEventId ? { 'Last-Event-ID': String(_lastEventId) } : {};
+    const res = await authFetch(`/api/productions/${prodId}/events`, { headers, signal: ctrl.signal });
+    if (!res.ok || !res.body) throw new Error('stream unavailable');
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buf = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buf += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = buf.indexOf('\n\n')) >= 0) {
+        _handleStreamBlock(buf.slice(0, sep));
+        buf = buf.slice(sep + 2);
+      }
+    }
+  } catch (e) {
+    if (ctrl.signal.aborted) return;
+    if (_stream === ctrl) { _stream = null; _startCountPolling(); }
+    return;
+  }
+  // Server closed the stream (max duration): reconnect and replay from the last id
+  if (_stream === ctrl && state.prodId === prodId) setTimeout(() => _openEventStream(prodId), 1000);
+}
+
+function _handleStreamBlock(block) {
+  let event = 'message', data = '', id = null;
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    else if (line.startsWith('data: ')) data += line.slice(6);
+    else if (line.startsWith('id: ')) id = parseInt(line.slice(4), 10);
+  }
+  if (id) _lastEventId = id;
+  if (!data) return;
+  let payload;
+  try { payload = JSON.parse(data); } catch { return; }
+  if (event === 'notifications' || event === 'notification') {
+    _unreadCount = payload.unread || 0;
+    _updateBadge();
+    if (event === 'notification' && _notifPanelOpen) _loadNotifications();
+  } else if (event === 'change' || event === 'resync') {
+    // Other modules listen for this to refetch their collections (ETag-cheap)
+    if (event === 'change' && payload.user_id === authState.user?.id) return;
+    window.dispatchEvent(new CustomEvent('shootlogix:change', { detail: { event, ...payload } }));
+  }
 }
 
 function _updateBadge() {
@@ -415,6 +415,18 @@ const { state, authState, $, esc, api, toast, fmtMoney, fmtDate, fmtDateLong,
     }
   }
 
+  // Poll a background PDT parse job until it finishes; returns merge stats
+  async function _pollPdtJob(jobId) {
+    const labels = { queued: 'Queued…', parsing: 'Parsing PDF…', merging: 'Merging days…' };
+    for (;;) {
+      await new Promise(r => setTimeout(r, 700));
+      const job = await api('GET', `/api/productions/${state.prodId}/upload-pdt/jobs/${jobId}`);
+      if (job.status === 'done') return job;
+      if (job.status === 'error') throw new Error(job.error || 'PDF parsing failed');
+      $('pdt-status').textContent = `${labels[job.stage] || 'Processing…'} ${job.progress || 0}%`;
+    }
+  }
+
   async function _doUploadPDT(file) {
     if (_pdtImporting) return;
     _pdtImporting = true;
@@ -430,7 +442,8 @@ const { state, authState, $, esc, api, toast, fmtMoney, fmtDate, fmtDateLong,
         const err = await res.json().catch(() => ({ error: res.statusText }));
         throw new Error(err.error || `HTTP ${res.status}`);
       }
-      const result = await res.json();
+      let result = await res.json();
+      if (res.status === 202) result = await _pollPdtJob(result.job_id);
       await loadShootingDays();
       renderPDT();
       const parts = [];
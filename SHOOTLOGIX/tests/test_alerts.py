@@ -0,0 +1,48 @@
+"""Conflict alerts tests — stored alerts follow schedule edits."""
+
+
+def test_boat_on_off_day_alert_follows_edits(client, auth_headers, prod_id):
+    """An assignment over an Off day raises an alert; moving it off clears it."""
+    import database as db
+
+    def on_off(alerts):
+        return [(a["date"], a["entity"], a["function"]) for a in alerts
+                if a["type"] == "boat_on_off" and a["date"] == "2031-03-05"]
+
+    day_id = db.create_shooting_day({"production_id": prod_id, "date": "2031-03-05",
+                                     "day_number": 1})
+    db.create_event({"shooting_day_id": day_id, "event_type": "off", "name": "Rest"})
+    func_id = db.create_boat_function({"production_id": prod_id, "name": "Alert Safety",
+                                       "context": "boats"})
+    boat_id = db.create_boat({"production_id": prod_id, "name": "Alert Panga", "capacity": "6"})
+    asg_id = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                        "start_date": "2031-03-01", "end_date": "2031-03-10"})
+
+    resp = client.get(f"/api/productions/{prod_id}/alerts", headers=auth_headers)
+    assert resp.status_code == 200
+    assert on_off(resp.get_json()["alerts"]) == [("2031-03-05", "Alert Panga", "Alert Safety")]
+
+    # Hinted update: only the touched dates are re-evaluated
+    db.update_boat_assignment(asg_id, {"end_date": "2031-03-04"})
+    assert on_off(db.get_alerts(prod_id)) == []
+
+    # A day override puts the boat back on the Off day
+    db.update_boat_assignment(asg_id, {"day_overrides": '{"2031-03-05": "on"}'})
+    assert len(on_off(db.get_alerts(prod_id))) == 1
+
+    db.delete_boat_assignment(asg_id)
+    db.delete_shooting_day(day_id)
+    assert on_off(db.get_alerts(prod_id)) == []
+
+
+def test_alert_refreshes_lock_per_production(prod_id):
+    """A refresh running for one production does not hold up another's."""
+    import threading
+    import database as db
+    other = db.create_production({"name": "Alert Lock Prod"})
+    db.refresh_alerts(other)
+    with db._production_alert_locks[other]:
+        worker = threading.Thread(target=db.refresh_alerts, args=(prod_id,))
+        worker.start()
+        worker.join(5)
+        assert not worker.is_alive()
@@ -0,0 +1,26 @@
+"""Batched mutation replay tests (offline queue)."""
+
+
+def test_batch_replay_statuses(client, auth_headers, prod_id):
+    """Items run in order with per-item status; conflicts return 409 details."""
+    resp = client.post(f"/api/productions/{prod_id}/boats",
+                       json={"name": "Batch Boat"}, headers=auth_headers)
+    boat = resp.get_json()
+
+    resp = client.post("/api/batch", headers=auth_headers, json={"mutations": [
+        {"id": 1, "url": f"/api/boats/{boat['id']}", "method": "PUT",
+         "body": {"name": "Batch Boat 2", "version": boat["version"]}},
+        {"id": 2, "url": f"/api/boats/{boat['id']}", "method": "PUT",
+         "body": {"name": "Stale Edit", "version": boat["version"]}},
+        {"id": 3, "url": f"/api/productions/{prod_id}/boats", "method": "POST",
+         "body": {"name": ""}},
+        {"id": 4, "url": "/api/batch", "method": "POST", "body": {}},
+    ]})
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [(r["id"], r["status"]) for r in results] == [(1, 200), (2, 409), (3, 400), (4, 400)]
+    assert "modified by another user" in results[1]["body"]["error"]
+
+    boats = client.get(f"/api/productions/{prod_id}/boats", headers=auth_headers).get_json()
+    assert [b["name"] for b in boats if b["id"] == boat["id"]] == ["Batch Boat 2"]
+    client.delete(f"/api/boats/{boat['id']}", headers=auth_headers)
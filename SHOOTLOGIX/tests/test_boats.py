@@ -68,3 +68,150 @@ def test_boat_assignments(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/assignments", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_boats_etag_skips_handler(client, auth_headers, prod_id, monkeypatch):
+    """A matching data-version ETag answers 304 without running the query."""
+    import app as app_module
+    from database import create_production
+
+    other = create_production({"name": "ETag Other"})
+    url = f"/api/productions/{prod_id}/boats"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("handler should not run")
+    monkeypatch.setattr(app_module, "get_boats", _fail)
+    cond = dict(auth_headers, **{"If-None-Match": etag})
+    assert client.get(url, headers=cond).status_code == 304
+
+    # A write in another production leaves this one's version alone
+    client.post(f"/api/productions/{other}/boats", json={"name": "Elsewhere"}, headers=auth_headers)
+    assert client.get(url, headers=cond).status_code == 304
+    monkeypatch.undo()
+
+    resp = client.post(url, json={"name": "ETag Boat"}, headers=auth_headers)
+    resp = client.get(url, headers=cond)
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    boat_id = next(b["id"] for b in resp.get_json() if b["name"] == "ETag Boat")
+    client.delete(f"/api/boats/{boat_id}", headers=auth_headers)
+
+
+def test_boat_assignments_projection(client, auth_headers, prod_id):
+    """fields= returns only the requested columns, computed ones included."""
+    boat_id = client.post(f"/api/productions/{prod_id}/boats", json={
+        "name": "Projection Boat", "daily_rate_estimate": 100,
+    }, headers=auth_headers).get_json()["id"]
+    func_id = client.post(f"/api/productions/{prod_id}/boat-functions", json={
+        "name": "Projection Function", "context": "boats",
+    }, headers=auth_headers).get_json()["id"]
+    asg_id = client.post(f"/api/productions/{prod_id}/assignments", json={
+        "boat_id": boat_id, "boat_function_id": func_id,
+        "start_date": "2026-04-01", "end_date": "2026-04-03",
+    }, headers=auth_headers).get_json()["id"]
+
+    resp = client.get(f"/api/productions/{prod_id}/assignments?fields=id,boat_name,amount_estimate",
+                      headers=auth_headers)
+    assert resp.status_code == 200
+    row = next(r for r in resp.get_json() if r["id"] == asg_id)
+    assert row == {"id": asg_id, "boat_name": "Projection Boat", "amount_estimate": 300}
+
+    client.delete(f"/api/assignments/{asg_id}", headers=auth_headers)
+    client.delete(f"/api/boat-functions/{func_id}", headers=auth_headers)
+    client.delete(f"/api/boats/{boat_id}", headers=auth_headers)
+
+
+def test_assignment_conflicts_report_and_batch_check(client, auth_headers, prod_id):
+    """Double-bookings show in the conflict report and fail batch validation."""
+    import database as db
+
+    func_id = db.create_boat_function({"production_id": prod_id, "name": "Overlap Fn",
+                                       "context": "boats"})
+    boat_id = db.create_boat({"production_id": prod_id, "name": "Overlap Boat"})
+    first = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                       "start_date": "2032-01-01", "end_date": "2032-01-10"})
+    second = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                        "start_date": "2032-01-08", "end_date": "2032-01-12"})
+
+    resp = client.get(f"/api/productions/{prod_id}/assignment-conflicts", headers=auth_headers)
+    assert resp.status_code == 200
+    mine = [c for c in resp.get_json()["double_bookings"] if c["entity_id"] == boat_id]
+    assert [(c["from"], c["to"], sorted(a["id"] for a in c["assignments"])) for c in mine] == [
+        ("2032-01-08", "2032-01-10", sorted([first, second]))]
+
+    proposals = [
+        {"table": "boat_assignments", "entity_id": boat_id,
+         "start_date": "2032-01-11", "end_date": "2032-01-20"},
+        {"table": "boat_assignments", "entity_id": boat_id,
+         "start_date": "2032-02-01", "end_date": "2032-02-05"},
+        {"table": "boat_assignments", "entity_id": boat_id,
+         "start_date": "2032-02-05", "end_date": "2032-02-06"},
+    ]
+    assert db.find_assignment_overlaps(prod_id, proposals) == {0: [second], 2: ["row 1"]}
+
+    # Duplicating +3 days would overlap the original
+    resp = client.post(f"/api/assignments/boat/{first}/duplicate", json={"offset_days": 3},
+                       headers=auth_headers)
+    assert resp.status_code == 422
+
+    db.delete_boat_assignment(first)
+    db.delete_boat_assignment(second)
+
+
+def test_bulk_duplicate_assignments(client, auth_headers, prod_id):
+    """A function's assignments are copied with shifted dates and day overrides;
+    any overlapping copy rejects the whole batch."""
+    import database as db
+
+    func_id = db.create_boat_function({"production_id": prod_id, "name": "Bulk Dup Fn",
+                                       "context": "boats"})
+    boats = [db.create_boat({"production_id": prod_id, "name": f"Bulk Dup {i}"}) for i in (1, 2)]
+    for boat_id in boats:
+        db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                   "start_date": "2033-03-01", "end_date": "2033-03-05",
+                                   "day_overrides": '{"2033-03-02": "off"}'})
+
+    url = f"/api/productions/{prod_id}/assignments/boat/duplicate"
+    resp = client.post(url, json={"boat_function_id": func_id, "offset_days": 14},
+                       headers=auth_headers)
+    assert resp.status_code == 201
+    copies = resp.get_json()["assignments"]
+    assert sorted(c["boat_id"] for c in copies) == boats
+    assert {(c["start_date"], c["end_date"], c["day_overrides"]) for c in copies} == {
+        ("2033-03-15", "2033-03-19", '{"2033-03-16": "off"}')}
+
+    ids = [c["id"] for c in copies]
+    resp = client.post(url, json={"ids": ids, "offset_days": 2}, headers=auth_headers)
+    assert resp.status_code == 422
+    mine = [a for a in db.get_boat_assignments(prod_id, context="boats")
+            if a["boat_function_id"] == func_id]
+    assert len(mine) == 4
+    for a in mine:
+        db.delete_boat_assignment(a["id"])
+
+
+def test_bulk_duplicate_skips_non_booking_copies(client, auth_headers, prod_id):
+    """Copies of cancelled assignments don't book their entity, so they don't
+    fail the overlap check."""
+    import database as db
+
+    func_id = db.create_boat_function({"production_id": prod_id, "name": "Cancelled Dup Fn",
+                                       "context": "boats"})
+    boat_id = db.create_boat({"production_id": prod_id, "name": "Cancelled Dup"})
+    booked = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                        "start_date": "2034-01-08", "end_date": "2034-01-10",
+                                        "assignment_status": "confirmed"})
+    cancelled = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                           "start_date": "2034-01-01", "end_date": "2034-01-03",
+                                           "assignment_status": "cancelled"})
+
+    url = f"/api/productions/{prod_id}/assignments/boat/duplicate"
+    resp = client.post(url, json={"ids": [cancelled], "offset_days": 7}, headers=auth_headers)
+    assert resp.status_code == 201
+    copy = resp.get_json()["assignments"][0]
+    assert (copy["start_date"], copy["assignment_status"]) == ("2034-01-08", "cancelled")
+
+    resp = client.post(url, json={"ids": [booked], "offset_days": 1}, headers=auth_headers)
+    assert resp.status_code == 422
+    for a in (booked, cancelled, copy["id"]):
+        db.delete_boat_assignment(a)
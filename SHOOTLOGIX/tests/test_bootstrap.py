@@ -0,0 +1,20 @@
+"""Production bootstrap bundle tests."""
+
+
+def test_bootstrap_bundle_and_etags(client, auth_headers, prod_id):
+    """Bundle returns module payloads and leaves out modules with a matching ETag."""
+    url = f"/api/productions/{prod_id}/bootstrap?modules=boats,shooting_days,fuel_prices"
+    resp = client.get(url, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert set(data["modules"]) == {"boats", "shooting_days", "fuel_prices"}
+    boats = client.get(f"/api/productions/{prod_id}/boats", headers=auth_headers).get_json()
+    assert data["modules"]["boats"]["data"] == boats
+
+    etags = ",".join(f"{m}:{v['etag']}" for m, v in data["modules"].items())
+    data = client.get(f"{url}&etags={etags}", headers=auth_headers).get_json()
+    assert data["modules"] == {}
+    assert sorted(data["unchanged"]) == ["boats", "fuel_prices", "shooting_days"]
+
+    resp = client.get(f"/api/productions/{prod_id}/bootstrap?modules=nope", headers=auth_headers)
+    assert resp.status_code == 400
@@ -49,3 +49,46 @@ def test_budget_snapshots_list(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/budget/snapshots", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_daily_cost_series_refreshes_only_changed_departments(client, auth_headers, prod_id):
+    """Daily budget reads a persisted series; only departments with writes in
+    this production are recomputed."""
+    from database import get_db, refresh_daily_cost_series, create_production
+    from db_compat import set_write_scope
+
+    client.get(f"/api/productions/{prod_id}/budget/daily", headers=auth_headers)
+    assert refresh_daily_cost_series(prod_id) == []
+
+    other = create_production({"name": "Other Daily Series"})
+    set_write_scope(other)
+    try:
+        with get_db() as conn:
+            conn.execute("UPDATE locations SET price_p=price_p WHERE production_id=?", (other,))
+    finally:
+        set_write_scope(None)
+    assert refresh_daily_cost_series(prod_id) == []
+
+    with get_db() as conn:
+        conn.execute("UPDATE locations SET price_p=price_p WHERE production_id=?", (prod_id,))
+    assert refresh_daily_cost_series(prod_id) == ["locations"]
+
+
+def test_budget_snapshots_delta_roundtrip(client, auth_headers, prod_id):
+    """Delta snapshots expand to the live budget, compare, and survive base deletion."""
+    base = f"/api/productions/{prod_id}/budget/snapshots"
+    budget = client.get(f"/api/productions/{prod_id}/budget", headers=auth_headers).get_json()
+    snap_a = client.post(base, json={"note": "a"}, headers=auth_headers).get_json()["snapshot_id"]
+    snap_b = client.post(base, json={"note": "b"}, headers=auth_headers).get_json()["snapshot_id"]
+
+    detail = client.get(f"{base}/{snap_b}", headers=auth_headers).get_json()
+    assert detail["snapshot_data"]["rows"] == budget["rows"]
+    assert detail["snapshot_data"]["grand_total_estimate"] == budget["grand_total_estimate"]
+
+    cmp = client.get(f"{base}/compare?a={snap_a}&b={snap_b}", headers=auth_headers).get_json()
+    assert cmp["line_changes"] == []
+    assert cmp["total_diff"] == 0
+
+    assert client.delete(f"{base}/{snap_a}", headers=auth_headers).status_code == 200
+    detail = client.get(f"{base}/{snap_b}", headers=auth_headers).get_json()
+    assert detail["snapshot_data"]["rows"] == budget["rows"]
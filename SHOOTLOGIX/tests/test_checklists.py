@@ -0,0 +1,38 @@
+"""Daily checklist tests — set-based generation keeps checked items."""
+
+
+def test_regenerate_keeps_checked_items(client, auth_headers, prod_id):
+    """Regenerating diffs items; a week is generated in one call."""
+    import database as db
+
+    func_id = db.create_boat_function({"production_id": prod_id, "name": "Checklist Fn",
+                                       "context": "boats"})
+    boat_id = db.create_boat({"production_id": prod_id, "name": "Checklist Boat"})
+    asg_id = db.create_boat_assignment({"boat_function_id": func_id, "boat_id": boat_id,
+                                        "start_date": "2033-06-01", "end_date": "2033-06-05"})
+    text = "Boat Checklist Boat confirmed for Checklist Fn"
+
+    resp = client.post(f"/api/productions/{prod_id}/checklists/generate",
+                       json={"date": "2033-06-02"}, headers=auth_headers)
+    assert resp.status_code == 201
+    item = next(i for i in resp.get_json()["items"] if i["item_text"] == text)
+    db.check_checklist_item(item["id"], True, 1)
+
+    again = db.generate_daily_checklist(prod_id, "2033-06-02")
+    kept = [i for i in again["items"] if i["item_text"] == text]
+    assert [(i["id"], i["checked"]) for i in kept] == [(item["id"], 1)]
+
+    # An "off" day override drops the item for that date only
+    db.update_boat_assignment(asg_id, {"day_overrides": '{"2033-06-03": "off"}'})
+    resp = client.post(f"/api/productions/{prod_id}/checklists/generate",
+                       json={"date": "2033-06-01", "days": 7}, headers=auth_headers)
+    assert resp.status_code == 201
+    week = resp.get_json()["checklists"]
+    assert [c["date"] for c in week][:2] == ["2033-06-01", "2033-06-02"]
+    has_boat = [any(i["item_text"] == text for i in c["items"]) for c in week]
+    assert has_boat == [True, True, False, True, True, False, False]
+
+    resp = client.post(f"/api/productions/{prod_id}/checklists/generate",
+                       json={"date": "2033-06-01", "days": 400}, headers=auth_headers)
+    assert resp.status_code == 422
+    db.delete_boat_assignment(asg_id)
@@ -0,0 +1,35 @@
+"""Dashboard tests — shared aggregate across dashboard endpoints."""
+
+
+def test_dashboard_endpoints(client, auth_headers, prod_id):
+    """All dashboard endpoints answer from the same aggregate."""
+    base = f"/api/productions/{prod_id}/dashboard"
+    for suffix in ("", "/kpis", "/alerts", "/burnrate"):
+        resp = client.get(base + suffix, headers=auth_headers)
+        assert resp.status_code == 200, suffix
+
+
+def test_dashboard_aggregate_cached_per_data_version(client, auth_headers, prod_id):
+    """The aggregate is reused until a write to this production bumps its
+    version; writes scoped to another production keep it."""
+    import app as app_module
+    from database import create_production, get_db
+    from db_compat import set_write_scope
+
+    other = create_production({"name": "Other Dashboard"})
+    client.get(f"/api/productions/{prod_id}/dashboard/kpis", headers=auth_headers)
+    first = app_module._get_dashboard_aggregate(prod_id)
+    client.get(f"/api/productions/{prod_id}/dashboard/alerts", headers=auth_headers)
+    assert app_module._get_dashboard_aggregate(prod_id) is first
+
+    set_write_scope(other)
+    try:
+        with get_db() as conn:
+            conn.execute("UPDATE productions SET name=name WHERE id=?", (other,))
+    finally:
+        set_write_scope(None)
+    assert app_module._get_dashboard_aggregate(prod_id) is first
+
+    with get_db() as conn:
+        conn.execute("UPDATE productions SET name=name WHERE id=?", (prod_id,))
+    assert app_module._get_dashboard_aggregate(prod_id) is not first
@@ -0,0 +1,86 @@
+"""Live event stream (SSE) tests."""
+import json
+
+
+def _next_event(chunks):
+    """Return (event, data) of the next non-heartbeat SSE block."""
+    for chunk in chunks:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(": ", 1) for line in text.strip().split("\n") if ": " in line)
+        if "event" in fields:
+            return fields["event"], json.loads(fields["data"])
+    raise AssertionError("stream ended")
+
+
+def test_event_stream_pushes_changes_and_notifications(client, auth_headers, prod_id, monkeypatch):
+    import app as app_module
+    import events
+    from database import create_notification, get_db, _log_history
+    monkeypatch.setattr(app_module, "SSE_HEARTBEAT_SECONDS", 1)
+    monkeypatch.setattr(app_module, "SSE_MAX_SECONDS", 10)
+    user_id = client.get("/api/auth/me", headers=auth_headers).get_json()["id"]
+
+    resp = client.get(f"/api/productions/{prod_id}/events", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    chunks = iter(resp.response)
+    event, data = _next_event(chunks)
+    assert event == "notifications" and "unread" in data
+    unread = data["unread"]
+
+    with get_db() as conn:
+        _log_history(conn, "boats", 4242, "update", production_id=prod_id)
+    event, data = _next_event(chunks)
+    assert event == "change"
+    assert (data["table"], data["record_id"], data["action"]) == ("boats", 4242, "update")
+
+    create_notification(prod_id, user_id, "comment_added", "SSE ping")
+    event, data = _next_event(chunks)
+    assert event == "notification"
+    assert data["title"] == "SSE ping" and data["unread"] == unread + 1
+
+    resp.close()
+    assert not events.is_subscribed(prod_id, user_id)
+
+
+def test_assignment_changes_stay_in_their_production(client, prod_id):
+    """Assignment rows carry no production_id: their change events go to the
+    function's production only."""
+    import database as db
+    import events
+    other = db.create_production({"name": "Other Stream Prod"})
+    sub = events.subscribe(prod_id, None)
+    try:
+        func_id = db.create_boat_function({"production_id": other, "name": "Elsewhere",
+                                           "context": "boats"})
+        db.create_boat_assignment({"boat_function_id": func_id, "start_date": "2034-01-01",
+                                   "end_date": "2034-01-02"})
+        assert sub.get(0.1) is None
+
+        own_func = db.create_boat_function({"production_id": prod_id, "name": "Here",
+                                            "context": "boats"})
+        sub.get(0.1)
+        asg_id = db.create_boat_assignment({"boat_function_id": own_func,
+                                            "start_date": "2034-01-01", "end_date": "2034-01-02"})
+        _, event, data = sub.get(1)
+        assert event == "change" and (data["table"], data["record_id"]) == ("boat_assignments", asg_id)
+        db.delete_boat_assignment(asg_id)
+    finally:
+        events.unsubscribe(sub)
+
+
+def test_event_streams_are_capped(client, auth_headers, prod_id, monkeypatch):
+    """Past SSE_MAX_STREAMS open streams, new ones get a 503 (clients poll)."""
+    import events
+    monkeypatch.setattr(events, "MAX_STREAMS", 1)
+    url = f"/api/productions/{prod_id}/events"
+
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200
+    resp = client.get(url, headers=auth_headers)
+    assert resp.status_code == 503 and "Retry-After" in resp.headers
+
+    first.close()
+    second = client.get(url, headers=auth_headers)
+    assert second.status_code == 200
+    second.close()
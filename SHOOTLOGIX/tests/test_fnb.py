@@ -26,3 +26,34 @@ def test_fnb_budget(client, auth_headers, prod_id):
     assert resp.status_code == 200
     data = resp.get_json()
     assert "categories" in data
+
+
+def test_fnb_budget_totals_and_series(client, auth_headers):
+    """Totals are priced per item, deleted items are left out, ?by_date adds a series."""
+    import database as db
+    prod = db.create_production({"name": "FNB Totals"})
+    drinks = db.create_fnb_category({"production_id": prod, "name": "Drinks"})
+    db.create_fnb_category({"production_id": prod, "name": "Empty", "sort_order": 1})
+    water = db.create_fnb_item({"category_id": drinks["id"], "production_id": prod,
+                                "name": "Water", "unit_price": 2})
+    soda = db.create_fnb_item({"category_id": drinks["id"], "production_id": prod,
+                               "name": "Soda", "unit_price": 5})
+    for item, kind, day, qty in [(water, "purchase", "2026-05-01", 10),
+                                 (water, "consumption", "2026-05-01", 4),
+                                 (water, "consumption", "2026-05-02", 3),
+                                 (soda, "purchase", "2026-05-02", 100)]:
+        db.upsert_fnb_entry({"item_id": item["id"], "production_id": prod,
+                             "entry_type": kind, "date": day, "quantity": qty})
+    db.delete_fnb_item(soda["id"])
+
+    url = f"/api/productions/{prod}/fnb-budget"
+    data = client.get(url, headers=auth_headers).get_json()
+    assert [(c["name"], c["purchase_total"], c["consumption_total"])
+            for c in data["categories"]] == [("Drinks", 20, 14), ("Empty", 0, 0)]
+    assert (data["grand_purchase"], data["grand_consumption"], data["balance"]) == (20, 14, 6)
+    assert "by_date" not in data
+
+    data = client.get(f"{url}?by_date=1&from=2026-05-02", headers=auth_headers).get_json()
+    assert data["grand_consumption"] == 6
+    assert data["by_date"] == {"2026-05-02": {"purchase": 0, "consumption": 6}}
+    assert client.get(f"{url}?to=tomorrow", headers=auth_headers).status_code == 422
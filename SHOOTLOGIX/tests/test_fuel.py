@@ -1,4 +1,25 @@
 """Fuel module tests."""
+import pytest
+
+
+@pytest.fixture
+def fuel_prices():
+    """Restore the global fuel prices and drop locked days added by the test."""
+    import database as db
+    keys = ("fuel_price_diesel", "fuel_price_petrol")
+    saved = {k: db.get_setting(k) for k in keys}
+    locked = set(db.get_fuel_locked_prices())
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                with db.get_db() as conn:
+                    conn.execute("DELETE FROM settings WHERE key=?", (key,))
+            else:
+                db.set_setting(key, value)
+        for day in set(db.get_fuel_locked_prices()) - locked:
+            db.delete_fuel_locked_price(day)
 
 
 def test_list_fuel_entries(client, auth_headers, prod_id):
@@ -13,3 +34,90 @@ def test_fuel_machinery(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/fuel-machinery", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_fuel_entries_fields_sort_and_pages(client, auth_headers):
+    """fields/sort/limit/cursor are applied to the fuel entries collection."""
+    from database import create_production, upsert_fuel_entry
+    prod = create_production({"name": "Collection Paging"})
+    for i, day in enumerate(["2026-05-01", "2026-05-03", "2026-05-02"]):
+        upsert_fuel_entry({"production_id": prod, "source_type": "boats",
+                           "assignment_id": 1, "date": day, "liters": 10 + i})
+    url = f"/api/productions/{prod}/fuel-entries"
+
+    resp = client.get(f"{url}?fields=date,liters&sort=-date&limit=2", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.get_json() == [{"date": "2026-05-03", "liters": 11},
+                               {"date": "2026-05-02", "liters": 12}]
+    cursor = resp.headers["X-Next-Cursor"]
+
+    resp = client.get(f"{url}?fields=date,liters&sort=-date&limit=2&cursor={cursor}",
+                      headers=auth_headers)
+    assert resp.get_json() == [{"date": "2026-05-01", "liters": 10}]
+    assert "X-Next-Cursor" not in resp.headers
+
+    resp = client.get(f"{url}?fields=date,nope&sort=password", headers=auth_headers)
+    assert resp.status_code == 422
+    assert set(resp.get_json()["fields"]) == {"fields", "sort"}
+
+
+def test_fuel_overview_pivot(client, auth_headers):
+    """Liters are summed per source/date/fuel type, names come from joins."""
+    import database as db
+    prod = db.create_production({"name": "Fuel Pivot"})
+    func_id = db.create_boat_function({"production_id": prod, "name": "PB Fn",
+                                       "context": "picture"})
+    pb_id = db.create_picture_boat({"production_id": prod, "name": "Hero Boat"})
+    asg_id = db.create_picture_boat_assignment({"boat_function_id": func_id,
+                                                "picture_boat_id": pb_id,
+                                                "start_date": "2026-05-01",
+                                                "end_date": "2026-05-05"})
+    mach_id = db.create_fuel_machinery({"production_id": prod, "name": "Generator"})
+    for source, sid, day, liters, fuel in [
+            ("picture_boats", asg_id, "2026-05-01", 10, "DIESEL"),
+            ("picture_boats", asg_id, "2026-05-01", 5, "PETROL"),
+            ("picture_boats", asg_id, "2026-05-02", 7, None),
+            ("machinery", mach_id, "2026-05-02", 3, "DIESEL")]:
+        db.upsert_fuel_entry({"production_id": prod, "source_type": source, "assignment_id": sid,
+                              "date": day, "liters": liters, "fuel_type": fuel})
+
+    url = f"/api/productions/{prod}/fuel/overview"
+    data = client.get(url, headers=auth_headers).get_json()
+    assert data["dates"] == ["2026-05-01", "2026-05-02"]
+    assert data["daily_totals"] == {"2026-05-01": 15, "2026-05-02": 10}
+    assert data["grand_total"] == 25
+    pb = next(s for s in data["sources"] if s["source_type"] == "picture_boats")
+    assert (pb["name"], pb["category"], pb["by_date"], pb["diesel"], pb["petrol"]) == (
+        "Hero Boat", "PB", {"2026-05-01": 15, "2026-05-02": 7}, 17, 5)
+
+    window = client.get(f"{url}?from=2026-05-02&to=2026-05-02", headers=auth_headers).get_json()
+    assert window["dates"] == ["2026-05-02"] and window["grand_total"] == 10
+    assert client.get(f"{url}?from=May", headers=auth_headers).status_code == 422
+
+
+def test_fuel_costs_use_locked_then_current_prices(client, auth_headers, fuel_prices):
+    """Locked days are priced from their snapshot, other days at current prices."""
+    import database as db
+    prod = db.create_production({"name": "Fuel Costs"})
+    db.set_setting("fuel_price_diesel", "2")
+    db.set_setting("fuel_price_petrol", "3")
+    db.set_fuel_locked_price("2031-06-01", 1.5, 2.5)
+    for day, liters, fuel in [("2031-06-01", 10, "DIESEL"), ("2031-06-01", 4, "PETROL"),
+                              ("2031-06-02", 10, None), ("2031-06-02", 2, "PETROL")]:
+        db.upsert_fuel_entry({"production_id": prod, "source_type": "machinery",
+                              "assignment_id": 1, "date": day, "liters": liters,
+                              "fuel_type": fuel})
+
+    costs = db.get_fuel_costs(prod)
+    assert costs["by_date"] == {"2031-06-01": 25, "2031-06-02": 26}
+    totals = costs["totals"]
+    assert (totals["cost_up_to_date"], totals["cost_estimate"]) == (25, 26)
+    assert (totals["diesel_liters"], totals["petrol_liters"], totals["entries"]) == (20, 6, 4)
+
+    db.set_setting("fuel_price_diesel", "4")
+    assert db.get_fuel_costs(prod)["by_date"]["2031-06-02"] == 46
+
+    budget = client.get(f"/api/productions/{prod}/budget", headers=auth_headers).get_json()
+    fuel = [r for r in budget["rows"] if r["department"] == "FUEL"]
+    assert [(r["name"], r["amount_estimate"], r["amount_actual"]) for r in fuel] == [
+        ("MACHINERY FUEL", 71, 25)]
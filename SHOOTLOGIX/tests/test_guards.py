@@ -13,3 +13,32 @@ def test_list_guard_schedules(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/guard-schedules", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_sync_guard_schedules_diff():
+    """Guard sync inserts missing cells with phase defaults and drops stale ones."""
+    from database import (create_production, create_guard_post, delete_guard_post,
+                          upsert_location_schedule, delete_location_schedule,
+                          sync_guard_location_from_locations)
+
+    pid = create_production({"name": "Guard Sync Test"})
+    create_guard_post({"production_id": pid, "name": "MOGO MOGO", "guards_film": 5})
+    deleted_post = create_guard_post({"production_id": pid, "name": "CONTADORA", "guards_film": 9})
+    delete_guard_post(deleted_post["id"])
+    for name, date, status in (("MOGO MOGO", "2026-05-01", "P"), ("MOGO MOGO", "2026-05-02", "F"),
+                               ("CONTADORA", "2026-05-02", "F")):
+        upsert_location_schedule({"production_id": pid, "location_name": name,
+                                  "location_type": "game", "date": date, "status": status})
+
+    first = sync_guard_location_from_locations(pid, diff=True)
+    assert {(r["location_name"], r["date"], r["nb_guards"]) for r in first["created"]} == {
+        ("MOGO MOGO", "2026-05-01", 2), ("MOGO MOGO", "2026-05-02", 5),
+        ("CONTADORA", "2026-05-02", 2)}
+    assert first["deleted"] == []
+
+    delete_location_schedule(pid, "MOGO MOGO", "2026-05-01")
+    second = sync_guard_location_from_locations(pid, diff=True)
+    assert second["created"] == []
+    assert [r["date"] for r in second["deleted"]] == ["2026-05-01"]
+    assert sorted(r["date"] for r in sync_guard_location_from_locations(pid)) == [
+        "2026-05-02", "2026-05-02"]
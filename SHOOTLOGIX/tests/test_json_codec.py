@@ -0,0 +1,30 @@
+"""JSON encoding, compression and columnar format tests."""
+import datetime
+import gzip
+
+
+def test_dumps_matches_stdlib(monkeypatch):
+    """orjson and stdlib backends produce the same output."""
+    import json_codec
+
+    data = {"a": 1, 2: "x", "d": datetime.date(2026, 3, 1), "s": "Chápera", "n": None}
+    fast = json_codec.loads(json_codec.dumps(data))
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert json_codec.get_backend() == "json"
+    assert json_codec.loads(json_codec.dumps(data)) == fast
+    assert fast["2"] == "x" and fast["d"].endswith("GMT")
+
+
+def test_gzip_and_columnar(client, auth_headers, prod_id):
+    """Large responses are gzipped on request; ?format=columns returns columns."""
+    url = f"/api/productions/{prod_id}/assignments"
+    plain = client.get(url, headers=auth_headers)
+    resp = client.get(url, headers=dict(auth_headers, **{"Accept-Encoding": "gzip"}))
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.data) == plain.data
+
+    rows = plain.get_json()
+    cols = client.get(f"{url}?format=columns", headers=auth_headers).get_json()
+    assert cols["count"] == len(rows)
+    i = cols["fields"].index("id")
+    assert cols["columns"][i] == [r["id"] for r in rows]
@@ -26,3 +26,69 @@ def test_helper_assignments(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/helper-assignments", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_import_helpers_csv(client, auth_headers, prod_id):
+    """CSV import validates every row; dry_run reports without writing."""
+    import io
+    csv_text = ("name,role,group,rate,notes\n"
+                "Import A,Setup,GENERAL,50,\n"
+                ",Runner,GENERAL,45,\n"
+                "Import B,Runner,,abc,Late\n")
+
+    def upload(query=""):
+        return client.post(f"/api/productions/{prod_id}/helpers/import-csv{query}",
+                           data={"file": (io.BytesIO(csv_text.encode("utf-8-sig")), "crew.csv")},
+                           headers=auth_headers, content_type="multipart/form-data")
+
+    before = len(client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json())
+    resp = upload("?dry_run=1")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["dry_run"] and body["valid_rows"] == 2 and body["created"] == 0
+    assert [e["line"] for e in body["errors"]] == [3, 4]
+    helpers = client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json()
+    assert len(helpers) == before
+
+    resp = upload()
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert body["created"] == 2 and body["total_rows"] == 3
+    helpers = client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json()
+    imported = {h["name"]: h for h in helpers if h["id"] in body["ids"]}
+    assert imported["Import A"]["daily_rate_estimate"] == 50
+    assert imported["Import B"]["daily_rate_estimate"] == 45
+    assert imported["Import B"]["group_name"] == "GENERAL"
+
+    import database as db
+    with db.get_db() as conn:
+        entry = conn.execute("SELECT id FROM history WHERE table_name='helpers' AND action='import' "
+                             "ORDER BY id DESC LIMIT 1").fetchone()
+    db.undo_history_entry(entry["id"])
+    helpers = client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json()
+    assert len(helpers) == before
+
+
+def test_import_helpers_csv_db_error(client, auth_headers, prod_id, monkeypatch):
+    """A row the database rejects fails the import with its line; nothing is written."""
+    import io
+    import app as app_module
+    from database import get_db
+    monkeypatch.setattr(app_module, "CSV_IMPORT_BATCH", 2)
+    with get_db() as conn:
+        conn.execute("""CREATE TRIGGER reject_bad_helper BEFORE INSERT ON helpers
+                        WHEN NEW.name = 'Bad Row'
+                        BEGIN SELECT RAISE(ABORT, 'constraint failed'); END""")
+    try:
+        before = len(client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json())
+        csv_text = "name,role\nGood Row,Setup\nNext Row,Setup\nBad Row,Setup\nLast Row,Setup\n"
+        resp = client.post(f"/api/productions/{prod_id}/helpers/import-csv",
+                           data={"file": (io.BytesIO(csv_text.encode()), "crew.csv")},
+                           headers=auth_headers, content_type="multipart/form-data")
+        assert resp.status_code == 422
+        assert resp.get_json()["errors"] == [{"line": 4, "errors": ["constraint failed"]}]
+        helpers = client.get(f"/api/productions/{prod_id}/helpers", headers=auth_headers).get_json()
+        assert len(helpers) == before
+    finally:
+        with get_db() as conn:
+            conn.execute("DROP TRIGGER reject_bad_helper")
@@ -13,3 +13,116 @@ def test_list_location_schedules(client, auth_headers, prod_id):
     resp = client.get(f"/api/productions/{prod_id}/location-schedules", headers=auth_headers)
     assert resp.status_code == 200
     assert isinstance(resp.get_json(), list)
+
+
+def test_location_matcher_lookups():
+    """Matcher resolves exact, normalized, alias and two-way substring names."""
+    from database import LocationMatcher
+
+    m = LocationMatcher([
+        {"id": 1, "name": "MOGO MOGO", "location_type": "game"},
+        {"id": 2, "name": "ARENA (SABOGA)", "location_type": "game"},
+        {"id": 3, "name": "Isla Chápera", "location_type": "tribal_camp"},
+    ])
+    assert m.exact("mogo mogo")["id"] == 1
+    assert m.normalized("  isla   chapera ")["id"] == 3
+    assert m.alias("Saboga")["id"] == 2
+    assert m.resolve("PLAGE MOGO MOGO NORD") == (m.sites[0], "substring")
+    assert m.resolve("chap")[0]["id"] == 3
+    assert m.resolve("CONTADORA") == (None, None)
+    assert [s["id"] for s in m.substring("ARENA BEACH", include_aliases=True)] == [2]
+    assert m.substring("ARENA BEACH") == []
+
+
+def test_resync_pdt_locations_bulk():
+    """Full resync fills F cells, keeps locked cells and drops stale F cells."""
+    from database import (create_production, create_shooting_day, get_location_schedules,
+                          upsert_location_schedule, lock_location_schedules,
+                          resync_pdt_locations)
+
+    pid = create_production({"name": "Resync Test"})
+    create_shooting_day({"production_id": pid, "date": "2026-05-01", "day_number": 1,
+                         "location": "MOGO MOGO"})
+    create_shooting_day({"production_id": pid, "date": "2026-05-02", "day_number": 2,
+                         "location": "CONTADORA"})
+    upsert_location_schedule({"production_id": pid, "location_name": "OLD SPOT",
+                              "location_type": "game", "date": "2026-05-01", "status": "F"})
+    upsert_location_schedule({"production_id": pid, "location_name": "CONTADORA",
+                              "location_type": "game", "date": "2026-05-02", "status": "P"})
+    lock_location_schedules(pid, ["2026-05-02"], True)
+
+    log = resync_pdt_locations(pid)
+    assert sorted(log["created"]) == ["CONTADORA", "MOGO MOGO"]
+
+    cells = {(r["location_name"], r["date"]): r["status"] for r in get_location_schedules(pid)}
+    assert cells == {("MOGO MOGO", "2026-05-01"): "F", ("CONTADORA", "2026-05-02"): "P"}
+    assert resync_pdt_locations(pid)["created"] == []
+
+
+def test_bulk_location_cell_changes(client, auth_headers):
+    """Bulk endpoint applies upserts, deletes and locks at once and syncs guards."""
+    from database import create_production
+
+    pid = create_production({"name": "Bulk Cells Test"})
+    url = f"/api/productions/{pid}/location-schedules/bulk"
+    changes = [{"location_name": "MOGO MOGO", "location_type": "game",
+                "date": f"2026-06-0{d}", "status": "F"} for d in range(1, 5)]
+    resp = client.post(url, json={"changes": changes}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert len(data["upserted"]) == 4
+    assert len(data["guard"]["created"]) == 4
+
+    resp = client.post(url, headers=auth_headers, json={"changes": [
+        {"op": "lock", "date": "2026-06-01"},
+        {"location_name": "MOGO MOGO", "date": "2026-06-01", "status": "W"},
+        {"op": "delete", "location_name": "MOGO MOGO", "date": "2026-06-02"},
+        {"location_name": "MOGO MOGO", "date": "2026-06-03", "status": "P"},
+    ]})
+    data = resp.get_json()
+    assert data["skipped"] == [{"index": 1, "reason": "locked"}]
+    assert [r["date"] for r in data["deleted"]] == ["2026-06-02"]
+    assert {(r["date"], r["status"], r["locked"]) for r in data["upserted"]} == {
+        ("2026-06-01", "F", 1), ("2026-06-03", "P", 0)}
+    assert [r["date"] for r in data["guard"]["deleted"]] == ["2026-06-02"]
+
+    resp = client.post(url, json={"changes": [{"date": "2026-06-01", "status": "X"}]},
+                       headers=auth_headers)
+    assert resp.status_code == 422
+    assert set(resp.get_json()["fields"]) == {"changes[0].location_name", "changes[0].status"}
+
+
+def test_location_matcher_sees_uncommitted_sites_in_shared_transaction(prod_id):
+    """Inside a shared transaction the cached matcher is bypassed, so a site
+    created earlier in the same transaction resolves."""
+    from database import get_location_matcher
+    from db_compat import shared_transaction
+
+    get_location_matcher(prod_id)  # prime the cache
+    with shared_transaction() as conn:
+        conn.execute("INSERT INTO locations (production_id, name, location_type) VALUES (?,?,?)",
+                     (prod_id, "Batch Isle", "game"))
+        site, _ = get_location_matcher(prod_id).resolve("Batch Isle")
+        assert site and site["name"] == "Batch Isle"
+        conn.execute("DELETE FROM locations WHERE production_id=? AND name=?",
+                     (prod_id, "Batch Isle"))
+
+
+def test_pdt_sync_does_not_mutate_the_cached_matcher(prod_id):
+    """Sites auto-created by a PDT sync go into a private matcher copy: a
+    matcher other threads got from the cache never sees uncommitted sites."""
+    from database import get_db, get_location_matcher, sync_pdt_day_to_locations
+
+    cached = get_location_matcher(prod_id)
+    try:
+        log = sync_pdt_day_to_locations(prod_id, "2031-03-01", ["Private Cove"])
+        assert log["created"] == ["Private Cove"]
+        assert cached.resolve("Private Cove") == (None, None)
+        site, _ = get_location_matcher(prod_id).resolve("Private Cove")
+        assert site and site["name"] == "Private Cove"
+    finally:
+        with get_db() as conn:
+            conn.execute("DELETE FROM location_schedules WHERE production_id=? AND date=?",
+                         (prod_id, "2031-03-01"))
+            conn.execute("DELETE FROM locations WHERE production_id=? AND name=?",
+                         (prod_id, "Private Cove"))
@@ -0,0 +1,72 @@
+"""Notification tests — fan-out, unread counters and retention."""
+
+
+def test_fan_out_counters_and_prune(client, auth_headers, prod_id):
+    """Counters follow fan-out, mark-read and pruning; the badge reads them."""
+    import database as db
+
+    with db.get_db() as conn:
+        members = [r["user_id"] for r in conn.execute(
+            "SELECT user_id FROM project_memberships WHERE production_id=?", (prod_id,)
+        ).fetchall()]
+    admin = 1
+    assert admin in members and len(members) > 1
+
+    def unread_counts():
+        with db.get_db() as conn:
+            return {r["user_id"]: r["cnt"] for r in conn.execute(
+                """SELECT user_id, COUNT(*) AS cnt FROM notifications
+                   WHERE production_id=? AND is_read=0 GROUP BY user_id""", (prod_id,)
+            ).fetchall()}
+
+    db.mark_all_notifications_read(admin)
+    before = {u: db.get_unread_notification_count(u, prod_id) for u in members}
+    sent = db.create_notifications_for_production(prod_id, "test", "Fan-out",
+                                                  exclude_user_id=members[-1])
+    assert sent == len(members) - 1
+    after = {u: db.get_unread_notification_count(u, prod_id) for u in members}
+    assert after[members[-1]] == before[members[-1]]
+    assert all(after[u] == before[u] + 1 for u in members[:-1])
+    assert {u: n for u, n in after.items() if n} == unread_counts()
+
+    resp = client.get(f"/api/notifications/count?production_id={prod_id}", headers=auth_headers)
+    assert resp.get_json()["count"] == 1
+    notif_id = db.get_notifications(admin, prod_id, unread_only=True)[0]["id"]
+    db.mark_notification_read(notif_id, admin)
+    db.mark_notification_read(notif_id, admin)
+    assert db.get_unread_notification_count(admin, prod_id) == 0
+
+    db.create_notification(prod_id, admin, "test", "Old one")
+    with db.get_db() as conn:
+        conn.execute("UPDATE notifications SET created_at='2000-01-01 00:00:00' WHERE title='Old one'")
+    assert db.prune_notifications(force=True) >= 1
+    assert db.get_unread_notification_count(admin, prod_id) == 0
+    assert unread_counts().get(admin, 0) == 0
+
+
+def test_counter_inserts_skip_returning_id(prod_id):
+    """INSERTs into notification_counters (no id column) are not given
+    RETURNING id on PostgreSQL; a failed statement would abort the transaction."""
+    import database as db
+    from db_compat import _returning_id_sql, shared_transaction
+
+    statements = []
+    with shared_transaction() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            db.create_notification(prod_id, 1, "test", "Direct")
+            db.create_notifications_for_production(prod_id, "test", "Fan-out")
+            db._rebuild_notification_counters(conn)
+        finally:
+            conn.set_trace_callback(None)
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    counters = [s for s in inserts if "INTO notification_counters" in s]
+    assert len(counters) == 3
+    assert all(_returning_id_sql(s) is None for s in counters)
+    assert all(_returning_id_sql(s) is None for s in (
+        "INSERT INTO daily_cost_series (production_id, department, date, amount) VALUES (?,?,?,?)",
+        "INSERT INTO clone_id_map (tbl, old_id, new_id) VALUES (?, ?, ?)",
+        "INSERT OR REPLACE INTO settings (key, value) VALUES (?,?)"))
+    notification = next(s for s in inserts if "INTO notifications" in s)
+    assert _returning_id_sql(notification).endswith(" RETURNING id")
@@ -53,3 +53,63 @@ def test_delete_shooting_day(client, auth_headers, prod_id):
 
     resp = client.delete(f"/api/productions/{prod_id}/shooting-days/{day_id}", headers=auth_headers)
     assert resp.status_code == 200
+
+
+def test_merge_pdt_days_bulk(client, auth_headers):
+    """Bulk PDT merge creates, updates only changed days, and skips edited days."""
+    from database import merge_pdt_days, get_shooting_days
+
+    resp = client.post("/api/productions", json={"name": "PDT_MERGE_TEST"}, headers=auth_headers)
+    pid = resp.get_json()["id"]
+    parsed = [
+        {"date": "2026-05-01", "day_number": 1, "location": "A",
+         "events": [{"event_type": "game", "name": "G1"}]},
+        {"date": "2026-05-02", "day_number": 2, "location": "B", "events": []},
+    ]
+    assert merge_pdt_days(pid, [dict(d) for d in parsed])["created"] == 2
+
+    # Re-upload of the same PDT changes nothing
+    stats = merge_pdt_days(pid, [dict(d) for d in parsed])
+    assert stats == {"created": 0, "updated": 0, "unchanged": 2, "skipped": 0}
+
+    days = {d["day_number"]: d for d in get_shooting_days(pid)}
+    client.put(f"/api/productions/{pid}/shooting-days/{days[2]['id']}",
+               json={"status": "modifié"}, headers=auth_headers)
+    parsed[0]["events"] = [{"event_type": "arena", "name": "A1"}]
+    parsed[1]["location"] = "C"
+    stats = merge_pdt_days(pid, [dict(d) for d in parsed])
+    assert stats == {"created": 0, "updated": 1, "unchanged": 0, "skipped": 1}
+
+    days = {d["day_number"]: d for d in get_shooting_days(pid)}
+    assert [e["event_type"] for e in days[1]["events"]] == ["arena"]
+    assert days[2]["location"] == "B"
+
+
+def test_upload_pdt_background_job_uses_parse_cache(client, auth_headers, prod_id,
+                                                    monkeypatch, tmp_path):
+    """A PDF whose content hash is cached is merged without re-parsing."""
+    import hashlib
+    import io
+    import time
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "_PDT_CACHE_DIR", str(tmp_path))
+    pdf_bytes = b"%PDF-1.4 cached test document"
+    app_module._pdt_cache_put(hashlib.sha256(pdf_bytes).hexdigest(), [
+        {"date": "2026-06-01", "day_number": 501, "location": "CACHED", "events": []},
+    ])
+    resp = client.post(f"/api/productions/{prod_id}/upload-pdt", headers=auth_headers,
+                       data={"pdf": (io.BytesIO(pdf_bytes), "pdt.pdf")},
+                       content_type="multipart/form-data")
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+
+    for _ in range(50):
+        job = client.get(f"/api/productions/{prod_id}/upload-pdt/jobs/{job_id}",
+                         headers=auth_headers).get_json()
+        if job["status"] != "processing":
+            break
+        time.sleep(0.1)
+    assert job["status"] == "done", job
+    assert job["cached"] is True
+    assert job["created"] == 1
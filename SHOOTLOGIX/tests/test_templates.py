@@ -0,0 +1,54 @@
+"""Production templates and duplication tests."""
+
+
+def test_template_round_trip(client, auth_headers):
+    """A template keeps FNB items under their own category and the locations."""
+    import database as db
+    src = db.create_production({"name": "Template Source"})
+    db.create_boat_function({"production_id": src, "name": "Safety", "context": "boats"})
+    for cat_name, item_name in [("Drinks", "Water"), ("Snacks", "Chips")]:
+        cat = db.create_fnb_category({"production_id": src, "name": cat_name})
+        db.create_fnb_item({"category_id": cat["id"], "production_id": src,
+                            "name": item_name, "unit_price": 3})
+    db.create_location_site({"production_id": src, "name": "Mogo", "price_f": 500})
+
+    resp = client.post("/api/admin/templates", json={"production_id": src, "name": "Season"},
+                       headers=auth_headers)
+    assert resp.status_code == 201
+    resp = client.post("/api/admin/projects/from-template",
+                       json={"template_id": resp.get_json()["id"], "name": "From Season"},
+                       headers=auth_headers)
+    assert resp.status_code == 201
+    new = resp.get_json()["id"]
+
+    items = {(i["category_name"], i["name"]) for i in db.get_fnb_items(new)}
+    assert items == {("Drinks", "Water"), ("Snacks", "Chips")}
+    assert [(s["name"], s["price_f"]) for s in db.get_location_sites(new)] == [("Mogo", 500)]
+    assert [f["name"] for f in db.get_boat_functions(new, context="boats")] == ["Safety"]
+
+
+def test_duplicate_production_with_offset(client, auth_headers, prod_id):
+    """Duplication copies assignments and PDT days with their dates shifted."""
+    import database as db
+    resp = client.post(f"/api/admin/projects/{prod_id}/duplicate",
+                       json={"name": "Next Season", "date_offset_days": 364},
+                       headers=auth_headers)
+    assert resp.status_code == 201
+    new = resp.get_json()["id"]
+
+    def spans(pid):
+        return sorted((a["function_name"], a.get("boat_name"), a["start_date"], a["end_date"])
+                      for a in db.get_boat_assignments(pid, context="boats"))
+
+    old_spans = spans(prod_id)
+    assert old_spans
+    shifted = sorted((fn, boat, db._shift_iso_date(start, 364), db._shift_iso_date(end, 364))
+                     for fn, boat, start, end in old_spans)
+    assert spans(new) == shifted
+    old_days = [d["date"] for d in db.get_shooting_days(prod_id)]
+    assert [d["date"] for d in db.get_shooting_days(new)] == [
+        db._shift_iso_date(d, 364) for d in old_days]
+
+    resp = client.post(f"/api/admin/projects/{prod_id}/duplicate",
+                       json={"name": "Next Season"}, headers=auth_headers)
+    assert resp.status_code == 409
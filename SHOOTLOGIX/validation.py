@@ -261,3 +261,48 @@ def validate_guard_schedule(data):
 
     if errors:
         raise ValidationError(errors)
+
+
+SCHEDULE_CELL_OPS = ("upsert", "delete", "lock")
+SCHEDULE_CELL_STATUSES = ("P", "F", "W")
+
+
+def validate_schedule_cell_changes(changes, grid="location"):
+    """Validate a batch of location/guard grid cell changes.
+    Errors are keyed by change index, e.g. 'changes[3].status'."""
+    if not isinstance(changes, list) or not changes:
+        raise ValidationError({"changes": "changes must be a non-empty list"})
+    errors = {}
+    for i, change in enumerate(changes):
+        prefix = f"changes[{i}]"
+        if not isinstance(change, dict):
+            errors[prefix] = f"{prefix} must be an object"
+            continue
+        op = change.get("op", "upsert")
+        try:
+            validate_enum(op, SCHEDULE_CELL_OPS, f"{prefix}.op")
+            validate_iso_date(change.get("date"), f"{prefix}.date")
+        except ValidationError as e:
+            errors.update(e.errors)
+            continue
+        if op == "lock":
+            continue
+        if not change.get("location_name") and not change.get("location_id"):
+            errors[f"{prefix}.location_name"] = "location_name or location_id is required"
+        if op != "upsert":
+            continue
+        status = change.get("status")
+        if grid == "location" and not status:
+            errors[f"{prefix}.status"] = f"{prefix}.status is required"
+        elif status:
+            try:
+                validate_enum(status, SCHEDULE_CELL_STATUSES, f"{prefix}.status")
+            except ValidationError as e:
+                errors.update(e.errors)
+        if grid == "guard":
+            try:
+                validate_guard_schedule({"nb_guards": change.get("nb_guards")})
+            except ValidationError as e:
+                errors[f"{prefix}.nb_guards"] = e.errors["nb_guards"]
+    if errors:
+        raise ValidationError(errors)
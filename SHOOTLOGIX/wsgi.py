@@ -6,7 +6,7 @@ auth migrations, data seeding, and photo matching -- the same bootstrap
 sequence that runs under `if __name__ == "__main__"` in app.py.
 
 Usage (Procfile):
-    web: gunicorn wsgi:app --bind 0.0.0.0:$PORT --workers 1 --timeout 120
+    web: gunicorn wsgi:app -c gunicorn.conf.py
 """
 import os
 